@@ -154,6 +154,15 @@ PAGES = {
             "hsml.inference_batcher.InferenceBatcher", exclude=JSON_METHODS
         ),
     },
+    "model-serving/client_batcher_api.md": {
+        "cb": ["hsml.client_batcher.ClientBatcher"],
+        "cb_properties": keras_autodoc.get_properties(
+            "hsml.client_batcher.ClientBatcher"
+        ),
+        "cb_methods": keras_autodoc.get_methods(
+            "hsml.client_batcher.ClientBatcher", exclude=JSON_METHODS
+        ),
+    },
     "model-serving/resources_api.md": {
         "res": ["hsml.resources.Resources"],
         "res_properties": keras_autodoc.get_properties("hsml.resources.Resources"),
@@ -170,6 +179,16 @@ PAGES = {
             "hsml.predictor_state.PredictorState", exclude=JSON_METHODS
         ),
     },
+    "model-serving/deployment_action_result_api.md": {
+        "dar_get": ["hsml.model_serving.ModelServing.bulk_action"],
+        "dar_properties": keras_autodoc.get_properties(
+            "hsml.deployment_action_result.DeploymentActionResult"
+        ),
+        "dar_methods": keras_autodoc.get_methods(
+            "hsml.deployment_action_result.DeploymentActionResult",
+            exclude=JSON_METHODS,
+        ),
+    },
     "model-serving/predictor_state_condition_api.md": {
         "psc_get": ["hsml.predictor_state.PredictorState.condition"],
         "psc_properties": keras_autodoc.get_properties(
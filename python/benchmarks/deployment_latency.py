@@ -0,0 +1,83 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+"""Benchmark inference requests against a local stand-in KServe model server, over REST and gRPC.
+
+Usage: python benchmarks/deployment_latency.py [--rows 100] [--columns 20] [--concurrency 8] [--qps None] [--duration 5]
+"""
+
+import argparse
+
+import numpy as np
+from hsml.bench.load_generator import run_benchmark
+from hsml.bench.server import LocalInferenceServer
+from hsml.bench.targets import GrpcTarget, RestTarget
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--qps", type=float, default=None)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--server-latency", type=float, default=0)
+    args = parser.parse_args()
+
+    inputs = np.random.rand(args.rows, args.columns).astype(np.float32)
+
+    print(
+        "{} x {} FP32 inputs, concurrency {}, qps {}".format(
+            args.rows, args.columns, args.concurrency, args.qps
+        )
+    )
+    print(
+        "{:<10} {:>10} {:>8} {:>10} {:>10} {:>10} {:>14}".format(
+            "target", "req/s", "errors", "p50 ms", "p95 ms", "p99 ms", "serialize ms"
+        )
+    )
+    with LocalInferenceServer(latency=args.server_latency) as server:
+        for target in [
+            RestTarget(server.rest_url, "model", protocol="v1"),
+            RestTarget(server.rest_url, "model", protocol="v2"),
+            GrpcTarget(server.grpc_url, "model"),
+        ]:
+            # the v1 payload is built from python lists, the same way as Deployment.predict(inputs=...)
+            target_inputs = inputs.tolist() if target.name == "REST v1" else inputs
+            result = run_benchmark(
+                target,
+                target_inputs,
+                concurrency=args.concurrency,
+                qps=args.qps,
+                duration=args.duration,
+                warmup_requests=10,
+            )
+            target.close()
+            print(
+                "{:<10} {:>10.1f} {:>8.2%} {:>10.2f} {:>10.2f} {:>10.2f} {:>14.3f}".format(
+                    result.target,
+                    result.throughput,
+                    result.error_rate,
+                    result.latency["p50"],
+                    result.latency["p95"],
+                    result.latency["p99"],
+                    result.serialization["mean"],
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
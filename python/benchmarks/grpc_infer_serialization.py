@@ -0,0 +1,81 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+"""Benchmark the serialization of numpy tensors into gRPC ModelInferRequest messages.
+
+Usage: python benchmarks/grpc_infer_serialization.py [--size 1000000] [--repeat 10]
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+from hsml.client.istio.grpc.proto.grpc_predict_v2_pb2 import ModelInferRequest
+from hsml.client.istio.utils.infer_type import InferInput, InferRequest
+
+
+def previous_contents(tensor):
+    # per-element python values in the typed contents of the message (binary_data=False)
+    data = [val.item() for val in tensor.flatten()]
+    return ModelInferRequest(
+        model_name="benchmark",
+        inputs=[
+            {
+                "name": "input",
+                "shape": list(tensor.shape),
+                "datatype": "FP32",
+                "contents": {"fp32_contents": data},
+            }
+        ],
+    ).SerializeToString()
+
+
+def previous_raw_contents(tensor):
+    # tensor bytes copied into the raw contents of the message (binary_data=True)
+    return ModelInferRequest(
+        model_name="benchmark",
+        inputs=[{"name": "input", "shape": list(tensor.shape), "datatype": "FP32"}],
+        raw_input_contents=[tensor.tobytes()],
+    ).SerializeToString()
+
+
+def raw_buffer(tensor):
+    infer_input = InferInput("input", list(tensor.shape), "FP32")
+    infer_input.set_data_from_numpy(tensor, binary_data=True)
+    return InferRequest("benchmark", [infer_input]).to_grpc_bytes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    tensor = np.random.rand(args.size).astype(np.float32)
+    assert raw_buffer(tensor) == previous_raw_contents(tensor)
+
+    print("Serializing a {}-element FP32 tensor".format(args.size))
+    for name, fn, repeat in [
+        ("previous, typed contents", previous_contents, max(1, args.repeat // 10)),
+        ("previous, raw contents", previous_raw_contents, args.repeat),
+        ("raw buffer", raw_buffer, args.repeat),
+    ]:
+        seconds = min(timeit.repeat(lambda fn=fn: fn(tensor), number=1, repeat=repeat))
+        print("{:<28} {:>10.2f} ms".format(name, seconds * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+"""Benchmark the time to import hsml, and check that heavy dependencies are loaded lazily.
+
+Each measurement runs in a fresh interpreter. The script exits with an error if pandas, grpc or
+protobuf are loaded by `import hsml` or by the modules used in `hsml.connection()`, or if the
+import takes longer than `--max-ms` milliseconds.
+
+Usage: python benchmarks/import_time.py [--repeat 5] [--max-ms 0]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+
+LAZY_MODULES = ["pandas", "grpc", "google.protobuf"]
+
+# modules imported by hsml.connection(), for both external and internal clients
+CONNECTION_MODULES = [
+    "hsml.client.hopsworks.external",
+    "hsml.client.hopsworks.internal",
+    "hsml.client.istio.external",
+    "hsml.client.istio.internal",
+    "hsml.core.model_api",
+    "hsml.core.model_registry_api",
+    "hsml.core.model_serving_api",
+]
+
+SCRIPT = """
+import importlib, json, sys, time
+start = time.perf_counter()
+import hsml
+elapsed = time.perf_counter() - start
+for module in {connection_modules!r}:
+    importlib.import_module(module)
+print(json.dumps({{
+    "elapsed": elapsed,
+    "loaded": [m for m in {lazy_modules!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure():
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            SCRIPT.format(
+                connection_modules=CONNECTION_MODULES, lazy_modules=LAZY_MODULES
+            ),
+        ]
+    )
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--max-ms", type=float, default=0, help="maximum import time, 0 to disable"
+    )
+    args = parser.parse_args()
+
+    results = [measure() for _ in range(args.repeat)]
+    elapsed = min(result["elapsed"] for result in results) * 1000
+    loaded = sorted({module for result in results for module in result["loaded"]})
+    print("{:<28} {:>10.2f} ms".format("import hsml", elapsed))
+    print("{:<28} {}".format("eagerly loaded", ", ".join(loaded) or "-"))
+
+    errors = []
+    if loaded:
+        errors.append("modules should be loaded lazily: " + ", ".join(loaded))
+    if args.max_ms > 0 and elapsed > args.max_ms:
+        errors.append(
+            "import took {:.2f} ms, more than {:.2f} ms".format(elapsed, args.max_ms)
+        )
+    if errors:
+        sys.exit("\n".join(errors))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+"""Benchmark the JSON encoding of REST inference requests and the decoding of their responses.
+
+Usage: python benchmarks/json_encoding.py [--rows 10000] [--columns 200] [--repeat 5]
+"""
+
+import argparse
+import json
+import timeit
+
+import numpy as np
+from hsml import util
+from hsml.client import json_codec
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--columns", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    inputs = np.random.rand(args.rows, args.columns)
+    response = json.dumps({"predictions": inputs.tolist()}).encode("utf-8")
+    backends = [
+        backend
+        for backend in (json_codec.ORJSON, json_codec.UJSON, json_codec.JSON)
+        if json_codec._BACKENDS[backend] is not None
+    ]
+
+    def previous_lists():
+        # inputs converted to nested lists before building the payload
+        return json.dumps({"instances": inputs.tolist()})
+
+    def previous_numpy_encoder():
+        return json.dumps({"instances": inputs}, cls=util.NumpyEncoder)
+
+    def run(name, fn, backend=None):
+        if backend is not None:
+            json_codec.set_backend(backend)
+        seconds = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        print("{:<28} {:>10.2f} ms".format(name, seconds * 1000))
+
+    print("Encoding {} x {} float64 inputs".format(args.rows, args.columns))
+    run("previous, tolist + json", previous_lists)
+    run("previous, NumpyEncoder", previous_numpy_encoder)
+    for backend in backends:
+        run(backend, lambda: json_codec.dumps({"instances": inputs}), backend)
+
+    print("Decoding a {:.1f} MB response".format(len(response) / 1024 / 1024))
+    run("previous, response.json()", lambda: json.loads(response))
+    for backend in backends:
+        run(backend, lambda: json_codec.loads(response), backend)
+
+    json_codec.set_backend()
+
+
+if __name__ == "__main__":
+    main()
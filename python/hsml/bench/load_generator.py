@@ -0,0 +1,233 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import itertools
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+from hsml import util
+
+
+class BenchmarkResult:
+    """Statistics of a benchmark run.
+
+    Latencies and serialization times are in milliseconds. With a target QPS, latencies are measured
+    from the time each request was scheduled, so requests delayed by a saturated client are accounted for.
+    """
+
+    def __init__(
+        self,
+        target: str,
+        requests: int,
+        errors: Counter,
+        duration: float,
+        latencies,
+        serialization_times,
+        concurrency: int,
+        qps: Optional[float] = None,
+    ):
+        self._target = target
+        self._requests = requests
+        self._errors = errors
+        self._duration = duration
+        self._concurrency = concurrency
+        self._qps = qps
+        self._latency = util.get_latency_statistics(
+            [latency * 1000 for latency in latencies]
+        )
+        self._serialization = util.get_latency_statistics(
+            [serialization_time * 1000 for serialization_time in serialization_times]
+        )
+
+    def describe(self):
+        """Print the statistics of the benchmark run"""
+        util.pretty_print(self)
+
+    def to_dict(self):
+        return {
+            "target": self._target,
+            "concurrency": self._concurrency,
+            "qps": self._qps,
+            "requests": self._requests,
+            "errors": sum(self._errors.values()),
+            "errorRate": self.error_rate,
+            "errorsByType": dict(self._errors),
+            "duration": self._duration,
+            "throughput": self.throughput,
+            "latency": self._latency,
+            "serialization": self._serialization,
+        }
+
+    @property
+    def target(self):
+        """Name of the benchmarked target."""
+        return self._target
+
+    @property
+    def requests(self):
+        """Number of requests sent."""
+        return self._requests
+
+    @property
+    def errors(self):
+        """Number of failed requests by error type."""
+        return self._errors
+
+    @property
+    def error_rate(self):
+        """Fraction of requests that failed."""
+        return sum(self._errors.values()) / self._requests if self._requests else 0
+
+    @property
+    def duration(self):
+        """Duration of the benchmark run in seconds."""
+        return self._duration
+
+    @property
+    def throughput(self):
+        """Successful requests per second."""
+        successes = self._requests - sum(self._errors.values())
+        return successes / self._duration if self._duration > 0 else 0
+
+    @property
+    def latency(self):
+        """Mean, p50, p95, p99 and max latency of successful requests in milliseconds."""
+        return self._latency
+
+    @property
+    def serialization(self):
+        """Mean, p50, p95, p99 and max client-side serialization time in milliseconds."""
+        return self._serialization
+
+    def __repr__(self):
+        return "BenchmarkResult({!r}, requests: {!r}, throughput: {:.1f}/s, p50: {}, p99: {})".format(
+            self._target,
+            self._requests,
+            self.throughput,
+            self._format_latency("p50"),
+            self._format_latency("p99"),
+        )
+
+    def _format_latency(self, percentile):
+        if self._latency is None:
+            return None
+        return "{:.2f}ms".format(self._latency[percentile])
+
+
+def run_benchmark(
+    target,
+    inputs,
+    concurrency: int = 1,
+    qps: Optional[float] = None,
+    duration: Optional[float] = 10,
+    num_requests: Optional[int] = None,
+    warmup_requests: int = 0,
+):
+    """Send inference requests to a target, measuring their latency and the client-side serialization time.
+
+    Without a target QPS, `concurrency` threads send requests back to back. With a target QPS, requests
+    are scheduled at a fixed rate and sent by up to `concurrency` threads. The benchmark stops after
+    `duration` seconds or `num_requests` requests, whichever comes first.
+
+    !!! example
+        ```python
+        from hsml.bench.load_generator import run_benchmark
+        from hsml.bench.server import LocalInferenceServer
+        from hsml.bench.targets import GrpcTarget, RestTarget
+
+        with LocalInferenceServer() as server:
+            for target in [RestTarget(server.rest_url, "model"), GrpcTarget(server.grpc_url, "model")]:
+                print(run_benchmark(target, [[1.0, 2.0, 3.0]], concurrency=8, duration=5))
+        ```
+
+    # Arguments
+        target: Target of the inference requests, a `RestTarget`, `GrpcTarget` or `DeploymentTarget`.
+        inputs: Model inputs of every request, or a function returning the model inputs given the request number.
+        concurrency: Maximum number of requests in flight. Defaults to `1`.
+        qps: Target number of requests per second. Defaults to `None`, requests are sent back to back.
+        duration: Maximum duration in seconds. Defaults to `10`.
+        num_requests: Maximum number of requests. Defaults to `None`, no limit.
+        warmup_requests: Number of requests sent before the benchmark starts, not included in the statistics.
+            Defaults to `0`.
+
+    # Returns
+        `BenchmarkResult`. Statistics of the benchmark run.
+    """
+    if duration is None and num_requests is None:
+        raise ValueError("Either duration or num_requests must be set.")
+
+    get_inputs = inputs if callable(inputs) else (lambda _: inputs)
+
+    for i in range(warmup_requests):
+        target.send(target.serialize(get_inputs(i)))
+
+    counter = itertools.count()
+    lock = threading.Lock()
+    latencies, serialization_times, errors = [], [], Counter()
+    start = time.perf_counter()
+    deadline = start + duration if duration is not None else None
+
+    def _worker():
+        while True:
+            with lock:
+                i = next(counter)
+            if num_requests is not None and i >= num_requests:
+                return
+            if qps is not None:
+                # open loop, requests are sent at their scheduled time
+                scheduled = start + i / qps
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                scheduled = time.perf_counter()
+            if deadline is not None and scheduled >= deadline:
+                return
+
+            try:
+                serialization_start = time.perf_counter()
+                request = target.serialize(get_inputs(i))
+                serialization_time = time.perf_counter() - serialization_start
+                target.send(request)
+            except Exception as e:
+                with lock:
+                    errors[type(e).__name__] += 1
+                continue
+            latency = time.perf_counter() - scheduled
+            with lock:
+                latencies.append(latency)
+                serialization_times.append(serialization_time)
+
+    workers = [
+        threading.Thread(target=_worker, daemon=True) for _ in range(concurrency)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    return BenchmarkResult(
+        target.name,
+        len(latencies) + sum(errors.values()),
+        errors,
+        time.perf_counter() - start,
+        latencies,
+        serialization_times,
+        concurrency,
+        qps,
+    )
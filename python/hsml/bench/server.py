@@ -0,0 +1,249 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import gzip
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import grpc
+import numpy as np
+from hsml.client.istio.grpc.proto.grpc_predict_v2_pb2 import (
+    ModelInferRequest,
+    ModelInferResponse,
+)
+from hsml.client.istio.utils.infer_type import InferOutput, InferRequest, InferResponse
+from hsml.client.istio.utils.numpy_codec import from_np_dtype, to_np_dtype
+
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class LocalInferenceServer:
+    """Local stand-in of a KServe model server, to benchmark inference requests without a cluster.
+
+    The server implements the KServe v1 (`/v1/models/<name>:predict`) and v2 (`/v2/models/<name>/infer`)
+    REST protocols, and the `GRPCInferenceService/ModelInfer` method of the v2 gRPC protocol. Requests
+    are answered with the output of `model_fn`, called with the model inputs as a numpy array, after
+    sleeping for `latency` milliseconds to simulate the model server time. REST request bodies can be
+    compressed with gzip or zstd, and responses are compressed with gzip if `compress_responses` is set
+    and the client accepts it.
+
+    !!! example
+        ```python
+        from hsml.bench.server import LocalInferenceServer
+
+        with LocalInferenceServer(model_fn=lambda x: x.sum(axis=1)) as server:
+            print(server.rest_url, server.grpc_url)
+        ```
+
+    # Arguments
+        model_fn: Function computing the predictions from the model inputs. Defaults to returning the inputs as is.
+        latency: Time in milliseconds spent by the server on each request. Defaults to `0`.
+        host: Host to listen on. Defaults to `"127.0.0.1"`.
+        rest_port: Port of the REST server. Defaults to `0`, a free port.
+        grpc_port: Port of the gRPC server. Defaults to `0`, a free port.
+        max_workers: Number of threads answering gRPC requests. Defaults to `64`.
+        compress_responses: Whether to compress REST responses with gzip. Defaults to `False`.
+    """
+
+    V1_PREDICT_PATH = re.compile(r"^/v1/models/([^/:]+):predict$")
+    V2_INFER_PATH = re.compile(r"^/v2/models/([^/]+)/infer$")
+
+    def __init__(
+        self,
+        model_fn=None,
+        latency: float = 0,
+        host: str = "127.0.0.1",
+        rest_port: int = 0,
+        grpc_port: int = 0,
+        max_workers: int = 64,
+        compress_responses: bool = False,
+    ):
+        self._model_fn = model_fn if model_fn is not None else (lambda inputs: inputs)
+        self._latency = latency / 1000
+        self._host = host
+        self._rest_port = rest_port
+        self._grpc_port = grpc_port
+        self._max_workers = max_workers
+        self._compress_responses = compress_responses
+        self._rest_server = None
+        self._rest_thread = None
+        self._grpc_server = None
+
+    def start(self):
+        """Start the REST and gRPC servers in background threads."""
+        self._rest_server = ThreadingHTTPServer(
+            (self._host, self._rest_port), self._get_request_handler()
+        )
+        self._rest_server.daemon_threads = True
+        self._rest_port = self._rest_server.server_address[1]
+        self._rest_thread = threading.Thread(
+            target=self._rest_server.serve_forever, daemon=True
+        )
+        self._rest_thread.start()
+
+        self._grpc_server = grpc.server(
+            ThreadPoolExecutor(max_workers=self._max_workers),
+            options=[
+                ("grpc.max_send_message_length", -1),
+                ("grpc.max_receive_message_length", -1),
+            ],
+        )
+        self._grpc_server.add_generic_rpc_handlers(
+            (
+                grpc.method_handlers_generic_handler(
+                    "inference.GRPCInferenceService",
+                    {
+                        "ModelInfer": grpc.unary_unary_rpc_method_handler(
+                            self._grpc_model_infer,
+                            request_deserializer=ModelInferRequest.FromString,
+                            response_serializer=ModelInferResponse.SerializeToString,
+                        )
+                    },
+                ),
+            )
+        )
+        self._grpc_port = self._grpc_server.add_insecure_port(
+            "{}:{}".format(self._host, self._grpc_port)
+        )
+        self._grpc_server.start()
+        return self
+
+    def stop(self):
+        """Stop the REST and gRPC servers."""
+        if self._rest_server is not None:
+            self._rest_server.shutdown()
+            self._rest_server.server_close()
+            self._rest_server = None
+        if self._grpc_server is not None:
+            self._grpc_server.stop(grace=None)
+            self._grpc_server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, type, value, traceback):
+        self.stop()
+
+    @property
+    def rest_url(self):
+        """Base url of the REST server."""
+        return "http://{}:{}".format(self._host, self._rest_port)
+
+    @property
+    def grpc_url(self):
+        """Address of the gRPC server."""
+        return "{}:{}".format(self._host, self._grpc_port)
+
+    def _predict(self, inputs):
+        if self._latency > 0:
+            time.sleep(self._latency)
+        return np.asarray(self._model_fn(inputs))
+
+    def _v1_predict(self, body):
+        predictions = self._predict(np.asarray(body["instances"]))
+        return {"predictions": predictions.tolist()}
+
+    def _v2_infer(self, model_name, body):
+        tensors = [
+            np.asarray(
+                infer_input["data"], dtype=to_np_dtype(infer_input["datatype"])
+            ).reshape(infer_input["shape"])
+            for infer_input in body["inputs"]
+        ]
+        outputs = self._predict(tensors[0] if len(tensors) == 1 else tensors)
+        return {
+            "id": body.get("id"),
+            "model_name": model_name,
+            "outputs": [
+                {
+                    "name": "output-0",
+                    "shape": list(outputs.shape),
+                    "datatype": from_np_dtype(outputs.dtype),
+                    "data": outputs.ravel().tolist(),
+                }
+            ],
+        }
+
+    def _grpc_model_infer(self, request, context):
+        infer_request = InferRequest.from_grpc(request)
+        tensors = [infer_input.as_numpy() for infer_input in infer_request.inputs]
+        outputs = self._predict(tensors[0] if len(tensors) == 1 else tensors)
+        infer_output = InferOutput(
+            "output-0", list(outputs.shape), from_np_dtype(outputs.dtype)
+        )
+        infer_output.set_data_from_numpy(outputs, binary_data=True)
+        return InferResponse(
+            response_id=infer_request.id,
+            model_name=infer_request.model_name,
+            infer_outputs=[infer_output],
+        ).to_grpc()
+
+    def _get_request_handler(self):
+        server = self
+
+        class _RequestHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # headers and body are written separately, do not wait for the ack of the headers
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                content_encoding = self.headers.get("Content-Encoding")
+                if content_encoding == "gzip":
+                    body = gzip.decompress(body)
+                elif content_encoding == "zstd" and zstandard is not None:
+                    body = zstandard.ZstdDecompressor().decompressobj().decompress(body)
+                elif content_encoding is not None:
+                    self._send_json(415, {"error": "Unsupported content encoding"})
+                    return
+                body = json.loads(body)
+                v1_match = server.V1_PREDICT_PATH.match(self.path)
+                v2_match = server.V2_INFER_PATH.match(self.path)
+                try:
+                    if v1_match:
+                        self._send_json(200, server._v1_predict(body))
+                    elif v2_match:
+                        self._send_json(200, server._v2_infer(v2_match.group(1), body))
+                    else:
+                        self._send_json(404, {"error": "Not found"})
+                except Exception as e:
+                    self._send_json(500, {"error": str(e)})
+
+            def _send_json(self, status, content):
+                content = json.dumps(content).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                if server._compress_responses and "gzip" in self.headers.get(
+                    "Accept-Encoding", ""
+                ):
+                    content = gzip.compress(content, compresslevel=1)
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        return _RequestHandler
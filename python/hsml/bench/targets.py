@@ -0,0 +1,185 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import numpy as np
+from hsml.client import exceptions, http_pool, json_codec
+from hsml.client.compression import RequestCompression
+from hsml.client.istio.grpc.inference_client import GRPCInferenceServerClient
+from hsml.client.istio.utils.infer_type import InferInput, InferRequest
+from hsml.client.istio.utils.numpy_codec import from_np_dtype
+from hsml.constants import INFERENCE_ENDPOINTS as IE
+from hsml.engine import serving_engine
+
+
+class RestTarget:
+    """Sends KServe v1 or v2 REST inference requests to a model server.
+
+    # Arguments
+        url: Base url of the model server, for example `LocalInferenceServer.rest_url`.
+        model_name: Name of the model.
+        protocol: KServe protocol version, `"v1"` or `"v2"`. Defaults to `"v1"`.
+        headers: Additional headers of the inference requests, such as the host or authorization headers.
+        connection_pool_configuration: Configuration of the HTTP connection pool, see `hsml.connection()`.
+        compression_configuration: Configuration of the request compression, see `Deployment.compression_configuration`.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        model_name: str,
+        protocol: str = "v1",
+        headers=None,
+        connection_pool_configuration=None,
+        compression_configuration=None,
+    ):
+        if protocol not in ["v1", "v2"]:
+            raise ValueError(
+                "Protocol '{}' is not valid. Possible values are 'v1' and 'v2'".format(
+                    protocol
+                )
+            )
+        self._url = url.rstrip("/") + (
+            "/v1/models/{}:predict" if protocol == "v1" else "/v2/models/{}/infer"
+        ).format(model_name)
+        self._model_name = model_name
+        self._protocol = protocol
+        self._headers = {"content-type": "application/json", **(headers or {})}
+        self._session = http_pool.create_session(connection_pool_configuration)
+        self._serving_engine = serving_engine.ServingEngine()
+        self._request_compression = (
+            RequestCompression(compression_configuration)
+            if compression_configuration is not None
+            else None
+        )
+
+    @property
+    def name(self):
+        return "REST {}".format(self._protocol)
+
+    def serialize(self, inputs):
+        """Build, encode and compress the payload of an inference request, returning it along with its headers."""
+        if self._protocol == "v1":
+            payload = self._serving_engine._build_inference_payload(
+                IE.API_PROTOCOL_REST, None, inputs
+            )
+        else:
+            inputs = np.asarray(inputs)
+            infer_input = InferInput(
+                "input-0", list(inputs.shape), from_np_dtype(inputs.dtype)
+            )
+            infer_input.set_data_from_numpy(inputs, binary_data=False)
+            payload = InferRequest(self._model_name, [infer_input]).to_rest()
+        data = json_codec.dumps(payload)
+        headers = dict(self._headers)
+        if self._request_compression is not None:
+            data = self._request_compression.apply(data, headers)
+        return data, headers
+
+    def send(self, request):
+        """Send an encoded inference request, returning the decoded response."""
+        data, headers = request
+        response = self._session.post(self._url, data=data, headers=headers)
+        if response.status_code // 100 != 2:
+            raise exceptions.RestAPIError(self._url, response)
+        return json_codec.loads(response.content)
+
+    def close(self):
+        self._session.close()
+
+
+class GrpcTarget:
+    """Sends KServe v2 gRPC inference requests to a model server.
+
+    # Arguments
+        url: Address of the model server, for example `LocalInferenceServer.grpc_url`.
+        model_name: Name of the model.
+        serving_api_key: API key sent in the authorization header. Defaults to an empty key.
+        channel_args: Arguments of the gRPC channels.
+        num_channels: Number of gRPC channels to spread the requests over. Defaults to `1`.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        model_name: str,
+        serving_api_key: str = "",
+        channel_args=None,
+        num_channels: int = 1,
+    ):
+        self._model_name = model_name
+        self._client = GRPCInferenceServerClient(
+            url=url,
+            serving_api_key=serving_api_key,
+            channel_args=channel_args,
+            num_channels=num_channels,
+        )
+
+    @property
+    def name(self):
+        return "gRPC v2"
+
+    def serialize(self, inputs):
+        """Build and serialize the ModelInferRequest message of an inference request."""
+        inputs = np.asarray(inputs)
+        infer_input = InferInput(
+            "input-0", list(inputs.shape), from_np_dtype(inputs.dtype)
+        )
+        infer_input.set_data_from_numpy(inputs, binary_data=True)
+        return InferRequest(self._model_name, [infer_input]).to_grpc_bytes()
+
+    def send(self, request):
+        """Send a serialized inference request, returning the decoded response."""
+        return self._client._infer_serialized(request)
+
+    def close(self):
+        self._client.close()
+
+
+class DeploymentTarget:
+    """Sends inference requests to a deployment, the same way as `Deployment.predict`.
+
+    The serialization time covers the validation and building of the inference payload. The encoding
+    of the payload happens when the request is sent, so it is part of the request latency.
+
+    # Arguments
+        deployment: Deployment to send the inference requests to.
+    """
+
+    def __init__(self, deployment):
+        self._deployment = deployment
+        self._serving_engine = serving_engine.ServingEngine()
+
+    @property
+    def name(self):
+        return "Deployment {} ({})".format(
+            self._deployment.name, self._deployment.api_protocol
+        )
+
+    def serialize(self, inputs):
+        """Validate and build the payload of an inference request."""
+        return self._serving_engine._prepare_inference_request(
+            self._deployment, None, inputs
+        )
+
+    def send(self, request):
+        """Send an inference request, returning the inference response."""
+        payload, through_hopsworks = request
+        return self._serving_engine._serving_api.send_inference_request(
+            self._deployment, payload, through_hopsworks
+        )
+
+    def close(self):
+        pass
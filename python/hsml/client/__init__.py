@@ -14,6 +14,7 @@
 #   limitations under the License.
 #
 
+from hsml.client import async_client
 from hsml.client.hopsworks import base as hw_base
 from hsml.client.hopsworks import external as hw_external
 from hsml.client.hopsworks import internal as hw_internal
@@ -28,6 +29,9 @@ _saas_connection = None
 
 _hopsworks_client = None
 _istio_client = None
+_async_hopsworks_client = None
+_async_istio_client = None
+_connection_pool_configuration = None
 
 _kserve_installed = None
 _serving_resource_limits = None
@@ -44,17 +48,23 @@ def init(
     trust_store_path=None,
     api_key_file=None,
     api_key_value=None,
+    connection_pool_configuration=None,
 ):
     global _client_type
     _client_type = client_type
 
+    global _connection_pool_configuration
+    _connection_pool_configuration = connection_pool_configuration
+
     global _saas_connection
     _saas_connection = host == CONNECTION_SAAS_HOSTNAME
 
     global _hopsworks_client
     if not _hopsworks_client:
         if client_type == "internal":
-            _hopsworks_client = hw_internal.Client()
+            _hopsworks_client = hw_internal.Client(
+                connection_pool_configuration=connection_pool_configuration
+            )
         elif client_type == "external":
             _hopsworks_client = hw_external.Client(
                 host,
@@ -64,6 +74,7 @@ def init(
                 trust_store_path,
                 api_key_file,
                 api_key_value,
+                connection_pool_configuration=connection_pool_configuration,
             )
 
 
@@ -79,9 +90,19 @@ def set_istio_client(host, port, project=None, api_key_value=None):
 
     if not _istio_client:
         if _client_type == "internal":
-            _istio_client = ist_internal.Client(host, port)
+            _istio_client = ist_internal.Client(
+                host,
+                port,
+                connection_pool_configuration=_connection_pool_configuration,
+            )
         elif _client_type == "external":
-            _istio_client = ist_external.Client(host, port, project, api_key_value)
+            _istio_client = ist_external.Client(
+                host,
+                port,
+                project,
+                api_key_value,
+                connection_pool_configuration=_connection_pool_configuration,
+            )
 
 
 def get_istio_instance() -> ist_base.Client:
@@ -89,6 +110,36 @@ def get_istio_instance() -> ist_base.Client:
     return _istio_client
 
 
+def get_async_instance() -> async_client.AsyncClient:
+    global _async_hopsworks_client
+    if not _async_hopsworks_client:
+        _async_hopsworks_client = async_client.AsyncClient(
+            get_instance(), _connection_pool_configuration
+        )
+    return _async_hopsworks_client
+
+
+def get_async_istio_instance() -> async_client.AsyncClient:
+    global _istio_client, _async_istio_client
+    if not _async_istio_client and _istio_client:
+        _async_istio_client = async_client.AsyncClient(
+            _istio_client, _connection_pool_configuration
+        )
+    return _async_istio_client
+
+
+def get_connection_pool_statistics():
+    global _hopsworks_client, _istio_client
+    return {
+        "hopsworks": _hopsworks_client._get_connection_pool_statistics()
+        if _hopsworks_client
+        else None,
+        "istio": _istio_client._get_connection_pool_statistics()
+        if _istio_client
+        else None,
+    }
+
+
 def get_client_type() -> str:
     global _client_type
     return _client_type
@@ -141,6 +192,11 @@ def set_knative_domain(knative_domain):
 
 def stop():
     global _hopsworks_client, _istio_client
+    global _async_hopsworks_client, _async_istio_client
     _hopsworks_client._close()
     _istio_client._close()
+    for _async_client in (_async_hopsworks_client, _async_istio_client):
+        if _async_client:
+            _async_client._close()
     _hopsworks_client = _istio_client = None
+    _async_hopsworks_client = _async_istio_client = None
@@ -0,0 +1,217 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import asyncio
+import ssl
+import threading
+import types
+
+import requests
+from hsml.client import exceptions, instrumentation
+from hsml.decorators import connected
+from requests.structures import CaseInsensitiveDict
+
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncClient:
+    """Asyncio variant of a client, sending requests with a native async HTTP stack.
+
+    The base url, authentication and retry logic are shared with the wrapped client. Each event loop
+    gets its own session, whose connection pool holds up to `pool_maxsize` connections per host. Sessions
+    are closed when their event loop shuts down, e.g., at the end of `asyncio.run()`.
+    """
+
+    DEFAULT_POOL_MAXSIZE = 100
+
+    def __init__(self, client, connection_pool_configuration=None):
+        if aiohttp is None:
+            raise ImportError(
+                "aiohttp is required for asynchronous requests, install it with `pip install hsml[async]`."
+            )
+        connection_pool_configuration = (
+            connection_pool_configuration if connection_pool_configuration else {}
+        )
+        self._client = client
+        self._pool_maxsize = connection_pool_configuration.get(
+            "pool_maxsize", self.DEFAULT_POOL_MAXSIZE
+        )
+        self._keep_alive = connection_pool_configuration.get("keep_alive", True)
+        # sessions by event loop, along with the async generator closing them on loop shutdown
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+
+    @property
+    def _connected(self):
+        return self._client._connected
+
+    @connected
+    async def _send_request(
+        self,
+        method,
+        path_params,
+        query_params=None,
+        headers=None,
+        data=None,
+        stream=False,
+    ):
+        """Send REST request to a REST endpoint.
+
+        Same as the `_send_request` method of the wrapped client, except for multipart uploads.
+
+        :param method: 'GET', 'PUT' or 'POST'
+        :type method: str
+        :param path_params: a list of path params to build the query url from starting after
+            the api resource, for example `["project", 119]`.
+        :type path_params: list
+        :param query_params: A dictionary of key/value pairs to be added as query parameters,
+            defaults to None
+        :type query_params: dict, optional
+        :param headers: Additional header information, defaults to None
+        :type headers: dict, optional
+        :param data: The payload as a python dictionary to be sent as json, defaults to None
+        :type data: dict, optional
+        :param stream: Set if the response should be returned instead of its json content, defaults to False
+        :type stream: boolean, optional
+        :raises RestAPIError: Raised when request wasn't correctly received, understood or accepted
+        :return: Response json
+        :rtype: dict
+        """
+        url = self._client._build_url(path_params)
+
+        with instrumentation.span(instrumentation.HTTP_SEND, method=method) as span:
+            response = await self._send(method, url, query_params, headers, data)
+            span.set_attribute("status_code", response.status_code)
+
+        # the retry logic only reads the status code, and refreshes the client auth if needed
+        if self._client._get_retry(types.SimpleNamespace(auth=None), response):
+            with instrumentation.span(
+                instrumentation.HTTP_SEND, method=method, retry=True
+            ) as span:
+                response = await self._send(method, url, query_params, headers, data)
+                span.set_attribute("status_code", response.status_code)
+
+        if response.status_code // 100 != 2:
+            raise exceptions.RestAPIError(url, response)
+
+        if stream:
+            return response
+        else:
+            # handle different success response codes
+            if len(response.content) == 0:
+                return None
+            with instrumentation.span(instrumentation.HTTP_DECODE):
+                return response.json()
+
+    async def _send(self, method, url, query_params, headers, data):
+        """Send a request, returning the fully read response as a `requests.Response`."""
+        request = types.SimpleNamespace(headers=dict(headers) if headers else {})
+        self._client._auth(request)
+
+        session = await self._get_session()
+        try:
+            async with session.request(
+                method,
+                url,
+                params=self._get_query_params(query_params),
+                headers=request.headers,
+                data=data,
+            ) as aio_response:
+                content = await aio_response.read()
+        except aiohttp.ClientConnectorError as e:
+            # raised as in synchronous requests, when the host cannot be reached
+            raise requests.exceptions.ConnectionError(e) from e
+
+        # wrap the response, so errors are handled the same way as in synchronous requests
+        response = requests.Response()
+        response.status_code = aio_response.status
+        response.reason = aio_response.reason
+        response.headers = CaseInsensitiveDict(aio_response.headers)
+        response.url = str(aio_response.url)
+        response.encoding = aio_response.get_encoding() if content else None
+        response._content = content
+        return response
+
+    def _get_query_params(self, query_params):
+        """Flatten query parameters the same way as requests, skipping None values and repeating lists."""
+        params = []
+        for key, value in (query_params or {}).items():
+            for item in value if isinstance(value, (list, tuple)) else [value]:
+                if item is not None:
+                    params.append((key, str(item)))
+        return params
+
+    async def _get_session(self):
+        loop = asyncio.get_running_loop()
+        with self._sessions_lock:
+            session, _ = self._sessions.get(loop, (None, None))
+            if session is not None and not session.closed:
+                return session
+            # drop sessions of loops closed without shutting down their async generators
+            for closed_loop in [
+                other_loop for other_loop in self._sessions if other_loop.is_closed()
+            ]:
+                del self._sessions[closed_loop]
+
+            # sessions are bound to the event loop they are created in
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=0,
+                    limit_per_host=self._pool_maxsize,
+                    force_close=not self._keep_alive,
+                    ssl=self._get_ssl(),
+                )
+            )
+            closer = self._close_on_shutdown(loop, session)
+            self._sessions[loop] = (session, closer)
+        # loops close their running async generators on shutdown, closing the session on its own loop
+        await closer.__anext__()
+        return session
+
+    async def _close_on_shutdown(self, loop, session):
+        try:
+            yield
+        finally:
+            with self._sessions_lock:
+                if self._sessions.get(loop, (None, None))[0] is session:
+                    del self._sessions[loop]
+            await session.close()
+
+    def _get_ssl(self):
+        verify = self._client._verify
+        if verify is False:
+            return False
+        if isinstance(verify, str):
+            # path to the trust store
+            return ssl.create_default_context(cafile=verify)
+        return True
+
+    def _close(self):
+        """Closes the sessions of the client whose event loops are still available."""
+        with self._sessions_lock:
+            sessions = list(self._sessions.items())
+            self._sessions.clear()
+        for loop, (session, _) in sessions:
+            if session.closed or loop.is_closed():
+                continue
+            if loop.is_running():
+                loop.call_soon_threadsafe(loop.create_task, session.close())
+            else:
+                loop.run_until_complete(session.close())
@@ -19,7 +19,7 @@ from abc import ABC, abstractmethod
 import furl
 import requests
 import urllib3
-from hsml.client import exceptions
+from hsml.client import exceptions, instrumentation
 from hsml.decorators import connected
 
 
@@ -83,9 +83,7 @@ class Client(ABC):
         :return: Response json
         :rtype: dict
         """
-        f_url = furl.furl(self._base_url)
-        f_url.path.segments = self.BASE_PATH_PARAMS + path_params
-        url = str(f_url)
+        url = self._build_url(path_params)
         request = requests.Request(
             method,
             url=url,
@@ -96,12 +94,22 @@ class Client(ABC):
             files=files,
         )
 
-        prepped = self._session.prepare_request(request)
-        response = self._session.send(prepped, verify=self._verify, stream=stream)
-
-        if self._get_retry(request, response):
+        with instrumentation.span(instrumentation.HTTP_PREPARE, method=method):
             prepped = self._session.prepare_request(request)
+        with instrumentation.span(instrumentation.HTTP_SEND, method=method) as span:
             response = self._session.send(prepped, verify=self._verify, stream=stream)
+            span.set_attribute("status_code", response.status_code)
+
+        if self._get_retry(request, response):
+            with instrumentation.span(instrumentation.HTTP_PREPARE, method=method):
+                prepped = self._session.prepare_request(request)
+            with instrumentation.span(
+                instrumentation.HTTP_SEND, method=method, retry=True
+            ) as span:
+                response = self._session.send(
+                    prepped, verify=self._verify, stream=stream
+                )
+                span.set_attribute("status_code", response.status_code)
 
         if response.status_code // 100 != 2:
             raise exceptions.RestAPIError(url, response)
@@ -112,7 +120,22 @@ class Client(ABC):
             # handle different success response codes
             if len(response.content) == 0:
                 return None
-            return response.json()
+            with instrumentation.span(instrumentation.HTTP_DECODE):
+                return response.json()
+
+    def _build_url(self, path_params):
+        """Build the url of a REST endpoint, url encoding the path parameters."""
+        f_url = furl.furl(self._base_url)
+        f_url.path.segments = self.BASE_PATH_PARAMS + path_params
+        return str(f_url)
+
+    def _get_connection_pool_statistics(self):
+        """Get the statistics of the connection pool used by the client session."""
+        return self._session.get_adapter(self._base_url).statistics.to_dict()
+
+    def _ensure_connection_pool_size(self, pool_maxsize):
+        """Grow the connection pool of the client session to fit `pool_maxsize` concurrent requests."""
+        self._session.get_adapter(self._base_url).ensure_pool_size(pool_maxsize)
 
     def _close(self):
         """Closes a client. Can be implemented for clean up purposes, not mandatory."""
@@ -0,0 +1,83 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import gzip
+
+from urllib3.util.request import ACCEPT_ENCODING
+
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+GZIP = "gzip"
+ZSTD = "zstd"
+
+DEFAULT_ALGORITHM = GZIP
+DEFAULT_MIN_SIZE = 1024  # bytes
+# fast levels, compressing inference payloads should not add more latency than it saves
+DEFAULT_LEVELS = {GZIP: 1, ZSTD: 3}
+
+
+class RequestCompression:
+    """Compression of the request bodies sent to a deployment, and negotiation of compressed responses.
+
+    :param compression_configuration: dictionary with the optional keys `algorithm`, `min_size`, `level`
+        and `accept_encoding`
+    :type compression_configuration: dict
+    """
+
+    def __init__(self, compression_configuration=None):
+        compression_configuration = (
+            compression_configuration if compression_configuration else {}
+        )
+        self._algorithm = compression_configuration.get("algorithm", DEFAULT_ALGORITHM)
+        if self._algorithm not in (GZIP, ZSTD, None):
+            raise ValueError(
+                "Compression algorithm '{}' is not valid. Possible values are '{}', '{}' and None".format(
+                    self._algorithm, GZIP, ZSTD
+                )
+            )
+        if self._algorithm == ZSTD and zstandard is None:
+            raise ImportError(
+                "zstandard is required for zstd compression, install it with `pip install zstandard`."
+            )
+        self._min_size = compression_configuration.get("min_size", DEFAULT_MIN_SIZE)
+        self._level = compression_configuration.get(
+            "level", DEFAULT_LEVELS.get(self._algorithm)
+        )
+        self._accept_encoding = compression_configuration.get("accept_encoding", True)
+
+    def apply(self, data: bytes, headers: dict, use_async: bool = False):
+        """Compress the request body if it is at least `min_size` bytes, and ask for compressed responses.
+
+        :return: the request body to send
+        :rtype: bytes
+        """
+        if self._accept_encoding:
+            # only encodings the HTTP client decodes transparently
+            headers["accept-encoding"] = (
+                "gzip, deflate" if use_async else ACCEPT_ENCODING
+            )
+        if self._algorithm is None or len(data) < self._min_size:
+            return data
+        headers["content-encoding"] = self._algorithm
+        if self._algorithm == GZIP:
+            return gzip.compress(data, compresslevel=self._level)
+        # compressors are not thread-safe, and cheap to create
+        return zstandard.ZstdCompressor(level=self._level).compress(data)
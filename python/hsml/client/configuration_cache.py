@@ -0,0 +1,104 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import hashlib
+import json
+import os
+import time
+import uuid
+
+from hsml import client
+
+
+class ConfigurationCache:
+    """Local cache of the model serving configuration of a Hopsworks instance, shared by all processes on a host.
+
+    Entries are keyed by client type, Hopsworks instance and project, and expire `ttl` seconds after being
+    written. Credentials are never cached. The cache folder and time-to-live (in seconds) can be set with the
+    `HSML_CONFIGURATION_CACHE_DIR` and `HSML_CONFIGURATION_CACHE_TTL` environment variables. A time-to-live
+    of `0` disables the cache.
+    """
+
+    CACHE_DIR_ENV = "HSML_CONFIGURATION_CACHE_DIR"
+    CACHE_TTL_ENV = "HSML_CONFIGURATION_CACHE_TTL"
+
+    DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".hsml", "configuration")
+    DEFAULT_CACHE_TTL = 600  # seconds
+
+    def __init__(self, cache_dir=None, ttl=None):
+        self._cache_dir = (
+            cache_dir
+            if cache_dir is not None
+            else os.environ.get(self.CACHE_DIR_ENV, self.DEFAULT_CACHE_DIR)
+        )
+        self._ttl = (
+            ttl
+            if ttl is not None
+            else float(os.environ.get(self.CACHE_TTL_ENV, self.DEFAULT_CACHE_TTL))
+        )
+
+    @property
+    def enabled(self):
+        return self._ttl > 0
+
+    def get(self, client_type, base_url, project_id):
+        """Get a cached configuration, or None if missing or expired."""
+        if not self.enabled:
+            return None
+        path = self._get_path(client_type, base_url, project_id)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+            if time.time() - entry["timestamp"] > self._ttl:
+                return None
+            return entry["configuration"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def put(self, client_type, base_url, project_id, configuration):
+        """Cache a configuration, ignoring errors if the cache folder is not writable."""
+        if not self.enabled:
+            return
+        path = self._get_path(client_type, base_url, project_id)
+        tmp_path = path + "-" + str(uuid.uuid4())
+        try:
+            os.makedirs(self._cache_dir, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump({"timestamp": time.time(), "configuration": configuration}, f)
+            # readers only see complete entries
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def remove(self, client_type, base_url, project_id):
+        """Remove a configuration from the cache, if present."""
+        try:
+            os.remove(self._get_path(client_type, base_url, project_id))
+        except FileNotFoundError:
+            pass
+
+    def _get_path(self, client_type, base_url, project_id):
+        key = json.dumps([client_type, base_url, str(project_id)])
+        return os.path.join(
+            self._cache_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json"
+        )
+
+
+def get_client_cache_key():
+    """Get the key of the configuration of the current client: its type, Hopsworks instance and project."""
+    _client = client.get_instance()
+    return (client.get_client_type(), _client._base_url, _client._project_id)
@@ -19,8 +19,7 @@ import os
 import textwrap
 from pathlib import Path
 
-import requests
-from hsml.client import auth
+from hsml.client import auth, http_pool
 from hsml.client.hopsworks import base as hopsworks
 
 
@@ -47,7 +46,7 @@ class Client(hopsworks.Client):
     MATERIAL_PWD = "material_passwd"
     SECRETS_DIR = "SECRETS_DIR"
 
-    def __init__(self):
+    def __init__(self, connection_pool_configuration=None):
         """Initializes a client being run from a job/notebook directly on Hopsworks."""
         self._base_url = self._get_hopsworks_rest_endpoint()
         self._host, self._port = self._get_host_port_pair()
@@ -68,7 +67,7 @@ class Client(hopsworks.Client):
         except FileNotFoundError:
             self._auth = auth.ApiKeyAuth(self._read_apikey())
         self._verify = self._get_verify(hostname_verification, trust_store_path)
-        self._session = requests.session()
+        self._session = http_pool.create_session(connection_pool_configuration)
 
         self._connected = True
 
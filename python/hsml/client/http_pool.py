@@ -0,0 +1,240 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import queue
+import socket
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import PoolManager
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+
+# enough connections for the default upload concurrency, i.e., 4 files uploaded in parallel with 3 chunks each
+DEFAULT_POOL_MAXSIZE = 16
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_MAX_RETRIES = 0
+DEFAULT_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = (502, 503, 504)
+HTTP_POOL_CONFIGURATION_KEYS = (
+    "pool_connections",
+    "pool_maxsize",
+    "max_retries",
+    "backoff_factor",
+    "pool_block",
+    "keep_alive",
+)
+
+
+class ConnectionPoolStatistics:
+    """Counters of the connections used by a client session.
+
+    - `requests`: number of requests sent
+    - `hits`: number of requests sent over an already open connection
+    - `new_connections`: number of connections opened
+    - `tls_handshakes`: number of connections opened over TLS
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {
+            "requests": 0,
+            "hits": 0,
+            "new_connections": 0,
+            "tls_handshakes": 0,
+        }
+
+    def record(self, **counts):
+        with self._lock:
+            for name, count in counts.items():
+                self._counters[name] += count
+
+    def to_dict(self):
+        with self._lock:
+            return dict(self._counters)
+
+
+class _HTTPConnection(HTTPConnection):
+    statistics = None
+
+    def connect(self):
+        super().connect()
+        if self.statistics is not None:
+            self.statistics.record(new_connections=1)
+
+
+class _HTTPSConnection(HTTPSConnection):
+    statistics = None
+
+    def connect(self):
+        super().connect()
+        if self.statistics is not None:
+            self.statistics.record(new_connections=1, tls_handshakes=1)
+
+
+class _HTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _HTTPConnection
+    statistics = None
+    draining = False
+
+    def _new_conn(self):
+        conn = super()._new_conn()
+        conn.statistics = self.statistics
+        return conn
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout=timeout)
+        if self.statistics is not None:
+            # connections dropped by the server are closed by the pool before being reused
+            self.statistics.record(
+                requests=1, hits=1 if getattr(conn, "sock", None) is not None else 0
+            )
+        return conn
+
+    def _put_conn(self, conn):
+        if self.draining and conn is not None:
+            # connections of requests sent before or while draining are closed once released
+            conn.close()
+            conn = None
+        super()._put_conn(conn)
+
+    def drain(self):
+        """Close the idle connections and the connections released afterwards, keeping the pool usable."""
+        self.draining = True
+        connections = []
+        try:
+            while True:
+                connections.append(self.pool.get(block=False))
+        except (AttributeError, queue.Empty):
+            # the pool was closed, or has no more idle connections
+            pass
+        for conn in connections:
+            if conn is not None:
+                conn.close()
+            # keep the slot, the pool opens a new connection if needed
+            super()._put_conn(None)
+
+
+class _HTTPSConnectionPool(_HTTPConnectionPool, HTTPSConnectionPool):
+    ConnectionCls = _HTTPSConnection
+
+
+class _PoolManager(PoolManager):
+    def __init__(self, statistics, **kwargs):
+        super().__init__(**kwargs)
+        self.statistics = statistics
+        self.pool_classes_by_scheme = {
+            "http": _HTTPConnectionPool,
+            "https": _HTTPSConnectionPool,
+        }
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context=request_context)
+        pool.statistics = self.statistics
+        return pool
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTP adapter keeping track of connection reuse, whose pool can grow with the client concurrency."""
+
+    def __init__(
+        self,
+        pool_connections=DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        max_retries=DEFAULT_MAX_RETRIES,
+        backoff_factor=DEFAULT_BACKOFF_FACTOR,
+        pool_block=False,
+        keep_alive=True,
+    ):
+        # set before calling the parent constructor, which initializes the pool manager
+        self.statistics = ConnectionPoolStatistics()
+        self._keep_alive = keep_alive
+        self._resize_lock = threading.Lock()
+        super().__init__(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            # read errors are not retried, as in the default retries of requests, so read timeouts
+            # are raised as `requests.exceptions.ReadTimeout`
+            max_retries=Retry(
+                total=max_retries,
+                read=False,
+                backoff_factor=backoff_factor,
+                status_forcelist=RETRY_STATUS_CODES,
+                raise_on_status=False,
+            ),
+            pool_block=pool_block,
+        )
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        if self._keep_alive:
+            pool_kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            ]
+        self.poolmanager = _PoolManager(
+            self.statistics,
+            num_pools=connections,
+            maxsize=maxsize,
+            block=block,
+            **pool_kwargs,
+        )
+
+    def ensure_pool_size(self, maxsize):
+        """Grow the connection pools to at least `maxsize` connections per host."""
+        with self._resize_lock:
+            if maxsize <= self._pool_maxsize:
+                return
+            previous_poolmanager = self.poolmanager
+            self.init_poolmanager(
+                self._pool_connections, maxsize, block=self._pool_block
+            )
+            # threads may have just taken a pool from the previous pool manager, so its pools are
+            # drained instead of closed
+            for key in previous_poolmanager.pools.keys():
+                pool = previous_poolmanager.pools.get(key)
+                if pool is not None:
+                    pool.drain()
+
+
+def create_session(connection_pool_configuration=None):
+    """Create a requests session whose connection pools are configured with `connection_pool_configuration`.
+
+    :param connection_pool_configuration: dictionary with the optional keys `pool_connections`,
+        `pool_maxsize`, `max_retries`, `backoff_factor`, `pool_block` and `keep_alive`
+    :type connection_pool_configuration: dict
+    :return: a requests session
+    :rtype: requests.Session
+    """
+    connection_pool_configuration = (
+        connection_pool_configuration if connection_pool_configuration else {}
+    )
+    # the configuration also holds the settings of the gRPC channels
+    adapter = PooledHTTPAdapter(
+        **{
+            key: value
+            for key, value in connection_pool_configuration.items()
+            if key in HTTP_POOL_CONFIGURATION_KEYS
+        }
+    )
+    session = requests.session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
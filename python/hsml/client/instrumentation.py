@@ -0,0 +1,281 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+"""Timing of the phases of inference and REST requests, reported to pluggable hooks.
+
+Hooks are either callables, called with each finished `Span`, or objects with `on_start(span)` and
+`on_end(span)` methods. While no hook is registered, spans are not recorded at all.
+
+!!! example
+    ```python
+    from hsml.client import instrumentation
+
+    metrics = instrumentation.InferenceMetrics()
+    instrumentation.add_hook(metrics)
+
+    my_deployment.predict(inputs=[[1, 2, 3]])
+    print(metrics.get_metrics())
+    ```
+"""
+
+import bisect
+import contextvars
+import threading
+import time
+
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+
+# inference requests
+INFERENCE_BUILD_PAYLOAD = "inference.build_payload"
+INFERENCE_REQUEST = "inference.request"
+INFERENCE_ENCODE = "inference.encode"
+INFERENCE_COMPRESS = "inference.compress"
+# REST requests
+HTTP_PREPARE = "http.prepare"
+HTTP_SEND = "http.send"
+HTTP_DECODE = "http.decode"
+# gRPC requests
+GRPC_SERIALIZE = "grpc.serialize"
+GRPC_SEND = "grpc.send"
+GRPC_DECODE = "grpc.decode"
+
+_hooks = ()
+_hooks_lock = threading.Lock()
+_current_span = contextvars.ContextVar("hsml_current_span", default=None)
+
+
+class Span:
+    """Timed phase of a request.
+
+    - `name`: name of the phase, for example `http.send`
+    - `attributes`: attributes of the phase, such as the deployment name or the HTTP method
+    - `parent`: span of the enclosing phase, if any
+    - `start_time`, `end_time`: `time.perf_counter()` at the start and end of the phase
+    - `duration`: duration of the phase in seconds
+    - `error`: name of the exception raised during the phase, if any
+    - `context`: dictionary where hooks can keep state between `on_start` and `on_end`
+    """
+
+    __slots__ = (
+        "name",
+        "attributes",
+        "parent",
+        "start_time",
+        "end_time",
+        "error",
+        "context",
+        "_hooks",
+        "_token",
+    )
+
+    def __init__(self, name, attributes, hooks):
+        self.name = name
+        self.attributes = attributes
+        self.parent = None
+        self.start_time = None
+        self.end_time = None
+        self.error = None
+        self.context = {}
+        self._hooks = hooks
+        self._token = None
+
+    @property
+    def duration(self):
+        return self.end_time - self.start_time
+
+    def get_attribute(self, key, default=None):
+        """Get an attribute of the span, or of the closest enclosing span that has it."""
+        span = self
+        while span is not None:
+            if key in span.attributes:
+                return span.attributes[key]
+            span = span.parent
+        return default
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self.parent = _current_span.get()
+        self._token = _current_span.set(self)
+        for hook in self._hooks:
+            if hasattr(hook, "on_start"):
+                hook.on_start(self)
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.end_time = time.perf_counter()
+        _current_span.reset(self._token)
+        if type is not None:
+            self.error = type.__name__
+        for hook in self._hooks:
+            if hasattr(hook, "on_end"):
+                hook.on_end(self)
+            else:
+                hook(self)
+
+
+class _NoOpSpan:
+    __slots__ = ()
+
+    def set_attribute(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        pass
+
+
+_NOOP_SPAN = _NoOpSpan()
+
+
+def span(name, **attributes):
+    """Time a phase of a request, as a context manager.
+
+    Returns a shared no-op context manager while no hook is registered.
+    """
+    hooks = _hooks
+    if not hooks:
+        return _NOOP_SPAN
+    return Span(name, attributes, hooks)
+
+
+def add_hook(hook):
+    """Register a hook, called with the spans of all the requests sent from now on."""
+    global _hooks
+    with _hooks_lock:
+        _hooks = _hooks + (hook,)
+
+
+def remove_hook(hook):
+    """Unregister a hook."""
+    global _hooks
+    with _hooks_lock:
+        _hooks = tuple(h for h in _hooks if h is not hook)
+
+
+def clear_hooks():
+    """Unregister all hooks, disabling the instrumentation."""
+    global _hooks
+    with _hooks_lock:
+        _hooks = ()
+
+
+class InferenceMetrics:
+    """Hook keeping counters and latency histograms of the request phases, per deployment.
+
+    Metrics are keyed by the `deployment` attribute of the span or its enclosing spans, and the
+    phase name. Requests that are not sent to a deployment are recorded under `None`.
+    """
+
+    # upper bounds of the histogram buckets, in milliseconds
+    DEFAULT_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self._buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def __call__(self, span):
+        key = (span.get_attribute("deployment"), span.name)
+        duration = span.duration * 1000
+        with self._lock:
+            metric = self._metrics.get(key)
+            if metric is None:
+                metric = self._metrics[key] = {
+                    "count": 0,
+                    "errors": 0,
+                    "total": 0.0,
+                    "max": 0.0,
+                    "buckets": [0] * (len(self._buckets) + 1),
+                }
+            metric["count"] += 1
+            metric["errors"] += 1 if span.error is not None else 0
+            metric["total"] += duration
+            metric["max"] = max(metric["max"], duration)
+            metric["buckets"][bisect.bisect_left(self._buckets, duration)] += 1
+
+    def get_metrics(self):
+        """Get the metrics by deployment and phase.
+
+        :return: dictionary of deployment names to dictionaries of phase names to their `count`, `errors`,
+            `mean` and `max` duration in milliseconds, and `histogram` as a list of (upper bound, count) pairs
+        :rtype: dict
+        """
+        with self._lock:
+            metrics = {}
+            for (deployment, name), metric in self._metrics.items():
+                metrics.setdefault(deployment, {})[name] = {
+                    "count": metric["count"],
+                    "errors": metric["errors"],
+                    "mean": metric["total"] / metric["count"],
+                    "max": metric["max"],
+                    "histogram": list(
+                        zip(self._buckets + (float("inf"),), metric["buckets"])
+                    ),
+                }
+            return metrics
+
+    def reset(self):
+        with self._lock:
+            self._metrics = {}
+
+
+class OpenTelemetryHook:
+    """Hook recording the request phases as OpenTelemetry spans.
+
+    Spans are nested the same way as the request phases, under the span active when the request is sent.
+
+    :param tracer: tracer to create the spans with, defaults to the `hsml` tracer of the global tracer provider
+    :type tracer: opentelemetry.trace.Tracer
+    """
+
+    def __init__(self, tracer=None):
+        if trace is None:
+            raise ImportError(
+                "opentelemetry-api is required for OpenTelemetry spans, install it with `pip install hsml[opentelemetry]`."
+            )
+        self._tracer = tracer if tracer is not None else trace.get_tracer("hsml")
+
+    def on_start(self, span):
+        parent = span.parent
+        context = (
+            trace.set_span_in_context(parent.context["otel_span"])
+            if parent is not None and "otel_span" in parent.context
+            else None
+        )
+        span.context["otel_span"] = self._tracer.start_span(span.name, context=context)
+
+    def on_end(self, span):
+        otel_span = span.context.pop("otel_span")
+        otel_span.set_attributes(
+            {
+                "hsml." + key: value
+                for key, value in span.attributes.items()
+                if isinstance(value, (str, bool, int, float))
+            }
+        )
+        if span.error is not None:
+            otel_span.set_status(trace.Status(trace.StatusCode.ERROR, span.error))
+        otel_span.end()
@@ -15,10 +15,10 @@
 #
 
 import os
+import threading
 from abc import abstractmethod
 
 from hsml.client import base
-from hsml.client.istio.grpc.inference_client import GRPCInferenceServerClient
 
 
 class Client(base.Client):
@@ -27,6 +27,9 @@ class Client(base.Client):
 
     BASE_PATH_PARAMS = []
 
+    DEFAULT_GRPC_CHANNELS = 1
+    DEFAULT_GRPC_CHANNEL_SELECTION = "round_robin"
+
     @abstractmethod
     def __init__(self):
         """To be implemented by clients."""
@@ -82,6 +85,7 @@ class Client(base.Client):
 
     def _close(self):
         """Closes a client. Can be implemented for clean up purposes, not mandatory."""
+        self._close_grpc_channels()
         self._connected = False
 
     def _replace_public_host(self, url):
@@ -89,9 +93,74 @@ class Client(base.Client):
         ui_url = url._replace(netloc=os.environ[self.HOPSWORKS_PUBLIC_HOST])
         return ui_url
 
-    def _create_grpc_channel(self, service_hostname: str) -> GRPCInferenceServerClient:
-        return GRPCInferenceServerClient(
-            url=self._host + ":" + str(self._port),
-            channel_args=(("grpc.ssl_target_name_override", service_hostname),),
-            serving_api_key=self._auth._token,
+    def _init_grpc_channels(self, connection_pool_configuration=None):
+        """Initialize the registry of gRPC channels, shared by all deployment objects with the same endpoint.
+
+        :param connection_pool_configuration: dictionary with the optional keys `grpc_channels`,
+            `grpc_channel_selection`, `grpc_keepalive_time` and `grpc_keepalive_timeout`
+        :type connection_pool_configuration: dict
+        """
+        connection_pool_configuration = (
+            connection_pool_configuration if connection_pool_configuration else {}
+        )
+        self._grpc_num_channels = connection_pool_configuration.get(
+            "grpc_channels", self.DEFAULT_GRPC_CHANNELS
+        )
+        self._grpc_channel_selection = connection_pool_configuration.get(
+            "grpc_channel_selection", self.DEFAULT_GRPC_CHANNEL_SELECTION
+        )
+        self._grpc_keepalive_time = connection_pool_configuration.get(
+            "grpc_keepalive_time", None
+        )
+        self._grpc_keepalive_timeout = connection_pool_configuration.get(
+            "grpc_keepalive_timeout", None
         )
+        self._grpc_channels = {}
+        self._grpc_channels_lock = threading.Lock()
+
+    def _get_grpc_channel_args(self, service_hostname: str):
+        channel_args = [("grpc.ssl_target_name_override", service_hostname)]
+        if self._grpc_keepalive_time is not None:
+            # ping idle connections, so that connections dropped by proxies are detected before the next request
+            channel_args += [
+                ("grpc.keepalive_time_ms", int(self._grpc_keepalive_time * 1000)),
+                ("grpc.keepalive_permit_without_calls", 1),
+                ("grpc.http2.max_pings_without_data", 0),
+            ]
+        if self._grpc_keepalive_timeout is not None:
+            channel_args.append(
+                ("grpc.keepalive_timeout_ms", int(self._grpc_keepalive_timeout * 1000))
+            )
+        return channel_args
+
+    def _create_grpc_channel(self, service_hostname: str):
+        """Get the gRPC client of a deployment endpoint, creating its channels on first use."""
+        # grpc is only loaded once a deployment sends requests over gRPC
+        from hsml.client.istio.grpc.inference_client import GRPCInferenceServerClient
+
+        with self._grpc_channels_lock:
+            grpc_client = self._grpc_channels.get(service_hostname)
+            if grpc_client is None:
+                grpc_client = GRPCInferenceServerClient(
+                    url=self._host + ":" + str(self._port),
+                    channel_args=self._get_grpc_channel_args(service_hostname),
+                    serving_api_key=self._auth._token,
+                    num_channels=self._grpc_num_channels,
+                    channel_selection=self._grpc_channel_selection,
+                )
+                self._grpc_channels[service_hostname] = grpc_client
+        return grpc_client
+
+    def _close_grpc_channel(self, service_hostname: str):
+        """Close the gRPC channels of a deployment endpoint, if open. They are created again on next use."""
+        with self._grpc_channels_lock:
+            grpc_client = self._grpc_channels.pop(service_hostname, None)
+        if grpc_client is not None:
+            grpc_client.close()
+
+    def _close_grpc_channels(self):
+        with self._grpc_channels_lock:
+            grpc_clients = list(self._grpc_channels.values())
+            self._grpc_channels.clear()
+        for grpc_client in grpc_clients:
+            grpc_client.close()
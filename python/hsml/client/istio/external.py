@@ -14,8 +14,7 @@
 #   limitations under the License.
 #
 
-import requests
-from hsml.client import auth
+from hsml.client import auth, http_pool
 from hsml.client.istio import base as istio
 
 
@@ -28,6 +27,7 @@ class Client(istio.Client):
         api_key_value,
         hostname_verification=None,
         trust_store_path=None,
+        connection_pool_configuration=None,
     ):
         """Initializes a client in an external environment such as AWS Sagemaker."""
         self._host = host
@@ -37,7 +37,8 @@ class Client(istio.Client):
 
         self._auth = auth.ApiKeyAuth(api_key_value)
 
-        self._session = requests.session()
+        self._session = http_pool.create_session(connection_pool_configuration)
+        self._init_grpc_channels(connection_pool_configuration)
         self._connected = True
         self._verify = self._get_verify(hostname_verification, trust_store_path)
 
@@ -45,6 +46,7 @@ class Client(istio.Client):
 
     def _close(self):
         """Closes a client."""
+        self._close_grpc_channels()
         self._connected = False
 
     def _replace_public_host(self, url):
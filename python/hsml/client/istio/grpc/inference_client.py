@@ -13,7 +13,13 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import asyncio
+import threading
+from concurrent.futures import Future
+
 import grpc
+from hsml.client import instrumentation
+from hsml.client.istio.grpc.proto.grpc_predict_v2_pb2 import ModelInferResponse
 from hsml.client.istio.grpc.proto.grpc_predict_v2_pb2_grpc import (
     GRPCInferenceServiceStub,
 )
@@ -21,25 +27,72 @@ from hsml.client.istio.utils.infer_type import InferRequest, InferResponse
 
 
 class GRPCInferenceServerClient:
+    """Client of the KServe GRPCInferenceService, sending requests over a pool of gRPC channels.
+
+    Each channel holds its own HTTP/2 connection, so that concurrent requests are spread over
+    `num_channels` connections instead of being multiplexed over a single one. The channel used
+    for each request is picked according to `channel_selection`:
+
+    - `round_robin`: channels are used in turn.
+    - `least_in_flight`: the channel with the fewest requests in flight is used.
+    """
+
+    ROUND_ROBIN = "round_robin"
+    LEAST_IN_FLIGHT = "least_in_flight"
+
     def __init__(
         self,
         url,
         serving_api_key,
         channel_args=None,
+        num_channels=1,
+        channel_selection=ROUND_ROBIN,
     ):
+        self._channels = []
+        if channel_selection not in [self.ROUND_ROBIN, self.LEAST_IN_FLIGHT]:
+            raise ValueError(
+                "Channel selection '{}' is not valid. Possible values are '{}'".format(
+                    channel_selection,
+                    "', '".join([self.ROUND_ROBIN, self.LEAST_IN_FLIGHT]),
+                )
+            )
+        if num_channels < 1:
+            raise ValueError("The number of gRPC channels must be at least 1.")
+
         if channel_args is not None:
-            channel_opt = channel_args
+            channel_opt = list(channel_args)
         else:
             channel_opt = [
                 ("grpc.max_send_message_length", -1),
                 ("grpc.max_receive_message_length", -1),
             ]
+        if num_channels > 1:
+            # channels with the same arguments share their connections by default
+            channel_opt.append(("grpc.use_local_subchannel_pool", 1))
 
         # Authentication is done via API Key in the Authorization header
-        self._channel = grpc.insecure_channel(url, options=channel_opt)
+        self._channels = [
+            grpc.insecure_channel(url, options=channel_opt) for _ in range(num_channels)
+        ]
+        self._channel = self._channels[0]
         self._client_stub = GRPCInferenceServiceStub(self._channel)
+        # requests are serialized by InferRequest.to_grpc_bytes(), avoiding a copy of the raw contents
+        self._model_infer = [
+            channel.unary_unary(
+                "/inference.GRPCInferenceService/ModelInfer",
+                request_serializer=None,
+                response_deserializer=ModelInferResponse.FromString,
+            )
+            for channel in self._channels
+        ]
         self._serving_api_key = serving_api_key
 
+        self._channel_selection = channel_selection
+        self._in_flight = [0] * num_channels
+        self._next_channel = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
     def __enter__(self):
         return self
 
@@ -52,23 +105,123 @@ class GRPCInferenceServerClient:
 
     def close(self):
         """Close the client. Future calls to server will result in an Error."""
-        self._channel.close()
+        self._closed = True
+        for channel in self._channels:
+            channel.close()
+
+    @property
+    def closed(self):
+        """Whether the client was closed."""
+        return self._closed
 
     def infer(self, infer_request: InferRequest, headers=None, client_timeout=None):
-        headers = {} if headers is None else headers
-        headers["authorization"] = "ApiKey " + self._serving_api_key
-        metadata = headers.items()
+        # serialize the InferRequest as a ModelInferRequest message
+        with instrumentation.span(instrumentation.GRPC_SERIALIZE):
+            request = infer_request.to_grpc_bytes()
 
-        # convert the InferRequest to a ModelInferRequest message
-        request = infer_request.to_grpc()
+        return self._infer_serialized(request, headers, client_timeout)
 
+    def _infer_serialized(self, request: bytes, headers=None, client_timeout=None):
+        """Send a serialized ModelInferRequest message."""
+        metadata = self._get_metadata(headers)
+
+        index = self._acquire_channel()
         try:
             # send request
-            model_infer_response = self._client_stub.ModelInfer(
-                request=request, metadata=metadata, timeout=client_timeout
-            )
+            with instrumentation.span(instrumentation.GRPC_SEND, channel=index):
+                model_infer_response = self._model_infer[index](
+                    request=request, metadata=metadata, timeout=client_timeout
+                )
         except grpc.RpcError as rpc_error:
             raise rpc_error
+        finally:
+            self._release_channel(index)
 
         # convert back the ModelInferResponse message to InferResponse
-        return InferResponse.from_grpc(model_infer_response)
+        with instrumentation.span(instrumentation.GRPC_DECODE):
+            return InferResponse.from_grpc(model_infer_response)
+
+    def infer_future(
+        self, infer_request: InferRequest, headers=None, client_timeout=None
+    ) -> Future:
+        """Send an inference request without blocking.
+
+        The request is sent by the gRPC runtime, so no thread is held while waiting for the response.
+
+        :return: future resolved with the InferResponse, or with the grpc.RpcError of the call
+        :rtype: concurrent.futures.Future
+        """
+        metadata = self._get_metadata(headers)
+
+        # serialize the InferRequest as a ModelInferRequest message
+        with instrumentation.span(instrumentation.GRPC_SERIALIZE):
+            request = infer_request.to_grpc_bytes()
+
+        index = self._acquire_channel()
+        try:
+            call_future = self._model_infer[index].future(
+                request=request, metadata=metadata, timeout=client_timeout
+            )
+        except BaseException:
+            self._release_channel(index)
+            raise
+
+        future = Future()
+
+        def _on_call_done(call_future):
+            self._release_channel(index)
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                # convert back the ModelInferResponse message to InferResponse
+                future.set_result(InferResponse.from_grpc(call_future.result()))
+            except BaseException as e:
+                future.set_exception(e)
+
+        def _on_future_done(future):
+            if future.cancelled():
+                call_future.cancel()
+
+        future.add_done_callback(_on_future_done)
+        call_future.add_done_callback(_on_call_done)
+        return future
+
+    async def infer_async(
+        self, infer_request: InferRequest, headers=None, client_timeout=None
+    ):
+        """Send an inference request, asynchronously.
+
+        :return: inference response
+        :rtype: InferResponse
+        """
+        return await asyncio.wrap_future(
+            self.infer_future(infer_request, headers, client_timeout)
+        )
+
+    def _get_metadata(self, headers=None):
+        headers = {} if headers is None else headers
+        headers["authorization"] = "ApiKey " + self._serving_api_key
+        return headers.items()
+
+    def get_in_flight_requests(self):
+        """Get the number of requests in flight on each channel."""
+        with self._lock:
+            return list(self._in_flight)
+
+    def _acquire_channel(self):
+        """Pick the channel of the next request, counting the request as in flight."""
+        with self._lock:
+            index = self._next_channel
+            if self._channel_selection == self.LEAST_IN_FLIGHT:
+                # start from the next channel, so idle channels are also used in turn
+                for offset in range(1, len(self._channels)):
+                    candidate = (self._next_channel + offset) % len(self._channels)
+                    if self._in_flight[candidate] < self._in_flight[index]:
+                        index = candidate
+            self._next_channel = (index + 1) % len(self._channels)
+            self._in_flight[index] += 1
+        return index
+
+    def _release_channel(self, index):
+        with self._lock:
+            self._in_flight[index] -= 1
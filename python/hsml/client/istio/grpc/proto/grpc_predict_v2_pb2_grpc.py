@@ -15,7 +15,7 @@
 # Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
 """Client and server classes corresponding to protobuf-defined services."""
 
-import hsml.client.istio.grpc.inference_client as inference_client
+import grpc
 import hsml.client.istio.grpc.proto.grpc_predict_v2_pb2 as grpc__predict__v2__pb2
 
 
@@ -77,19 +77,19 @@ class GRPCInferenceServiceServicer(object):
         """The ServerLive API indicates if the inference server is able to receive
         and respond to metadata and inference requests.
         """
-        context.set_code(inference_client.StatusCode.UNIMPLEMENTED)
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
     def ServerReady(self, request, context):
         """The ServerReady API indicates if the server is ready for inferencing."""
-        context.set_code(inference_client.StatusCode.UNIMPLEMENTED)
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
     def ModelReady(self, request, context):
         """The ModelReady API indicates if a specific model is ready for inferencing."""
-        context.set_code(inference_client.StatusCode.UNIMPLEMENTED)
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
@@ -98,7 +98,7 @@ class GRPCInferenceServiceServicer(object):
         indicated by the google.rpc.Status returned for the request. The OK code
         indicates success and other codes indicate failure.
         """
-        context.set_code(inference_client.StatusCode.UNIMPLEMENTED)
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
@@ -107,7 +107,7 @@ class GRPCInferenceServiceServicer(object):
         indicated by the google.rpc.Status returned for the request. The OK code
         indicates success and other codes indicate failure.
         """
-        context.set_code(inference_client.StatusCode.UNIMPLEMENTED)
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
@@ -116,67 +116,67 @@ class GRPCInferenceServiceServicer(object):
         indicated by the google.rpc.Status returned for the request. The OK code
         indicates success and other codes indicate failure.
         """
-        context.set_code(inference_client.StatusCode.UNIMPLEMENTED)
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
     def RepositoryModelLoad(self, request, context):
         """Load or reload a model from a repository."""
-        context.set_code(inference_client.StatusCode.UNIMPLEMENTED)
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
     def RepositoryModelUnload(self, request, context):
         """Unload a model."""
-        context.set_code(inference_client.StatusCode.UNIMPLEMENTED)
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details("Method not implemented!")
         raise NotImplementedError("Method not implemented!")
 
 
 def add_GRPCInferenceServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
-        "ServerLive": inference_client.unary_unary_rpc_method_handler(
+        "ServerLive": grpc.unary_unary_rpc_method_handler(
             servicer.ServerLive,
             request_deserializer=grpc__predict__v2__pb2.ServerLiveRequest.FromString,
             response_serializer=grpc__predict__v2__pb2.ServerLiveResponse.SerializeToString,
         ),
-        "ServerReady": inference_client.unary_unary_rpc_method_handler(
+        "ServerReady": grpc.unary_unary_rpc_method_handler(
             servicer.ServerReady,
             request_deserializer=grpc__predict__v2__pb2.ServerReadyRequest.FromString,
             response_serializer=grpc__predict__v2__pb2.ServerReadyResponse.SerializeToString,
         ),
-        "ModelReady": inference_client.unary_unary_rpc_method_handler(
+        "ModelReady": grpc.unary_unary_rpc_method_handler(
             servicer.ModelReady,
             request_deserializer=grpc__predict__v2__pb2.ModelReadyRequest.FromString,
             response_serializer=grpc__predict__v2__pb2.ModelReadyResponse.SerializeToString,
         ),
-        "ServerMetadata": inference_client.unary_unary_rpc_method_handler(
+        "ServerMetadata": grpc.unary_unary_rpc_method_handler(
             servicer.ServerMetadata,
             request_deserializer=grpc__predict__v2__pb2.ServerMetadataRequest.FromString,
             response_serializer=grpc__predict__v2__pb2.ServerMetadataResponse.SerializeToString,
         ),
-        "ModelMetadata": inference_client.unary_unary_rpc_method_handler(
+        "ModelMetadata": grpc.unary_unary_rpc_method_handler(
             servicer.ModelMetadata,
             request_deserializer=grpc__predict__v2__pb2.ModelMetadataRequest.FromString,
             response_serializer=grpc__predict__v2__pb2.ModelMetadataResponse.SerializeToString,
         ),
-        "ModelInfer": inference_client.unary_unary_rpc_method_handler(
+        "ModelInfer": grpc.unary_unary_rpc_method_handler(
             servicer.ModelInfer,
             request_deserializer=grpc__predict__v2__pb2.ModelInferRequest.FromString,
             response_serializer=grpc__predict__v2__pb2.ModelInferResponse.SerializeToString,
         ),
-        "RepositoryModelLoad": inference_client.unary_unary_rpc_method_handler(
+        "RepositoryModelLoad": grpc.unary_unary_rpc_method_handler(
             servicer.RepositoryModelLoad,
             request_deserializer=grpc__predict__v2__pb2.RepositoryModelLoadRequest.FromString,
             response_serializer=grpc__predict__v2__pb2.RepositoryModelLoadResponse.SerializeToString,
         ),
-        "RepositoryModelUnload": inference_client.unary_unary_rpc_method_handler(
+        "RepositoryModelUnload": grpc.unary_unary_rpc_method_handler(
             servicer.RepositoryModelUnload,
             request_deserializer=grpc__predict__v2__pb2.RepositoryModelUnloadRequest.FromString,
             response_serializer=grpc__predict__v2__pb2.RepositoryModelUnloadResponse.SerializeToString,
         ),
     }
-    generic_handler = inference_client.method_handlers_generic_handler(
+    generic_handler = grpc.method_handlers_generic_handler(
         "inference.GRPCInferenceService", rpc_method_handlers
     )
     server.add_generic_rpc_handlers((generic_handler,))
@@ -199,7 +199,7 @@ class GRPCInferenceService(object):
         timeout=None,
         metadata=None,
     ):
-        return inference_client.experimental.unary_unary(
+        return grpc.experimental.unary_unary(
             request,
             target,
             "/inference.GRPCInferenceService/ServerLive",
@@ -228,7 +228,7 @@ class GRPCInferenceService(object):
         timeout=None,
         metadata=None,
     ):
-        return inference_client.experimental.unary_unary(
+        return grpc.experimental.unary_unary(
             request,
             target,
             "/inference.GRPCInferenceService/ServerReady",
@@ -257,7 +257,7 @@ class GRPCInferenceService(object):
         timeout=None,
         metadata=None,
     ):
-        return inference_client.experimental.unary_unary(
+        return grpc.experimental.unary_unary(
             request,
             target,
             "/inference.GRPCInferenceService/ModelReady",
@@ -286,7 +286,7 @@ class GRPCInferenceService(object):
         timeout=None,
         metadata=None,
     ):
-        return inference_client.experimental.unary_unary(
+        return grpc.experimental.unary_unary(
             request,
             target,
             "/inference.GRPCInferenceService/ServerMetadata",
@@ -315,7 +315,7 @@ class GRPCInferenceService(object):
         timeout=None,
         metadata=None,
     ):
-        return inference_client.experimental.unary_unary(
+        return grpc.experimental.unary_unary(
             request,
             target,
             "/inference.GRPCInferenceService/ModelMetadata",
@@ -344,7 +344,7 @@ class GRPCInferenceService(object):
         timeout=None,
         metadata=None,
     ):
-        return inference_client.experimental.unary_unary(
+        return grpc.experimental.unary_unary(
             request,
             target,
             "/inference.GRPCInferenceService/ModelInfer",
@@ -373,7 +373,7 @@ class GRPCInferenceService(object):
         timeout=None,
         metadata=None,
     ):
-        return inference_client.experimental.unary_unary(
+        return grpc.experimental.unary_unary(
             request,
             target,
             "/inference.GRPCInferenceService/RepositoryModelLoad",
@@ -402,7 +402,7 @@ class GRPCInferenceService(object):
         timeout=None,
         metadata=None,
     ):
-        return inference_client.experimental.unary_unary(
+        return grpc.experimental.unary_unary(
             request,
             target,
             "/inference.GRPCInferenceService/RepositoryModelUnload",
@@ -19,8 +19,7 @@ import os
 import textwrap
 from pathlib import Path
 
-import requests
-from hsml.client import auth, exceptions
+from hsml.client import auth, exceptions, http_pool
 from hsml.client.istio import base as istio
 
 
@@ -48,7 +47,7 @@ class Client(istio.Client):
     MATERIAL_PWD = "material_passwd"
     SECRETS_DIR = "SECRETS_DIR"
 
-    def __init__(self, host, port):
+    def __init__(self, host, port, connection_pool_configuration=None):
         """Initializes a client being run from a job/notebook directly on Hopsworks."""
         self._host = host
         self._port = port
@@ -64,7 +63,8 @@ class Client(istio.Client):
         self._project_name = self._project_name()
         self._auth = auth.ApiKeyAuth(self._get_serving_api_key())
         self._verify = self._get_verify(hostname_verification, trust_store_path)
-        self._session = requests.session()
+        self._session = http_pool.create_session(connection_pool_configuration)
+        self._init_grpc_channels(connection_pool_configuration)
 
         self._connected = True
 
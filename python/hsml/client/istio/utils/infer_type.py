@@ -15,21 +15,27 @@
 # This implementation has been borrowed from kserve/kserve repository
 # https://github.com/kserve/kserve/blob/release-0.11/python/kserve/kserve/protocol/infer_type.py
 
+from __future__ import annotations
+
 import struct
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 import numpy
 import numpy as np
-import pandas as pd
 from hsml.client.istio.grpc.errors import InvalidInput
-from hsml.client.istio.grpc.proto.grpc_predict_v2_pb2 import (
-    InferTensorContents,
-    ModelInferRequest,
-    ModelInferResponse,
-)
 from hsml.client.istio.utils.numpy_codec import from_np_dtype, to_np_dtype
 
 
+# pandas and protobuf are only loaded when dataframes or gRPC messages are built
+if TYPE_CHECKING:
+    import pandas as pd
+    from hsml.client.istio.grpc.proto.grpc_predict_v2_pb2 import (
+        InferTensorContents,
+        ModelInferRequest,
+        ModelInferResponse,
+    )
+
+
 GRPC_CONTENT_DATATYPE_MAPPINGS = {
     "BOOL": "bool_contents",
     "INT8": "int_contents",
@@ -46,6 +52,43 @@ GRPC_CONTENT_DATATYPE_MAPPINGS = {
 }
 
 
+def encode_varint(value):
+    """
+    Encodes a non-negative integer as a protobuf base 128 varint
+    """
+    encoded = bytearray()
+    while True:
+        bits = value & 0x7F
+        value >>= 7
+        if value:
+            encoded.append(bits | 0x80)
+        else:
+            encoded.append(bits)
+            return bytes(encoded)
+
+
+def numpy_to_raw_buffer(input_tensor):
+    """
+    Gets a flat view of the bytes of a numeric tensor in row-major and
+    little-endian order, as expected in the raw contents of gRPC messages.
+    The tensor is only copied if it is not contiguous or not little-endian.
+
+    Parameters
+    ----------
+    input_tensor : np.array
+        The numeric tensor.
+
+    Returns
+    -------
+    raw_buffer : memoryview
+        The 1-D unsigned byte view over the tensor data.
+    """
+    contiguous_tensor = np.ascontiguousarray(
+        input_tensor, dtype=input_tensor.dtype.newbyteorder("<")
+    )
+    return memoryview(contiguous_tensor.reshape(-1)).cast("B")
+
+
 def raise_error(msg):
     """
     Raise error with the provided message
@@ -87,26 +130,63 @@ def serialize_byte_tensor(input_tensor):
     if (input_tensor.dtype != np.object_) and (input_tensor.dtype.type != np.bytes_):
         raise_error("cannot serialize bytes tensor: invalid datatype")
 
-    flattened_ls = []
     # 'C' order is row-major.
-    for obj in np.nditer(input_tensor, flags=["refs_ok"], order="C"):
+    elements = input_tensor.ravel(order="C").tolist()
+    if input_tensor.dtype == np.object_:
         # If directly passing bytes to BYTES type,
         # don't convert it to str as Python will encode the
         # bytes which may distort the meaning
-        if input_tensor.dtype == np.object_:
-            if isinstance(obj.item(), bytes):
-                s = obj.item()
-            else:
-                s = str(obj.item()).encode("utf-8")
-        else:
-            s = obj.item()
-        flattened_ls.append(struct.pack("<I", len(s)))
-        flattened_ls.append(s)
-    flattened = b"".join(flattened_ls)
-    flattened_array = np.asarray(flattened, dtype=np.object_)
-    if not flattened_array.flags["C_CONTIGUOUS"]:
-        flattened_array = np.ascontiguousarray(flattened_array, dtype=np.object_)
-    return flattened_array
+        elements = [
+            s if isinstance(s, bytes) else str(s).encode("utf-8") for s in elements
+        ]
+    lengths = np.fromiter(map(len, elements), dtype="<u4", count=len(elements))
+
+    # Write the 4-byte lengths and the element bytes into their positions of the
+    # serialized tensor, instead of packing and concatenating them one by one.
+    # The length of each element is placed right before its bytes.
+    prefix_offsets = np.arange(len(elements)) * 4
+    prefix_offsets[1:] += np.cumsum(lengths[:-1], dtype=np.int64)
+    is_element_byte = np.ones(len(elements) * 4 + int(lengths.sum()), dtype=bool)
+    is_element_byte[(prefix_offsets[:, None] + np.arange(4)).ravel()] = False
+
+    flattened = np.empty(len(is_element_byte), dtype=np.uint8)
+    flattened[~is_element_byte] = lengths.view(np.uint8)
+    flattened[is_element_byte] = np.frombuffer(b"".join(elements), dtype=np.uint8)
+    return np.asarray(flattened.tobytes(), dtype=np.object_)
+
+
+def deserialize_bytes_tensor(encoded_tensor):
+    """
+    Deserializes an encoded bytes tensor into a
+    numpy array of dtype of python objects
+
+    Parameters
+    ----------
+    encoded_tensor : bytes
+        The encoded bytes tensor where each element
+        has its length in first 4 bytes followed by
+        the content
+
+    Returns
+    -------
+    string_tensor : np.array
+        The 1-D numpy array of type object containing the
+        deserialized bytes in row-major form.
+    """
+    # the offset of each element depends on the length of the previous ones,
+    # so lengths are read sequentially
+    encoded_tensor = bytes(encoded_tensor)
+    unpack_length = struct.Struct("<I").unpack_from
+    elements = []
+    offset = 0
+    while offset < len(encoded_tensor):
+        (length,) = unpack_length(encoded_tensor, offset)
+        offset += 4
+        elements.append(encoded_tensor[offset : offset + length])
+        offset += length
+    string_tensor = np.empty(len(elements), dtype=np.object_)
+    string_tensor[:] = elements
+    return string_tensor
 
 
 class InferenceServerException(Exception):
@@ -261,7 +341,10 @@ class InferInput:
         if dtype is None:
             raise InvalidInput("invalid datatype in the input")
         if self._raw_data is not None:
-            np_array = np.frombuffer(self._raw_data, dtype=dtype)
+            if self.datatype == "BYTES":
+                np_array = deserialize_bytes_tensor(self._raw_data)
+            else:
+                np_array = np.frombuffer(self._raw_data, dtype=dtype)
             return np_array.reshape(self._shape)
         else:
             np_array = np.array(self._data, dtype=dtype)
@@ -313,28 +396,24 @@ class InferInput:
             self._raw_data = None
             if self._datatype == "BYTES":
                 self._data = []
+                obj = None
                 try:
-                    if input_tensor.size > 0:
-                        for obj in np.nditer(
-                            input_tensor, flags=["refs_ok"], order="C"
-                        ):
-                            # We need to convert the object to string using utf-8,
-                            # if we want to use the binary_data=False. JSON requires
-                            # the input to be a UTF-8 string.
-                            if input_tensor.dtype == np.object_:
-                                if isinstance(obj.item(), bytes):
-                                    self._data.append(str(obj.item(), encoding="utf-8"))
-                                else:
-                                    self._data.append(str(obj.item()))
-                            else:
-                                self._data.append(str(obj.item(), encoding="utf-8"))
+                    # We need to convert the object to string using utf-8,
+                    # if we want to use the binary_data=False. JSON requires
+                    # the input to be a UTF-8 string.
+                    for obj in input_tensor.ravel(order="C").tolist():
+                        if isinstance(obj, bytes):
+                            self._data.append(str(obj, encoding="utf-8"))
+                        else:
+                            self._data.append(str(obj))
                 except UnicodeDecodeError:
                     raise_error(
-                        f'Failed to encode "{obj.item()}" using UTF-8. Please use binary_data=True, if'
+                        f'Failed to encode "{obj}" using UTF-8. Please use binary_data=True, if'
                         " you want to pass a byte array."
                     )
             else:
-                self._data = [val.item() for val in input_tensor.flatten()]
+                # convert all values at once, without creating a numpy scalar per value
+                self._data = input_tensor.ravel().tolist()
         else:
             self._data = None
             if self._datatype == "BYTES":
@@ -344,7 +423,8 @@ class InferInput:
                 else:
                     self._raw_data = b""
             else:
-                self._raw_data = input_tensor.tobytes()
+                # keep a view over the tensor buffer, it is copied once when serializing the message
+                self._raw_data = numpy_to_raw_buffer(input_tensor)
             self._parameters["binary_data_size"] = len(self._raw_data)
 
 
@@ -447,6 +527,40 @@ class InferRequest:
 
     def to_grpc(self) -> ModelInferRequest:
         """Converts the InferRequest object to gRPC ModelInferRequest message"""
+        from hsml.client.istio.grpc.proto.grpc_predict_v2_pb2 import ModelInferRequest
+
+        infer_inputs, raw_input_contents = self._get_grpc_inputs()
+        return ModelInferRequest(
+            id=self.id,
+            model_name=self.model_name,
+            inputs=infer_inputs,
+            raw_input_contents=[bytes(raw_data) for raw_data in raw_input_contents],
+        )
+
+    def to_grpc_bytes(self) -> bytes:
+        """Serializes the InferRequest object into a gRPC ModelInferRequest message.
+
+        Raw input contents are appended to the serialized message straight from
+        their buffers, so numpy tensors are copied only once.
+        """
+        from hsml.client.istio.grpc.proto.grpc_predict_v2_pb2 import ModelInferRequest
+
+        infer_inputs, raw_input_contents = self._get_grpc_inputs()
+        request = ModelInferRequest(
+            id=self.id,
+            model_name=self.model_name,
+            inputs=infer_inputs,
+        )
+        # repeated fields can be appended to a serialized message, each one
+        # encoded as a tag with wire type 2 (length-delimited), a length and the value
+        tag = encode_varint(ModelInferRequest.RAW_INPUT_CONTENTS_FIELD_NUMBER << 3 | 2)
+        serialized = [request.SerializeToString()]
+        for raw_data in raw_input_contents:
+            serialized.extend((tag, encode_varint(len(raw_data)), raw_data))
+        return b"".join(serialized)
+
+    def _get_grpc_inputs(self):
+        """Gets the gRPC input tensors and their raw contents"""
         infer_inputs = []
         raw_input_contents = []
         for infer_input in self.inputs:
@@ -475,18 +589,14 @@ class InferRequest:
                 else:
                     raise InvalidInput("invalid input datatype")
             infer_inputs.append(infer_input_dict)
-
-        return ModelInferRequest(
-            id=self.id,
-            model_name=self.model_name,
-            inputs=infer_inputs,
-            raw_input_contents=raw_input_contents,
-        )
+        return infer_inputs, raw_input_contents
 
     def as_dataframe(self) -> pd.DataFrame:
         """
         Decode the tensor inputs as pandas dataframe
         """
+        import pandas as pd
+
         dfs = []
         for input in self.inputs:
             input_data = input.data
@@ -587,7 +697,10 @@ class InferOutput:
         if dtype is None:
             raise InvalidInput("invalid datatype in the input")
         if self._raw_data is not None:
-            np_array = np.frombuffer(self._raw_data, dtype=dtype)
+            if self.datatype == "BYTES":
+                np_array = deserialize_bytes_tensor(self._raw_data)
+            else:
+                np_array = np.frombuffer(self._raw_data, dtype=dtype)
             return np_array.reshape(self._shape)
         else:
             np_array = np.array(self._data, dtype=dtype)
@@ -639,28 +752,24 @@ class InferOutput:
             self._raw_data = None
             if self._datatype == "BYTES":
                 self._data = []
+                obj = None
                 try:
-                    if input_tensor.size > 0:
-                        for obj in np.nditer(
-                            input_tensor, flags=["refs_ok"], order="C"
-                        ):
-                            # We need to convert the object to string using utf-8,
-                            # if we want to use the binary_data=False. JSON requires
-                            # the input to be a UTF-8 string.
-                            if input_tensor.dtype == np.object_:
-                                if isinstance(obj.item(), bytes):
-                                    self._data.append(str(obj.item(), encoding="utf-8"))
-                                else:
-                                    self._data.append(str(obj.item()))
-                            else:
-                                self._data.append(str(obj.item(), encoding="utf-8"))
+                    # We need to convert the object to string using utf-8,
+                    # if we want to use the binary_data=False. JSON requires
+                    # the input to be a UTF-8 string.
+                    for obj in input_tensor.ravel(order="C").tolist():
+                        if isinstance(obj, bytes):
+                            self._data.append(str(obj, encoding="utf-8"))
+                        else:
+                            self._data.append(str(obj))
                 except UnicodeDecodeError:
                     raise_error(
-                        f'Failed to encode "{obj.item()}" using UTF-8. Please use binary_data=True, if'
+                        f'Failed to encode "{obj}" using UTF-8. Please use binary_data=True, if'
                         " you want to pass a byte array."
                     )
             else:
-                self._data = [val.item() for val in input_tensor.flatten()]
+                # convert all values at once, without creating a numpy scalar per value
+                self._data = input_tensor.ravel().tolist()
         else:
             self._data = None
             if self._datatype == "BYTES":
@@ -670,7 +779,8 @@ class InferOutput:
                 else:
                     self._raw_data = b""
             else:
-                self._raw_data = input_tensor.tobytes()
+                # keep a view over the tensor buffer, it is copied once when serializing the message
+                self._raw_data = numpy_to_raw_buffer(input_tensor)
             self._parameters["binary_data_size"] = len(self._raw_data)
 
 
@@ -725,7 +835,7 @@ class InferResponse:
             )
             for output in response.outputs
         ]
-        return cls(
+        infer_response = cls(
             model_name=response.model_name,
             response_id=response.id,
             parameters=response.parameters,
@@ -733,6 +843,14 @@ class InferResponse:
             raw_outputs=response.raw_output_contents,
             from_grpc=True,
         )
+        for infer_output in infer_response.outputs:
+            if infer_output.datatype == "BYTES" and infer_output._raw_data is not None:
+                # decode length-prefixed elements, same as the bytes_contents of the output
+                infer_output._data = deserialize_bytes_tensor(
+                    infer_output._raw_data
+                ).tolist()
+                infer_output._raw_data = None
+        return infer_response
 
     @classmethod
     def from_rest(cls, model_name: str, response: Dict) -> "InferResponse":
@@ -765,7 +883,7 @@ class InferResponse:
             if isinstance(infer_output.data, numpy.ndarray):
                 infer_output.set_data_from_numpy(infer_output.data, binary_data=False)
                 infer_output_dict["data"] = infer_output.data
-            elif isinstance(infer_output._raw_data, bytes):
+            elif isinstance(infer_output._raw_data, (bytes, memoryview)):
                 infer_output_dict["data"] = infer_output.as_numpy().tolist()
             else:
                 infer_output_dict["data"] = infer_output.data
@@ -775,6 +893,8 @@ class InferResponse:
 
     def to_grpc(self) -> ModelInferResponse:
         """Converts the InferResponse object to gRPC ModelInferRequest message"""
+        from hsml.client.istio.grpc.proto.grpc_predict_v2_pb2 import ModelInferResponse
+
         infer_outputs = []
         raw_output_contents = []
         for infer_output in self.outputs:
@@ -786,7 +906,7 @@ class InferResponse:
                 "datatype": infer_output.datatype,
             }
             if infer_output._raw_data is not None:
-                raw_output_contents.append(infer_output._raw_data)
+                raw_output_contents.append(bytes(infer_output._raw_data))
             else:
                 if not isinstance(infer_output.data, List):
                     raise InvalidInput("output data is not a List")
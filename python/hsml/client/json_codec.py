@@ -0,0 +1,180 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import json
+import math
+import os
+
+import numpy as np
+
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+ORJSON = "orjson"
+UJSON = "ujson"
+JSON = "json"
+
+# name of the environment variable overriding the default backend
+BACKEND_ENV = "HSML_JSON_BACKEND"
+
+
+def _default(obj):
+    """Encode the objects not supported natively by the backend, such as numpy arrays and scalars."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(
+        "Object of type {} is not JSON serializable".format(type(obj).__name__)
+    )
+
+
+def _orjson_dumps(obj):
+    # numpy arrays are encoded straight from their buffers, without converting them to python lists
+    return orjson.dumps(
+        obj,
+        default=_default,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+    )
+
+
+def _ujson_dumps(obj):
+    return ujson.dumps(obj, default=_default, ensure_ascii=False).encode("utf-8")
+
+
+def _json_dumps(obj):
+    return json.dumps(obj, default=_default).encode("utf-8")
+
+
+def _is_finite(obj):
+    """Whether an object contains no NaN or infinite floats, which only the json module encodes as such."""
+    if isinstance(obj, (float, np.floating)):
+        return math.isfinite(obj)
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind in "fc":
+            return bool(np.isfinite(obj).all())
+        return obj.dtype.kind != "O" or all(_is_finite(item) for item in obj.flat)
+    if isinstance(obj, (list, tuple)):
+        try:
+            # fast path for lists of numbers, sums overflowing to infinity are checked item by item
+            if math.isfinite(sum(obj)):
+                return True
+        except (TypeError, OverflowError):
+            pass
+        return all(_is_finite(item) for item in obj)
+    if isinstance(obj, dict):
+        return all(_is_finite(value) for value in obj.values())
+    if hasattr(obj, "tolist"):
+        return _is_finite(obj.tolist())
+    return True
+
+
+def _fallback_loads(fast_loads):
+    def loads(content):
+        try:
+            return fast_loads(content)
+        except ValueError:
+            # integers beyond 64 bits and non-standard values such as NaN are only decoded by the json module
+            return json.loads(content)
+
+    return loads
+
+
+_BACKENDS = {
+    ORJSON: (
+        (_orjson_dumps, _fallback_loads(orjson.loads)) if orjson is not None else None
+    ),
+    UJSON: (_ujson_dumps, _fallback_loads(ujson.loads)) if ujson is not None else None,
+    JSON: (_json_dumps, json.loads),
+}
+
+_backend = None
+_dumps = None
+_loads = None
+
+
+def set_backend(backend=None):
+    """Set the JSON library used to encode and decode inference requests and responses.
+
+    Payloads containing NaN or infinite floats are always encoded with the json module, as `NaN`,
+    `Infinity` and `-Infinity`, since orjson encodes them as `null`. So are payloads the fast libraries
+    cannot encode, such as integers beyond 64 bits.
+
+    :param backend: `orjson`, `ujson` or `json`, defaults to the `HSML_JSON_BACKEND` environment variable
+        if set, or the fastest library installed
+    :type backend: str
+    """
+    global _backend, _dumps, _loads
+    if backend is None:
+        backend = os.environ.get(BACKEND_ENV)
+    if backend is None:
+        backend = next(name for name in (ORJSON, UJSON, JSON) if _BACKENDS[name])
+    if backend not in _BACKENDS:
+        raise ValueError(
+            "JSON backend '{}' is not valid. Possible values are '{}'".format(
+                backend, "', '".join(_BACKENDS.keys())
+            )
+        )
+    if _BACKENDS[backend] is None:
+        raise ImportError(
+            "{} is not installed, install it with `pip install {}`.".format(
+                backend, backend
+            )
+        )
+    _dumps, _loads = _BACKENDS[backend]
+    _backend = backend
+
+
+def get_backend():
+    """Get the name of the JSON library in use."""
+    return _backend
+
+
+def dumps(obj):
+    """Encode an object as JSON, including numpy arrays and scalars.
+
+    :return: UTF-8 encoded JSON
+    :rtype: bytes
+    """
+    if _backend == JSON:
+        return _dumps(obj)
+    if not _is_finite(obj):
+        # keep NaN and infinity, instead of sending null values to the model
+        return _json_dumps(obj)
+    try:
+        return _dumps(obj)
+    except (TypeError, OverflowError):
+        # e.g., integers beyond 64 bits, only encoded by the json module
+        return _json_dumps(obj)
+
+
+def loads(content):
+    """Decode a JSON document.
+
+    :param content: JSON document, as bytes or string
+    :type content: Union[bytes, str]
+    """
+    return _loads(content)
+
+
+set_backend()
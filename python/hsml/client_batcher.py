@@ -0,0 +1,114 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import json
+from typing import Optional
+
+import humps
+from hsml import util
+from hsml.constants import CLIENT_BATCHER
+
+
+class ClientBatcher:
+    """Configuration of a client-side batcher for a deployment.
+
+    When enabled, concurrent inference requests sent to the deployment from the same process are gathered
+    into a single inference request, and the response is split back to each caller. A batch is sent once it
+    holds `max_batch_size` rows, or `max_latency` milliseconds after its first request was gathered.
+
+    # Arguments
+        enabled: Whether the client-side batcher is enabled or not. The default value is `false`.
+        max_batch_size: Maximum number of rows in a batch. The default value is `32`.
+        max_latency: Maximum time in milliseconds a request waits for other requests to batch with. The default value is `5`.
+    # Returns
+        `ClientBatcher`. Configuration of a client-side batcher.
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        max_batch_size: Optional[int] = None,
+        max_latency: Optional[float] = None,
+        **kwargs,
+    ):
+        self._enabled = enabled if enabled is not None else CLIENT_BATCHER.ENABLED
+        self._max_batch_size = (
+            max_batch_size
+            if max_batch_size is not None
+            else CLIENT_BATCHER.MAX_BATCH_SIZE
+        )
+        self._max_latency = (
+            max_latency if max_latency is not None else CLIENT_BATCHER.MAX_LATENCY
+        )
+
+    def describe(self):
+        """Print a description of the client-side batcher"""
+        util.pretty_print(self)
+
+    @classmethod
+    def from_json(cls, json_decamelized):
+        return ClientBatcher(*cls.extract_fields_from_json(json_decamelized))
+
+    @classmethod
+    def extract_fields_from_json(cls, json_decamelized):
+        json_decamelized = humps.decamelize(json_decamelized)
+        enabled = util.extract_field_from_json(json_decamelized, "enabled")
+        max_batch_size = util.extract_field_from_json(
+            json_decamelized, "max_batch_size"
+        )
+        max_latency = util.extract_field_from_json(json_decamelized, "max_latency")
+
+        return enabled, max_batch_size, max_latency
+
+    def json(self):
+        return json.dumps(self, cls=util.MLEncoder)
+
+    def to_dict(self):
+        return {
+            "enabled": self._enabled,
+            "maxBatchSize": self._max_batch_size,
+            "maxLatency": self._max_latency,
+        }
+
+    @property
+    def enabled(self):
+        """Whether the client-side batcher is enabled or not."""
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, enabled: bool):
+        self._enabled = enabled
+
+    @property
+    def max_batch_size(self):
+        """Maximum number of rows in a batch."""
+        return self._max_batch_size
+
+    @max_batch_size.setter
+    def max_batch_size(self, max_batch_size: int):
+        self._max_batch_size = max_batch_size
+
+    @property
+    def max_latency(self):
+        """Maximum time in milliseconds a request waits for other requests to batch with."""
+        return self._max_latency
+
+    @max_latency.setter
+    def max_latency(self, max_latency: float):
+        self._max_latency = max_latency
+
+    def __repr__(self):
+        return f"ClientBatcher(enabled: {self._enabled!r})"
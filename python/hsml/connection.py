@@ -15,9 +15,10 @@
 #
 
 import os
+from typing import Any, Dict, Optional
 
 from hsml import client
-from hsml.core import model_api, model_registry_api, model_serving_api
+from hsml.core import model_api, model_registry_api, model_serving_api, serving_api
 from hsml.decorators import connected, not_connected
 from requests.exceptions import ConnectionError
 
@@ -71,6 +72,11 @@ class Connection:
     to be able to access a model registry and its model serving.
     For more information, see the [integration guides](../../integrations/overview.md).
 
+    The model serving configuration of the project, such as resource limits or the Istio ingress gateway, is cached on
+    the local file system for 10 minutes, so that short-lived jobs connect without fetching it again. The cache folder
+    and time-to-live in seconds can be set with the `HSML_CONFIGURATION_CACHE_DIR` and `HSML_CONFIGURATION_CACHE_TTL`
+    environment variables, where a time-to-live of `0` disables the cache.
+
     # Arguments
         host: The hostname of the Hopsworks instance, defaults to `None`.
         port: The port on which the Hopsworks instance can be reached,
@@ -85,6 +91,24 @@ class Connection:
         api_key_file: Path to a file containing the API Key.
         api_key_value: API Key as string, if provided, however, this should be used with care,
         especially if the used notebook or job script is accessible by multiple parties. Defaults to `None`.
+        connection_pool_configuration: Configuration of the HTTP connection pools used to send requests to Hopsworks
+            and to the model deployments. Connection pools grow automatically to fit the upload and download
+            concurrency. `connection_pool_configuration` can contain the following keys:
+            * key `pool_maxsize`: initial number of connections kept open per host. Default 16.
+            * key `pool_connections`: number of hosts to keep connection pools for. Default 10.
+            * key `pool_block`: whether to wait for a free connection when the pool is exhausted, instead of opening a new one. Default False.
+            * key `keep_alive`: whether to enable TCP keep-alive on the connections. Default True.
+            * key `max_retries`: number of times to retry a request on connection errors or 502, 503 and 504 responses.
+                Only idempotent requests are retried. Default 0.
+            * key `backoff_factor`: backoff factor in seconds between retries. Default 0.5.
+            * key `grpc_channels`: number of gRPC channels, each with its own connection, opened per deployment.
+                Channels are shared by all deployment objects of the same deployment. Default 1.
+            * key `grpc_channel_selection`: how to pick the gRPC channel of each request, either `round_robin` or
+                `least_in_flight` (channel with the fewest pending requests). Default `round_robin`.
+            * key `grpc_keepalive_time`: interval in seconds between keep-alive pings on idle gRPC connections.
+                Default None, no keep-alive pings are sent.
+            * key `grpc_keepalive_timeout`: time in seconds to wait for a keep-alive ping acknowledgement before
+                closing the gRPC connection. Default None, the gRPC default of 20 seconds.
 
     # Returns
         `Connection`. Connection handle to perform operations on a Hopsworks project.
@@ -99,6 +123,7 @@ class Connection:
         trust_store_path: str = None,
         api_key_file: str = None,
         api_key_value: str = None,
+        connection_pool_configuration: Optional[Dict[str, Any]] = None,
     ):
         self._host = host
         self._port = port
@@ -107,6 +132,7 @@ class Connection:
         self._trust_store_path = trust_store_path
         self._api_key_file = api_key_file
         self._api_key_value = api_key_value
+        self._connection_pool_configuration = connection_pool_configuration
         self._connected = False
         self._model_api = model_api.ModelApi()
         self._model_registry_api = model_registry_api.ModelRegistryApi()
@@ -146,6 +172,24 @@ class Connection:
         """
         return self._model_serving_api.get()
 
+    @connected
+    def get_connection_pool_statistics(self):
+        """Get the statistics of the HTTP connection pools used to send requests to Hopsworks and to the model deployments.
+
+        !!! example
+            ```python
+            import hsml
+            conn = hsml.connection()
+            conn.get_connection_pool_statistics()
+            # {"hopsworks": {"requests": 12, "hits": 11, "new_connections": 1, "tls_handshakes": 1}, "istio": None}
+            ```
+
+        # Returns
+            `dict`. Number of requests, requests sent over an already open connection (`hits`), connections opened
+            and TLS handshakes, per client. Clients not initialized yet are `None`.
+        """
+        return client.get_connection_pool_statistics()
+
     @not_connected
     def connect(self):
         """Instantiate the connection.
@@ -177,9 +221,13 @@ class Connection:
                     self._trust_store_path,
                     self._api_key_file,
                     self._api_key_value,
+                    connection_pool_configuration=self._connection_pool_configuration,
                 )
             else:
-                client.init("internal")
+                client.init(
+                    "internal",
+                    connection_pool_configuration=self._connection_pool_configuration,
+                )
 
             self._model_api = model_api.ModelApi()
             self._model_serving_api.load_default_configuration()  # istio client, default resources,...
@@ -197,6 +245,7 @@ class Connection:
         Usage is recommended but optional.
         """
         client.stop()
+        serving_api.shutdown_rest_executor()
         self._model_api = None
         self._connected = False
         print("Connection closed.")
@@ -211,6 +260,7 @@ class Connection:
         trust_store_path: str = None,
         api_key_file: str = None,
         api_key_value: str = None,
+        connection_pool_configuration: Optional[Dict[str, Any]] = None,
     ):
         """Connection factory method, accessible through `hsml.connection()`."""
         return cls(
@@ -221,6 +271,7 @@ class Connection:
             trust_store_path,
             api_key_file,
             api_key_value,
+            connection_pool_configuration,
         )
 
     @property
@@ -286,6 +337,15 @@ class Connection:
     def api_key_value(self, api_key_value):
         self._api_key_value = api_key_value
 
+    @property
+    def connection_pool_configuration(self):
+        return self._connection_pool_configuration
+
+    @connection_pool_configuration.setter
+    @not_connected
+    def connection_pool_configuration(self, connection_pool_configuration):
+        self._connection_pool_configuration = connection_pool_configuration
+
     def __enter__(self):
         self.connect()
         return self
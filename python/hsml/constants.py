@@ -27,6 +27,12 @@ class MODEL:
 
 class MODEL_REGISTRY:
     HOPSFS_MOUNT_PREFIX = "/home/yarnapp/hopsfs/"
+    MODEL_FILES_CHECKSUMS = "model_files_checksums.json"
+
+
+class MODEL_METADATA_CACHE:
+    TTL = 60  # seconds
+    MAX_SIZE = 1024  # entries
 
 
 class MODEL_SERVING:
@@ -65,11 +71,37 @@ class INFERENCE_BATCHER:
     ENABLED = False
 
 
+class CLIENT_BATCHER:
+    ENABLED = False
+    MAX_BATCH_SIZE = 32
+    MAX_LATENCY = 5  # milliseconds
+
+
 class DEPLOYMENT:
     ACTION_START = "START"
     ACTION_STOP = "STOP"
 
 
+class DEPLOYMENT_ACTION:
+    START = "START"
+    STOP = "STOP"
+    SAVE = "SAVE"
+    # outcomes
+    OUTCOME_SUCCEEDED = "SUCCEEDED"
+    OUTCOME_FAILED = "FAILED"
+    OUTCOME_PENDING = "PENDING"
+    # concurrency of bulk actions
+    MAX_CONCURRENCY = 8
+
+
+class DEPLOYMENT_STATE_WATCHER:
+    # seconds between state probes
+    INITIAL_INTERVAL = 0.5
+    MAX_INTERVAL = 5
+    MULTIPLIER = 2
+    JITTER = 0.2  # fraction of the interval
+
+
 class PREDICTOR:
     # model server
     MODEL_SERVER_PYTHON = "PYTHON"
@@ -113,6 +145,12 @@ class INFERENCE_ENDPOINTS:
     API_PROTOCOL_GRPC = "GRPC"
 
 
+class INFERENCE_OUTPUT_FORMAT:
+    RAW = "raw"
+    NUMPY = "numpy"
+    PANDAS = "pandas"
+
+
 class DEPLOYABLE_COMPONENT:
     PREDICTOR = "predictor"
     TRANSFORMER = "transformer"
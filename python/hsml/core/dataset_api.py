@@ -15,11 +15,14 @@
 #
 
 import copy
+import hashlib
 import json
+import logging
 import math
 import os
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, wait
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from hsml import client, tag
 from hsml.client.exceptions import RestAPIError
@@ -34,16 +37,82 @@ class Chunk:
         self.retries = 0
 
 
+class UploadManifest:
+    """Local record of the chunks of a file acknowledged by the server, used to resume uploads.
+
+    Manifests are keyed by the local file path, size and modification time, the destination path
+    and the chunk size, so any change to the local file or upload settings starts a new upload.
+    """
+
+    def __init__(self, manifest_dir, local_path, destination_path, chunk_size):
+        stat = os.stat(local_path)
+        key = json.dumps(
+            [
+                os.path.abspath(local_path),
+                stat.st_size,
+                stat.st_mtime_ns,
+                destination_path,
+                chunk_size,
+            ]
+        )
+        self._path = os.path.join(
+            manifest_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json"
+        )
+        self._local_path = local_path
+        self._destination_path = destination_path
+        self._lock = threading.Lock()
+        self.uploaded_chunks = self._load()
+        # only resumed uploads probe the server for chunks missing in the manifest
+        self.resumed = len(self.uploaded_chunks) > 0
+
+    def _load(self):
+        try:
+            with open(self._path, "r") as f:
+                return set(json.load(f)["uploaded_chunks"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return set()
+
+    def add(self, chunk_number):
+        with self._lock:
+            self.uploaded_chunks.add(chunk_number)
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            tmp_path = "{}.{}.tmp".format(self._path, os.getpid())
+            with open(tmp_path, "w") as f:
+                json.dump(
+                    {
+                        "local_path": self._local_path,
+                        "destination_path": self._destination_path,
+                        "uploaded_chunks": sorted(self.uploaded_chunks),
+                    },
+                    f,
+                )
+            os.replace(tmp_path, self._path)
+
+    def discard(self):
+        with self._lock:
+            self.uploaded_chunks = set()
+            self.resumed = False
+            try:
+                os.remove(self._path)
+            except FileNotFoundError:
+                pass
+
+
 class DatasetApi:
     def __init__(self):
-        pass
+        self._log = logging.getLogger(__name__)
 
     DEFAULT_UPLOAD_FLOW_CHUNK_SIZE = 10
     DEFAULT_UPLOAD_SIMULTANEOUS_UPLOADS = 3
     DEFAULT_UPLOAD_MAX_CHUNK_RETRIES = 1
 
     DEFAULT_DOWNLOAD_FLOW_CHUNK_SIZE = 1_048_576
+    DEFAULT_DOWNLOAD_PARALLEL_CONNECTIONS = 1
+    DEFAULT_DOWNLOAD_RANGE_SIZE = 32 * 1_048_576
     FLOW_PERMANENT_ERRORS = [404, 413, 415, 500, 501]
+    FLOW_UNSUPPORTED_PROBE_ERRORS = [405, 501]
+
+    UPLOAD_MANIFEST_DIR = os.path.join(os.path.expanduser("~"), ".hsml", "uploads")
 
     def upload(
         self,
@@ -54,6 +123,7 @@ class DatasetApi:
         simultaneous_uploads=DEFAULT_UPLOAD_SIMULTANEOUS_UPLOADS,
         max_chunk_retries=DEFAULT_UPLOAD_MAX_CHUNK_RETRIES,
         chunk_retry_interval=1,
+        resumable: bool = False,
     ):
         """Upload a file to the Hopsworks filesystem.
 
@@ -74,6 +144,9 @@ class DatasetApi:
             simultaneous_uploads: number of simultaneous chunks to upload. Default 3
             max_chunk_retries: maximum retry for a chunk. Default is 1
             chunk_retry_interval: chunk retry interval in seconds. Default is 1sec
+            resumable: keep track of the chunks acknowledged by the server in a local manifest,
+                so that a failed upload of the same file can be resumed by calling this method again.
+                Default is False
         # Returns
             `str`: Path to uploaded file
         # Raises
@@ -92,9 +165,18 @@ class DatasetApi:
         destination_path = upload_path + "/" + file_name
         chunk_size_bytes = chunk_size * 1024 * 1024
 
+        manifest = None
+        if resumable:
+            manifest = UploadManifest(
+                self.UPLOAD_MANIFEST_DIR, local_path, destination_path, chunk_size_bytes
+            )
+
         if self.path_exists(destination_path):
             if overwrite:
                 self.rm(destination_path)
+                if manifest is not None:
+                    # the previous upload completed, start over
+                    manifest.discard()
             else:
                 raise Exception(
                     "{} already exists, set overwrite=True to overwrite it".format(
@@ -103,66 +185,121 @@ class DatasetApi:
                 )
 
         num_chunks = math.ceil(file_size / chunk_size_bytes)
+        # keep a pooled connection for each chunk in flight
+        client.get_instance()._ensure_connection_pool_size(simultaneous_uploads)
+        uploaded_chunks = (
+            set(manifest.uploaded_chunks) if manifest is not None else set()
+        )
 
         base_params = self._get_flow_base_params(
             file_name, num_chunks, file_size, chunk_size_bytes
         )
 
-        chunk_number = 1
         with open(local_path, "rb") as f:
             pbar = None
             try:
                 pbar = tqdm(
                     total=file_size,
-                    bar_format="{desc}: {percentage:.3f}%|{bar}| {n_fmt}/{total_fmt} elapsed<{elapsed} remaining<{remaining}",
+                    bar_format="{desc}: {percentage:.3f}%|{bar}| {n_fmt}/{total_fmt} elapsed<{elapsed} remaining<{remaining} {rate_fmt}",
                     desc="Uploading",
+                    unit="B",
+                    unit_scale=True,
                 )
             except Exception:
                 self._log.exception("Failed to initialize progress bar.")
                 self._log.info("Starting upload")
+
+            if uploaded_chunks:
+                self._log.info(
+                    "Resuming upload of {}, {}/{} chunks already uploaded".format(
+                        file_name, len(uploaded_chunks), num_chunks
+                    )
+                )
+                if pbar is not None:
+                    pbar.update(
+                        sum(
+                            min(
+                                chunk_size_bytes, file_size - (n - 1) * chunk_size_bytes
+                            )
+                            for n in uploaded_chunks
+                        )
+                    )
+
+            start_time = time.perf_counter()
             with ThreadPoolExecutor(simultaneous_uploads) as executor:
-                while True:
-                    chunks = []
-                    for _ in range(simultaneous_uploads):
-                        chunk = f.read(chunk_size_bytes)
-                        if not chunk:
-                            break
-                        chunks.append(Chunk(chunk, chunk_number, "pending"))
-                        chunk_number += 1
-
-                    if len(chunks) == 0:
-                        break
-
-                    # upload each chunk and update pbar
-                    futures = [
-                        executor.submit(
-                            self._upload_chunk,
-                            base_params,
-                            upload_path,
-                            file_name,
-                            chunk,
-                            pbar,
-                            max_chunk_retries,
-                            chunk_retry_interval,
+                # keep a sliding window of `simultaneous_uploads` chunks in flight, and read the next
+                # chunk from disk while the uploads in the window are running
+                inflight = set()
+                next_chunk = self._read_chunk(
+                    f, chunk_size_bytes, 1, num_chunks, uploaded_chunks
+                )
+                while next_chunk is not None or inflight:
+                    while (
+                        next_chunk is not None and len(inflight) < simultaneous_uploads
+                    ):
+                        inflight.add(
+                            executor.submit(
+                                self._upload_chunk,
+                                base_params,
+                                upload_path,
+                                file_name,
+                                next_chunk,
+                                pbar,
+                                max_chunk_retries,
+                                chunk_retry_interval,
+                                manifest,
+                            )
+                        )
+                        next_chunk = self._read_chunk(
+                            f,
+                            chunk_size_bytes,
+                            next_chunk.number + 1,
+                            num_chunks,
+                            uploaded_chunks,
                         )
-                        for chunk in chunks
-                    ]
-                    # wait for all upload tasks to complete
-                    _, _ = wait(futures)
+
+                    # wait for any upload task to complete, and refill the window
+                    done, inflight = wait(inflight, return_when=FIRST_COMPLETED)
                     try:
-                        _ = [future.result() for future in futures]
+                        _ = [future.result() for future in done]
                     except Exception as e:
+                        for future in inflight:
+                            future.cancel()
                         if pbar is not None:
                             pbar.close()
                         raise e
+            elapsed = time.perf_counter() - start_time
+            if manifest is not None:
+                # the server assembled the file, the manifest is no longer needed
+                manifest.discard()
 
             if pbar is not None:
                 pbar.close()
-            else:
-                self._log.info("Upload finished")
+            self._log.info(
+                "Uploaded {} in {} chunks in {:.2f}s ({:.2f} MB/s)".format(
+                    file_name,
+                    num_chunks,
+                    elapsed,
+                    (file_size / (1024 * 1024)) / elapsed if elapsed > 0 else 0.0,
+                )
+            )
 
         return upload_path + "/" + os.path.basename(local_path)
 
+    def _read_chunk(
+        self, f, chunk_size_bytes, chunk_number, num_chunks, uploaded_chunks
+    ):
+        # skip chunks already acknowledged by the server
+        while chunk_number <= num_chunks and chunk_number in uploaded_chunks:
+            chunk_number += 1
+        if chunk_number > num_chunks:
+            return None
+        f.seek((chunk_number - 1) * chunk_size_bytes)
+        content = f.read(chunk_size_bytes)
+        if not content:
+            return None
+        return Chunk(content, chunk_number, "pending")
+
     def _upload_chunk(
         self,
         base_params,
@@ -172,6 +309,7 @@ class DatasetApi:
         pbar,
         max_chunk_retries,
         chunk_retry_interval,
+        manifest: UploadManifest = None,
     ):
         query_params = copy.copy(base_params)
         query_params["flowCurrentChunkSize"] = len(chunk.content)
@@ -179,6 +317,10 @@ class DatasetApi:
 
         chunk.status = "uploading"
         while True:
+            if manifest is not None and self._chunk_exists(
+                manifest, query_params, upload_path
+            ):
+                break  # chunk received in a previous upload attempt
             try:
                 self._upload_request(
                     query_params, upload_path, file_name, chunk.content
@@ -196,10 +338,24 @@ class DatasetApi:
                 continue
 
         chunk.status = "uploaded"
+        if manifest is not None:
+            manifest.add(chunk.number)
 
         if pbar is not None:
             pbar.update(query_params["flowCurrentChunkSize"])
 
+    def _chunk_exists(self, manifest, params, path):
+        """Check whether the server already has a chunk of a resumed upload."""
+        if not manifest.resumed:
+            return False
+        try:
+            return self._test_upload_request(params, path)
+        except RestAPIError as re:
+            if re.response.status_code in DatasetApi.FLOW_UNSUPPORTED_PROBE_ERRORS:
+                # the server does not support chunk probes, rely on the manifest only
+                manifest.resumed = False
+            return False
+
     def _get_flow_base_params(self, file_name, num_chunks, size, chunk_size):
         return {
             "templateId": -1,
@@ -220,14 +376,66 @@ class DatasetApi:
             "POST", path_params, data=params, files={"file": (file_name, chunk)}
         )
 
-    def download(self, path, local_path):
+    def _test_upload_request(self, params, path):
+        _client = client.get_instance()
+        path_params = ["project", _client._project_id, "dataset", "upload", path]
+
+        # Following the flow protocol, the server replies 200 if the chunk was already received
+        with _client._send_request(
+            "GET", path_params, query_params=params, stream=True
+        ) as response:
+            return response.status_code == 200
+
+    def download(
+        self,
+        path,
+        local_path,
+        parallel_connections=DEFAULT_DOWNLOAD_PARALLEL_CONNECTIONS,
+        range_size=DEFAULT_DOWNLOAD_RANGE_SIZE,
+    ):
         """Download file/directory on a path in datasets.
         :param path: path to download
         :type path: str
         :param local_path: path to download in datasets
         :type local_path: str
+        :param parallel_connections: number of connections used to download byte ranges of the file
+            in parallel. If the server does not honour range requests, the file is downloaded in a single stream.
+        :type parallel_connections: int
+        :param range_size: size in bytes of each byte range downloaded in parallel
+        :type range_size: int
         """
 
+        if parallel_connections > 1:
+            client.get_instance()._ensure_connection_pool_size(parallel_connections)
+            try:
+                # the first range request tells whether the server supports ranges, and the file size
+                response = self._download_request(path, byte_range=(0, range_size - 1))
+            except RestAPIError as re:
+                if re.response.status_code != 416:
+                    raise re
+                response = None  # e.g., empty file, download it in a single stream
+            if response is not None:
+                with response:
+                    file_size = self._get_content_range_size(response)
+                    if file_size is not None:
+                        self._download_ranges(
+                            path,
+                            local_path,
+                            response,
+                            file_size,
+                            parallel_connections,
+                            range_size,
+                        )
+                        return
+                    if response.status_code != 206:
+                        # the server ignored the range header, the response contains the whole file
+                        self._write_stream(response, local_path)
+                        return
+
+        with self._download_request(path) as response:
+            self._write_stream(response, local_path)
+
+    def _download_request(self, path, byte_range=None):
         _client = client.get_instance()
         path_params = [
             "project",
@@ -238,18 +446,95 @@ class DatasetApi:
             path,
         ]
         query_params = {"type": "DATASET"}
+        headers = None
+        if byte_range is not None:
+            headers = {"Range": "bytes={}-{}".format(*byte_range)}
 
-        with _client._send_request(
-            "GET", path_params, query_params=query_params, stream=True
-        ) as response:
-            with open(local_path, "wb") as f:
-                downloaded = 0
-                # if not response.headers.get("Content-Length"), file is still downloading
-                for chunk in response.iter_content(
-                    chunk_size=self.DEFAULT_DOWNLOAD_FLOW_CHUNK_SIZE
-                ):
-                    f.write(chunk)
-                    downloaded += len(chunk)
+        return _client._send_request(
+            "GET", path_params, query_params=query_params, headers=headers, stream=True
+        )
+
+    def _write_stream(self, response, local_path):
+        with open(local_path, "wb") as f:
+            downloaded = 0
+            # if not response.headers.get("Content-Length"), file is still downloading
+            for chunk in response.iter_content(
+                chunk_size=self.DEFAULT_DOWNLOAD_FLOW_CHUNK_SIZE
+            ):
+                f.write(chunk)
+                downloaded += len(chunk)
+
+    def _get_content_range_size(self, response):
+        if response.status_code != 206:
+            return None
+        # e.g., Content-Range: bytes 0-1048575/52428800
+        file_size = response.headers.get("Content-Range", "").rpartition("/")[2]
+        return int(file_size) if file_size.isdigit() else None
+
+    def _download_ranges(
+        self,
+        path,
+        local_path,
+        first_response,
+        file_size,
+        parallel_connections,
+        range_size,
+    ):
+        # preallocate the file, so byte ranges can be written at their position as they arrive
+        with open(local_path, "wb") as f:
+            f.truncate(file_size)
+
+        fd = os.open(local_path, os.O_WRONLY | getattr(os, "O_BINARY", 0))
+        # positional writes are atomic with os.pwrite, otherwise seek and write under a lock
+        write_lock = threading.Lock()
+
+        def download_range(start, end):
+            with self._download_request(path, byte_range=(start, end)) as response:
+                if response.status_code != 206:
+                    raise Exception(
+                        "Range request for bytes {}-{} of {} was not honoured".format(
+                            start, end, path
+                        )
+                    )
+                self._write_range(fd, response, start, write_lock)
+
+        try:
+            with ThreadPoolExecutor(parallel_connections) as executor:
+                futures = [
+                    executor.submit(
+                        self._write_range, fd, first_response, 0, write_lock
+                    )
+                ]
+                futures += [
+                    executor.submit(
+                        download_range, start, min(start + range_size, file_size) - 1
+                    )
+                    for start in range(range_size, file_size, range_size)
+                ]
+                try:
+                    for future in futures:
+                        future.result()
+                except Exception as e:
+                    for future in futures:
+                        future.cancel()
+                    raise e
+        finally:
+            os.close(fd)
+
+    def _write_range(self, fd, response, offset, write_lock):
+        for chunk in response.iter_content(
+            chunk_size=self.DEFAULT_DOWNLOAD_FLOW_CHUNK_SIZE
+        ):
+            view = memoryview(chunk)
+            while len(view) > 0:
+                if hasattr(os, "pwrite"):
+                    written = os.pwrite(fd, view, offset)
+                else:
+                    with write_lock:
+                        os.lseek(fd, offset, os.SEEK_SET)
+                        written = os.write(fd, view)
+                view = view[written:]
+                offset += written
 
     def get(self, remote_path):
         """Get metadata about a path in datasets.
@@ -64,14 +64,9 @@ class ModelApi:
         :rtype: Model
         """
         _client = client.get_instance()
-        path_params = [
-            "project",
-            _client._project_id,
-            "modelregistries",
-            model_registry_id,
-            "models",
-            name + "_" + str(version),
-        ]
+        path_params = self._get_model_path_params(
+            _client._project_id, name, version, model_registry_id
+        )
         query_params = {"expand": "trainingdatasets"}
 
         model_json = _client._send_request("GET", path_params, query_params)
@@ -81,6 +76,41 @@ class ModelApi:
 
         return model_meta
 
+    async def aget(
+        self, name, version, model_registry_id, shared_registry_project_name=None
+    ):
+        """Get the metadata of a model with a certain name and version, asynchronously.
+
+        :param name: name of the model
+        :type name: str
+        :param version: version of the model
+        :type version: int
+        :return: model metadata object
+        :rtype: Model
+        """
+        _client = client.get_async_instance()
+        path_params = self._get_model_path_params(
+            _client._client._project_id, name, version, model_registry_id
+        )
+        query_params = {"expand": "trainingdatasets"}
+
+        model_json = await _client._send_request("GET", path_params, query_params)
+        model_meta = model.Model.from_response_json(model_json)
+
+        model_meta.shared_registry_project_name = shared_registry_project_name
+
+        return model_meta
+
+    def _get_model_path_params(self, project_id, name, version, model_registry_id):
+        return [
+            "project",
+            project_id,
+            "modelregistries",
+            model_registry_id,
+            "models",
+            name + "_" + str(version),
+        ]
+
     def get_models(
         self,
         name,
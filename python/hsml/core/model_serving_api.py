@@ -15,8 +15,10 @@
 #
 
 import socket
+from concurrent.futures import ThreadPoolExecutor
 
 from hsml import client
+from hsml.client.configuration_cache import ConfigurationCache, get_client_cache_key
 from hsml.client.exceptions import ModelRegistryException
 from hsml.constants import INFERENCE_ENDPOINTS
 from hsml.core import dataset_api, serving_api
@@ -28,6 +30,7 @@ class ModelServingApi:
     def __init__(self):
         self._dataset_api = dataset_api.DatasetApi()
         self._serving_api = serving_api.ServingApi()
+        self._configuration_cache = ConfigurationCache()
 
     def get(self):
         """Get model serving for specific project.
@@ -50,92 +53,134 @@ class ModelServingApi:
         return ModelServing(_client._project_name, _client._project_id)
 
     def load_default_configuration(self):
-        """Load default configuration and set istio client for model serving"""
+        """Load default configuration and set istio client for model serving
+
+        The configuration is read from the local configuration cache if present, otherwise it is fetched with
+        concurrent requests and cached. Cached configurations are trusted until they expire, or until an inference
+        request fails to connect to the istio endpoint, which removes them from the cache.
+        """
+
+        cache_key = get_client_cache_key()
+        configuration = self._configuration_cache.get(*cache_key)
+        if configuration is None:
+            configuration = self._fetch_default_configuration()
+            self._configuration_cache.put(*cache_key, configuration)
 
         # kserve installed
-        is_kserve_installed = self._serving_api.is_kserve_installed()
-        client.set_kserve_installed(is_kserve_installed)
+        client.set_kserve_installed(configuration["kserve_installed"])
 
         # istio client
-        self._set_istio_client_if_available()
+        if configuration["kserve_installed"]:
+            self._set_istio_client(configuration["istio_endpoint"])
 
         # resource limits
-        max_resources = self._serving_api.get_resource_limits()
-        client.set_serving_resource_limits(max_resources)
+        client.set_serving_resource_limits(configuration["resource_limits"])
 
         # num instances limits
-        num_instances_range = self._serving_api.get_num_instances_limits()
-        client.set_serving_num_instances_limits(num_instances_range)
+        client.set_serving_num_instances_limits(configuration["num_instances_limits"])
 
         # Knative domain
-        knative_domain = self._serving_api.get_knative_domain()
-        client.set_knative_domain(knative_domain)
+        client.set_knative_domain(configuration["knative_domain"])
 
-    def _set_istio_client_if_available(self):
-        """Set istio client if available"""
+    def _fetch_default_configuration(self):
+        """Fetch the default configuration for model serving, sending the requests concurrently"""
 
-        if client.is_kserve_installed():
-            # check existing istio client
-            try:
-                if client.get_istio_instance() is not None:
-                    return  # istio client already set
-            except Exception:
-                pass
-
-            # setup istio client
-            inference_endpoints = self._serving_api.get_inference_endpoints()
-            if client.get_client_type() == "internal":
-                # if internal, get node port
-                endpoint = get_endpoint_by_type(
-                    inference_endpoints, INFERENCE_ENDPOINTS.ENDPOINT_TYPE_NODE
-                )
-                if endpoint is not None:
-                    client.set_istio_client(
-                        endpoint.get_any_host(),
-                        endpoint.get_port(INFERENCE_ENDPOINTS.PORT_NAME_HTTP).number,
-                    )
-                else:
-                    raise ValueError(
-                        "Istio ingress endpoint of type '"
-                        + INFERENCE_ENDPOINTS.ENDPOINT_TYPE_NODE
-                        + "' not found"
-                    )
-            else:  # if external
-                endpoint = get_endpoint_by_type(
-                    inference_endpoints, INFERENCE_ENDPOINTS.ENDPOINT_TYPE_LOAD_BALANCER
-                )
-                if endpoint is not None:
-                    # if load balancer (external ip) available
-                    _client = client.get_instance()
-                    client.set_istio_client(
-                        endpoint.get_any_host(),
-                        endpoint.get_port(INFERENCE_ENDPOINTS.PORT_NAME_HTTP).number,
-                        _client._project_name,
-                        _client._auth._token,  # reuse hopsworks client token
-                    )
-                    return
-                # in case there's not load balancer, check if node port is open
-                endpoint = get_endpoint_by_type(
-                    inference_endpoints, INFERENCE_ENDPOINTS.ENDPOINT_TYPE_NODE
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            is_kserve_installed = executor.submit(self._serving_api.is_kserve_installed)
+            max_resources = executor.submit(self._serving_api.get_resource_limits)
+            num_instances_range = executor.submit(
+                self._serving_api.get_num_instances_limits
+            )
+            knative_domain = executor.submit(self._serving_api.get_knative_domain)
+
+            kserve_installed = is_kserve_installed.result()
+            istio_endpoint = None
+            if kserve_installed:
+                # inference endpoints are only available with kserve, fetched while the limits are in flight
+                istio_endpoint = self._get_istio_endpoint(
+                    self._serving_api.get_inference_endpoints()
                 )
-                if endpoint is not None:
-                    # if node port available
-                    _client = client.get_instance()
-                    host = _client.host
-                    port = endpoint.get_port(INFERENCE_ENDPOINTS.PORT_NAME_HTTP).number
-                    if self._is_host_port_open(host, port):
-                        # and it is open
-                        client.set_istio_client(
-                            host,
-                            port,
-                            _client._project_name,
-                            _client._auth._token,  # reuse hopsworks client token
-                        )
-                        return
-                # otherwise, fallback to hopsworks client
-                print(
-                    "External IP not configured for the Istio ingress gateway, the Hopsworks client will be used for model inference instead"
+
+            return {
+                "kserve_installed": kserve_installed,
+                "istio_endpoint": istio_endpoint,
+                "resource_limits": max_resources.result(),
+                "num_instances_limits": num_instances_range.result(),
+                "knative_domain": knative_domain.result(),
+            }
+
+    def _get_istio_endpoint(self, inference_endpoints):
+        """Get the host and port of the istio ingress gateway reachable from this client, if any"""
+
+        if client.get_client_type() == "internal":
+            # if internal, get node port
+            endpoint = get_endpoint_by_type(
+                inference_endpoints, INFERENCE_ENDPOINTS.ENDPOINT_TYPE_NODE
+            )
+            if endpoint is not None:
+                return {
+                    "host": endpoint.get_any_host(),
+                    "port": endpoint.get_port(
+                        INFERENCE_ENDPOINTS.PORT_NAME_HTTP
+                    ).number,
+                }
+            else:
+                raise ValueError(
+                    "Istio ingress endpoint of type '"
+                    + INFERENCE_ENDPOINTS.ENDPOINT_TYPE_NODE
+                    + "' not found"
                 )
+        else:  # if external
+            endpoint = get_endpoint_by_type(
+                inference_endpoints, INFERENCE_ENDPOINTS.ENDPOINT_TYPE_LOAD_BALANCER
+            )
+            if endpoint is not None:
+                # if load balancer (external ip) available
+                return {
+                    "host": endpoint.get_any_host(),
+                    "port": endpoint.get_port(
+                        INFERENCE_ENDPOINTS.PORT_NAME_HTTP
+                    ).number,
+                }
+            # in case there's not load balancer, check if node port is open
+            endpoint = get_endpoint_by_type(
+                inference_endpoints, INFERENCE_ENDPOINTS.ENDPOINT_TYPE_NODE
+            )
+            if endpoint is not None:
+                # if node port available
+                host = client.get_instance().host
+                port = endpoint.get_port(INFERENCE_ENDPOINTS.PORT_NAME_HTTP).number
+                if self._is_host_port_open(host, port):
+                    # and it is open
+                    return {"host": host, "port": port}
+            return None
+
+    def _set_istio_client(self, istio_endpoint):
+        """Set istio client if available"""
+
+        # check existing istio client
+        try:
+            if client.get_istio_instance() is not None:
+                return  # istio client already set
+        except Exception:
+            pass
+
+        # setup istio client
+        if client.get_client_type() == "internal":
+            client.set_istio_client(istio_endpoint["host"], istio_endpoint["port"])
+        elif istio_endpoint is not None:
+            _client = client.get_instance()
+            client.set_istio_client(
+                istio_endpoint["host"],
+                istio_endpoint["port"],
+                _client._project_name,
+                _client._auth._token,  # reuse hopsworks client token
+            )
+        else:
+            # otherwise, fallback to hopsworks client
+            print(
+                "External IP not configured for the Istio ingress gateway, the Hopsworks client will be used for model inference instead"
+            )
 
     def _is_host_port_open(self, host, port):
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
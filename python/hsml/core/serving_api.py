@@ -14,7 +14,10 @@
 #   limitations under the License.
 #
 
-import json
+import atexit
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Union
 
 from hsml import (
@@ -23,7 +26,10 @@ from hsml import (
     deployment,
     inference_endpoint,
     predictor_state,
+    util,
 )
+from hsml.client import instrumentation, json_codec
+from hsml.client.configuration_cache import ConfigurationCache, get_client_cache_key
 from hsml.client.istio.utils.infer_type import (
     InferInput,
     InferOutput,
@@ -31,12 +37,40 @@ from hsml.client.istio.utils.infer_type import (
 )
 from hsml.constants import ARTIFACT_VERSION
 from hsml.constants import INFERENCE_ENDPOINTS as IE
+from requests.exceptions import ConnectionError
 
 
-class ServingApi:
-    def __init__(self):
-        pass
+# thread pool sending the blocking REST inference requests of futures, shared by all deployments
+REST_EXECUTOR_MAX_WORKERS = 32
+_rest_executor = None
+_rest_executor_lock = threading.Lock()
+
+
+def _get_rest_executor():
+    """Get the thread pool shared by all `ServingApi` instances, creating it on first use."""
+    global _rest_executor
+    with _rest_executor_lock:
+        if _rest_executor is None:
+            _rest_executor = ThreadPoolExecutor(
+                max_workers=REST_EXECUTOR_MAX_WORKERS,
+                thread_name_prefix="hsml-inference",
+            )
+        return _rest_executor
+
+
+def shutdown_rest_executor():
+    """Shut down the shared thread pool, waiting for pending inference requests to complete."""
+    global _rest_executor
+    with _rest_executor_lock:
+        executor, _rest_executor = _rest_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+atexit.register(shutdown_rest_executor)
 
+
+class ServingApi:
     def get_by_id(self, id: int):
         """Get the metadata of a deployment with a certain id.
 
@@ -180,6 +214,23 @@ class ServingApi:
         deployment_json = _client._send_request("GET", path_params)
         return predictor_state.PredictorState.from_response_json(deployment_json)
 
+    def get_states(self):
+        """Get the state of all deployments in the project, in a single request.
+
+        :return: predictor states by deployment id
+        :rtype: Dict[int, PredictorState]
+        """
+
+        _client = client.get_instance()
+        path_params = ["project", _client._project_id, "serving"]
+        deployments_json = _client._send_request("GET", path_params)
+        return {
+            deployment_json["id"]: predictor_state.PredictorState.from_response_json(
+                deployment_json
+            )
+            for deployment_json in deployments_json or []
+        }
+
     def reset_changes(self, deployment_instance):
         """Reset a given deployment to the original values in the Hopsworks instance
 
@@ -214,16 +265,109 @@ class ServingApi:
         :return: inference response
         :rtype: Union[Dict, List[InferOutput]]
         """
+        with instrumentation.span(
+            instrumentation.INFERENCE_REQUEST,
+            deployment=deployment_instance.name,
+            protocol=deployment_instance.api_protocol,
+        ):
+            if deployment_instance.api_protocol == IE.API_PROTOCOL_REST:
+                # REST protocol, use hopsworks or istio client
+                return self._send_inference_request_via_rest_protocol(
+                    deployment_instance, data, through_hopsworks
+                )
+            else:
+                # gRPC protocol, use the deployment grpc channel
+                return self._send_inference_request_via_grpc_protocol(
+                    deployment_instance, data
+                )
+
+    async def asend_inference_request(
+        self,
+        deployment_instance,
+        data: Union[Dict, List[InferInput]],
+        through_hopsworks: bool = False,
+    ) -> Union[Dict, List[InferOutput]]:
+        """Send inference requests to a deployment with a certain id, asynchronously
+
+        :param deployment_instance: metadata object of the deployment to be used for the prediction
+        :type deployment_instance: Deployment
+        :param data: payload of the inference request
+        :type data: Union[Dict, List[InferInput]]
+        :param through_hopsworks: whether to send the inference request through the Hopsworks REST API or not
+        :type through_hopsworks: bool
+        :return: inference response
+        :rtype: Union[Dict, List[InferOutput]]
+        """
+        with instrumentation.span(
+            instrumentation.INFERENCE_REQUEST,
+            deployment=deployment_instance.name,
+            protocol=deployment_instance.api_protocol,
+        ):
+            if deployment_instance.api_protocol == IE.API_PROTOCOL_REST:
+                # REST protocol, use the async hopsworks or istio client
+                _client, path_params, headers = self._get_rest_inference_route(
+                    deployment_instance, through_hopsworks, use_async=True
+                )
+                with instrumentation.span(instrumentation.INFERENCE_ENCODE):
+                    data = json_codec.dumps(data)
+                data = self._compress_inference_request(
+                    deployment_instance, data, headers, use_async=True
+                )
+                try:
+                    response = await _client._send_request(
+                        "POST", path_params, headers=headers, data=data, stream=True
+                    )
+                except ConnectionError:
+                    if self._is_istio_route(through_hopsworks):
+                        self._invalidate_default_configuration()
+                    raise
+                return self._decode_inference_response(response)
+            else:
+                # gRPC protocol, the request is sent by the gRPC runtime without blocking the event loop
+                grpc_channel, request = self._get_grpc_inference_request(
+                    deployment_instance, data
+                )
+                infer_response = await grpc_channel.infer_async(
+                    infer_request=request, headers=None
+                )
+                return infer_response.outputs
+
+    def send_inference_request_future(
+        self,
+        deployment_instance,
+        data: Union[Dict, List[InferInput]],
+        through_hopsworks: bool = False,
+    ) -> Future:
+        """Send inference requests to a deployment with a certain id, without blocking
+
+        :param deployment_instance: metadata object of the deployment to be used for the prediction
+        :type deployment_instance: Deployment
+        :param data: payload of the inference request
+        :type data: Union[Dict, List[InferInput]]
+        :param through_hopsworks: whether to send the inference request through the Hopsworks REST API or not
+        :type through_hopsworks: bool
+        :return: future resolved with the inference response
+        :rtype: concurrent.futures.Future
+        """
         if deployment_instance.api_protocol == IE.API_PROTOCOL_REST:
-            # REST protocol, use hopsworks or istio client
-            return self._send_inference_request_via_rest_protocol(
-                deployment_instance, data, through_hopsworks
+            # REST protocol, the blocking request is sent from a shared thread pool
+            # the request is sent in the context of the caller, keeping its instrumentation spans
+            return _get_rest_executor().submit(
+                contextvars.copy_context().run,
+                self.send_inference_request,
+                deployment_instance,
+                data,
+                through_hopsworks,
             )
         else:
-            # gRPC protocol, use the deployment grpc channel
-            return self._send_inference_request_via_grpc_protocol(
+            # gRPC protocol, the request is sent by the gRPC runtime without holding a thread
+            grpc_channel, request = self._get_grpc_inference_request(
                 deployment_instance, data
             )
+            return util.chain_future(
+                grpc_channel.infer_future(infer_request=request, headers=None),
+                lambda future: future.result().outputs,
+            )
 
     def _send_inference_request_via_rest_protocol(
         self,
@@ -231,44 +375,106 @@ class ServingApi:
         data: Dict,
         through_hopsworks: bool = False,
     ) -> Dict:
+        _client, path_params, headers = self._get_rest_inference_route(
+            deployment_instance, through_hopsworks
+        )
+
+        with instrumentation.span(instrumentation.INFERENCE_ENCODE):
+            data = json_codec.dumps(data)
+        data = self._compress_inference_request(deployment_instance, data, headers)
+
+        # send inference request
+        try:
+            response = _client._send_request(
+                "POST", path_params, headers=headers, data=data, stream=True
+            )
+        except ConnectionError:
+            if self._is_istio_route(through_hopsworks):
+                self._invalidate_default_configuration()
+            raise
+        return self._decode_inference_response(response)
+
+    def _decode_inference_response(self, response):
+        """Decode the body of a REST inference response with the configured json backend."""
+        if len(response.content) == 0:
+            return None
+        with instrumentation.span(instrumentation.HTTP_DECODE):
+            return json_codec.loads(response.content)
+
+    def _compress_inference_request(
+        self, deployment_instance, data: bytes, headers: Dict, use_async: bool = False
+    ) -> bytes:
+        """Compress the body of a REST inference request, if enabled for the deployment."""
+        request_compression = deployment_instance._request_compression
+        if request_compression is None:
+            return data
+        with instrumentation.span(instrumentation.INFERENCE_COMPRESS):
+            return request_compression.apply(data, headers, use_async=use_async)
+
+    def _get_rest_inference_route(
+        self, deployment_instance, through_hopsworks: bool, use_async: bool = False
+    ):
+        """Get the client, path params and headers to send a REST inference request to a deployment."""
         headers = {"content-type": "application/json"}
-        if through_hopsworks:
-            # use Hopsworks client
-            _client = client.get_instance()
-            path_params = self._get_hopsworks_inference_path(
-                _client._project_id, deployment_instance
+        if self._is_istio_route(through_hopsworks):
+            # use istio client
+            _client = (
+                client.get_async_istio_instance()
+                if use_async
+                else client.get_istio_instance()
+            )
+            path_params = self._get_istio_inference_path(deployment_instance)
+            # - add host header
+            headers["host"] = self._get_inference_request_host_header(
+                client.get_istio_instance()._project_name,
+                deployment_instance.name,
+                client.get_knative_domain(),
             )
         else:
-            _client = client.get_istio_instance()
-            if _client is not None:
-                # use istio client
-                path_params = self._get_istio_inference_path(deployment_instance)
-                # - add host header
-                headers["host"] = self._get_inference_request_host_header(
-                    _client._project_name,
-                    deployment_instance.name,
-                    client.get_knative_domain(),
-                )
-            else:
-                # fallback to Hopsworks client
-                _client = client.get_instance()
-                path_params = self._get_hopsworks_inference_path(
-                    _client._project_id, deployment_instance
-                )
+            # use Hopsworks client, or fallback to it if there is no istio client
+            _client = (
+                client.get_async_instance() if use_async else client.get_instance()
+            )
+            path_params = self._get_hopsworks_inference_path(
+                client.get_instance()._project_id, deployment_instance
+            )
+        return _client, path_params, headers
 
-        # send inference request
-        return _client._send_request(
-            "POST", path_params, headers=headers, data=json.dumps(data)
-        )
+    def _is_istio_route(self, through_hopsworks: bool) -> bool:
+        """Whether REST inference requests are sent to the istio ingress gateway."""
+        return not through_hopsworks and client.get_istio_instance() is not None
+
+    def _invalidate_default_configuration(self):
+        """Remove the cached model serving configuration, e.g., when the istio ingress gateway is unreachable.
+
+        The configuration is fetched again on the next connection.
+        """
+        ConfigurationCache().remove(*get_client_cache_key())
 
     def _send_inference_request_via_grpc_protocol(
         self, deployment_instance, data: List[InferInput]
     ) -> List[InferOutput]:
+        grpc_channel, request = self._get_grpc_inference_request(
+            deployment_instance, data
+        )
+
+        # send infer request
+        infer_response = grpc_channel.infer(infer_request=request, headers=None)
+
+        # extract infer outputs
+        return infer_response.outputs
+
+    def _get_grpc_inference_request(self, deployment_instance, data: List[InferInput]):
+        """Get the gRPC channel of a deployment and build the infer request to send through it."""
         # get grpc channel
-        if deployment_instance._grpc_channel is None:
-            # The gRPC channel is lazily initialized. The first call to deployment.predict() will initialize
-            # the channel, which will be reused in all following calls on the same deployment object.
-            # The gRPC channel is freed when calling deployment.stop()
+        if (
+            deployment_instance._grpc_channel is None
+            or deployment_instance._grpc_channel.closed
+        ):
+            # The gRPC channels are lazily initialized. The first call to deployment.predict() will initialize
+            # the channels, which will be reused in all following calls on deployment objects with the same endpoint.
+            # The channels live in the registry of the istio client, shared by all deployment objects, and are
+            # closed when the deployment is deleted or the connection is closed.
             print("Initializing gRPC channel...")
             deployment_instance._grpc_channel = self._create_grpc_channel(
                 deployment_instance.name
@@ -278,14 +484,24 @@ class ServingApi:
             infer_inputs=data,
             model_name=deployment_instance.name,
         )
+        return deployment_instance._grpc_channel, request
 
-        # send infer request
-        infer_response = deployment_instance._grpc_channel.infer(
-            infer_request=request, headers=None
-        )
+    def close_grpc_channel(self, deployment_instance):
+        """Close the gRPC channels of a deployment endpoint, shared by all deployment objects with the same name.
 
-        # extract infer outputs
-        return infer_response.outputs
+        :param deployment_instance: metadata object of the deployment
+        :type deployment_instance: Deployment
+        """
+        _client = client.get_istio_instance()
+        if _client is not None:
+            _client._close_grpc_channel(
+                self._get_inference_request_host_header(
+                    _client._project_name,
+                    deployment_instance.name,
+                    client.get_knative_domain(),
+                )
+            )
+        deployment_instance._grpc_channel = None
 
     def _create_grpc_channel(self, deployment_name: str):
         _client = client.get_istio_instance()
@@ -314,38 +530,48 @@ class ServingApi:
     def get_resource_limits(self):
         """Get resource limits for model serving"""
 
-        _client = client.get_instance()
-
-        path_params = ["variables", "kube_serving_max_cores_allocation"]
-        max_cores = _client._send_request("GET", path_params)
-
-        path_params = ["variables", "kube_serving_max_memory_allocation"]
-        max_memory = _client._send_request("GET", path_params)
-
-        path_params = ["variables", "kube_serving_max_gpus_allocation"]
-        max_gpus = _client._send_request("GET", path_params)
-
+        variables = self._get_variables(
+            [
+                "kube_serving_max_cores_allocation",
+                "kube_serving_max_memory_allocation",
+                "kube_serving_max_gpus_allocation",
+            ]
+        )
         return {
-            "cores": float(max_cores["successMessage"]),
-            "memory": int(max_memory["successMessage"]),
-            "gpus": int(max_gpus["successMessage"]),
+            "cores": float(variables["kube_serving_max_cores_allocation"]),
+            "memory": int(variables["kube_serving_max_memory_allocation"]),
+            "gpus": int(variables["kube_serving_max_gpus_allocation"]),
         }
 
     def get_num_instances_limits(self):
         """Get number of instances limits for model serving"""
 
-        _client = client.get_instance()
+        variables = self._get_variables(
+            ["kube_serving_min_num_instances", "kube_serving_max_num_instances"]
+        )
+        return [
+            int(variables["kube_serving_min_num_instances"]),
+            int(variables["kube_serving_max_num_instances"]),
+        ]
 
-        path_params = ["variables", "kube_serving_min_num_instances"]
-        min_instances = _client._send_request("GET", path_params)
+    def _get_variables(self, names: List[str]):
+        """Get the value of Hopsworks variables, sending the requests concurrently.
 
-        path_params = ["variables", "kube_serving_max_num_instances"]
-        max_instances = _client._send_request("GET", path_params)
+        :param names: names of the variables
+        :type names: List[str]
+        :return: values by variable name
+        :rtype: Dict[str, str]
+        """
 
-        return [
-            int(min_instances["successMessage"]),
-            int(max_instances["successMessage"]),
-        ]
+        _client = client.get_instance()
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            variables = executor.map(
+                lambda name: _client._send_request("GET", ["variables", name]), names
+            )
+            return {
+                name: variable["successMessage"]
+                for name, variable in zip(names, variables)
+            }
 
     def get_knative_domain(self):
         """Get the domain used by knative"""
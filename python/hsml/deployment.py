@@ -13,12 +13,15 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+import threading
 from typing import Dict, List, Optional, Union
 
 from hsml import client, util
 from hsml import predictor as predictor_mod
+from hsml.client.compression import RequestCompression
 from hsml.client.exceptions import ModelServingException
 from hsml.client.istio.utils.infer_type import InferInput
+from hsml.client_batcher import ClientBatcher
 from hsml.constants import DEPLOYABLE_COMPONENT, PREDICTOR_STATE
 from hsml.core import serving_api
 from hsml.engine import serving_engine
@@ -60,6 +63,11 @@ class Deployment:
         self._serving_api = serving_api.ServingApi()
         self._serving_engine = serving_engine.ServingEngine()
         self._grpc_channel = None
+        self._client_batcher = None
+        self._micro_batcher = None
+        self._micro_batcher_lock = threading.Lock()
+        self._compression_configuration = None
+        self._request_compression = None
 
     def save(self, await_update: Optional[int] = 60):
         """Persist this deployment including the predictor and metadata to Model Serving.
@@ -105,6 +113,26 @@ class Deployment:
 
         self._serving_engine.delete(self, force)
 
+    def interrupt_await(self):
+        """Stop awaiting the deployment status in a concurrent call to `start()`, `stop()` or `save()`
+
+        The interrupted call returns while the deployment continues in the background.
+
+        !!! example
+            ```python
+            import threading
+
+            thread = threading.Thread(target=my_deployment.start, kwargs={"await_running": 600})
+            thread.start()
+
+            # return from start() without waiting for the deployment to be running
+            my_deployment.interrupt_await()
+            thread.join()
+            ```
+        """
+
+        self._serving_engine.interrupt_await()
+
     def get_state(self) -> PredictorState:
         """Get the current state of the deployment
 
@@ -167,6 +195,7 @@ class Deployment:
         self,
         data: Union[Dict, InferInput] = None,
         inputs: Union[List, Dict] = None,
+        output_format: str = "raw",
     ):
         """Send inference requests to the deployment.
            One of data or inputs parameters must be set. If both are set, inputs will be ignored.
@@ -191,17 +220,175 @@ class Deployment:
             # or using more sophisticated inference request payloads
             data = { "instances": [ my_model.input_example ], "key2": "value2" }
             predictions = my_deployment.predict(data)
+
+            # decode the predictions into a numpy array or a pandas DataFrame
+            predictions = my_deployment.predict(inputs=my_model.input_example, output_format="numpy")
+
+            # gather concurrent predictions from multiple threads into requests of up to 64 rows
+            from hsml.client_batcher import ClientBatcher
+            my_deployment.client_batcher = ClientBatcher(enabled=True, max_batch_size=64, max_latency=5)
+            ```
+
+        # Arguments
+            data: Payload dictionary for the inference request including the model input(s)
+            inputs: Model inputs used in the inference requests. For REST deployments, numpy arrays are encoded as JSON
+                straight from their buffers when orjson is installed.
+            output_format: Format of the inference response. `"raw"` returns the inference response as is, a `dict` for REST
+                deployments or a list of `InferOutput` for gRPC deployments. `"numpy"` decodes the predictions or outputs into
+                numpy arrays, returning a `dict` of arrays by output name if there are multiple outputs. `"pandas"` decodes them
+                into a pandas DataFrame with one column per output, or per output value if an output has more than one value per row.
+                Raw outputs of gRPC deployments are decoded without copies, as read-only arrays. Defaults to `"raw"`.
+
+        # Returns
+            `dict`, `List[InferOutput]`, `np.ndarray` or `pd.DataFrame`. Inference response.
+        """
+
+        return self._serving_engine.predict(self, data, inputs, output_format)
+
+    async def apredict(
+        self,
+        data: Union[Dict, InferInput] = None,
+        inputs: Union[List, Dict] = None,
+        output_format: str = "raw",
+    ):
+        """Send inference requests to the deployment, asynchronously.
+           One of data or inputs parameters must be set. If both are set, inputs will be ignored.
+
+        Same as `predict`, but REST requests are sent with an asyncio-native HTTP client and gRPC requests are awaited
+        without blocking, so a single event loop can hold many concurrent inference requests without a thread per request.
+
+        !!! example
+            ```python
+            import asyncio
+
+            # retrieve deployment by name
+            my_deployment = ms.get_deployment("my_deployment")
+
+            async def predict_all(deployment, all_inputs):
+                return await asyncio.gather(*[deployment.apredict(inputs=inputs) for inputs in all_inputs])
+
+            predictions = asyncio.run(predict_all(my_deployment, all_inputs))
             ```
 
         # Arguments
             data: Payload dictionary for the inference request including the model input(s)
             inputs: Model inputs used in the inference requests
+            output_format: Format of the inference response, `"raw"`, `"numpy"` or `"pandas"`. See `predict`. Defaults to `"raw"`.
 
         # Returns
-            `dict`. Inference response.
+            `dict`, `List[InferOutput]`, `np.ndarray` or `pd.DataFrame`. Inference response.
         """
 
-        return self._serving_engine.predict(self, data, inputs)
+        return await self._serving_engine.apredict(self, data, inputs, output_format)
+
+    def predict_future(
+        self,
+        data: Union[Dict, InferInput] = None,
+        inputs: Union[List, Dict] = None,
+        output_format: str = "raw",
+    ):
+        """Send inference requests to the deployment without blocking, returning a future of the inference response.
+           One of data or inputs parameters must be set. If both are set, inputs will be ignored.
+
+        Same as `predict`, but the call returns as soon as the request is sent. Using the gRPC protocol, requests are
+        sent by the gRPC runtime, so a single thread can keep many inference requests in flight. Using the REST
+        protocol, requests are sent from a shared thread pool.
+
+        !!! example
+            ```python
+            # retrieve deployment by name
+            my_deployment = ms.get_deployment("my_deployment")
+
+            # send all the requests, then wait for the predictions
+            futures = [my_deployment.predict_future(inputs=inputs) for inputs in all_inputs]
+            predictions = [future.result() for future in futures]
+            ```
+
+        # Arguments
+            data: Payload dictionary for the inference request including the model input(s)
+            inputs: Model inputs used in the inference requests
+            output_format: Format of the inference response, `"raw"`, `"numpy"` or `"pandas"`. See `predict`. Defaults to `"raw"`.
+
+        # Returns
+            `concurrent.futures.Future`. Future resolved with the inference response.
+        """
+
+        return self._serving_engine.predict_future(self, data, inputs, output_format)
+
+    def predict_batch(
+        self,
+        inputs,
+        batch_size: int = 1000,
+        max_batch_bytes: Optional[int] = None,
+        max_in_flight: int = 4,
+        max_retries: int = 2,
+        retry_interval: float = 1,
+        return_statistics: bool = False,
+        output_format: str = "raw",
+    ):
+        """Send the model inputs to the deployment in multiple inference requests, and concatenate the predictions.
+
+        The inputs are split into inference requests of at most `batch_size` rows, sent concurrently with at most
+        `max_in_flight` requests in flight. Predictions are returned in the same order as the inputs. Requests failing
+        with connection errors or server-side errors are retried with exponential backoff. Only deployments using
+        the REST protocol are supported.
+
+        !!! example
+            ```python
+            # retrieve deployment by name
+            my_deployment = ms.get_deployment("my_deployment")
+
+            # make predictions for all the rows of a dataframe
+            predictions = my_deployment.predict_batch(df, batch_size=500, max_in_flight=8)
+
+            # get the latency statistics of the inference requests
+            predictions, stats = my_deployment.predict_batch(df, return_statistics=True)
+            print(stats["latency_seconds"]["p99"])
+            ```
+
+        # Arguments
+            inputs: Model inputs, as a pandas DataFrame, a numpy array, a list or an iterator of rows.
+            batch_size: Maximum number of rows per inference request. Defaults to `1000`.
+            max_batch_bytes: Maximum size in bytes of the rows of each inference request, once serialized into json.
+                Defaults to `None`, no limit.
+            max_in_flight: Maximum number of inference requests sent concurrently. Defaults to `4`.
+            max_retries: Number of times to retry an inference request in case of failure. Defaults to `2`.
+            retry_interval: Waiting time in seconds before the first retry, doubled on each retry. Defaults to `1`.
+            return_statistics: Whether to also return the number of requests, rows and retries,
+                the throughput and the latency percentiles of the inference requests. Defaults to `False`.
+            output_format: Format of the concatenated predictions, `"raw"`, `"numpy"` or `"pandas"`. See `predict`.
+                Defaults to `"raw"`.
+
+        # Returns
+            `dict`, `np.ndarray` or `pd.DataFrame`. Inference response with the concatenated `predictions`. If the inference
+                responses do not contain predictions, the list of inference responses is returned instead.
+                If `return_statistics` is set, a tuple with the inference response and a `dict` of statistics.
+        # Raises
+            `ValueError`: If `batch_size` or `max_in_flight` is lower than 1.
+        """
+
+        if batch_size < 1:
+            raise ValueError(
+                "Batch size '{}' is not valid, it must be at least 1".format(batch_size)
+            )
+        if max_in_flight < 1:
+            raise ValueError(
+                "Maximum number of requests in flight '{}' is not valid, it must be at least 1".format(
+                    max_in_flight
+                )
+            )
+
+        predictions, statistics = self._serving_engine.predict_batch(
+            self,
+            inputs,
+            batch_size=batch_size,
+            max_batch_bytes=max_batch_bytes,
+            max_in_flight=max_in_flight,
+            max_retries=max_retries,
+            retry_interval=retry_interval,
+            output_format=output_format,
+        )
+        return (predictions, statistics) if return_statistics else predictions
 
     def download_artifact(self):
         """Download the model artifact served by the deployment"""
@@ -417,6 +604,40 @@ class Deployment:
     def inference_batcher(self, inference_batcher: InferenceBatcher):
         self._predictor.inference_batcher = inference_batcher
 
+    @property
+    def client_batcher(self):
+        """Configuration of the client-side batcher, gathering concurrent inference requests sent from this deployment object."""
+        return self._client_batcher
+
+    @client_batcher.setter
+    def client_batcher(self, client_batcher: Union[ClientBatcher, dict]):
+        self._client_batcher = util.get_obj_from_json(client_batcher, ClientBatcher)
+
+    @property
+    def compression_configuration(self):
+        """Configuration of the compression of REST inference requests sent from this deployment object.
+
+        The model server, or a proxy in front of it, must accept compressed request bodies.
+        `compression_configuration` can contain the following keys:
+        * key `algorithm`: compression algorithm of the request bodies, `gzip` or `zstd`. zstd requires the
+            zstandard package. If None, only compressed responses are negotiated. Default `gzip`.
+        * key `min_size`: minimum size in bytes of the request bodies to compress. Default 1024.
+        * key `level`: compression level. Default 1 for gzip and 3 for zstd.
+        * key `accept_encoding`: whether to accept compressed responses. Default True.
+
+        Set it to None to disable compression.
+        """
+        return self._compression_configuration
+
+    @compression_configuration.setter
+    def compression_configuration(self, compression_configuration: Optional[dict]):
+        self._request_compression = (
+            RequestCompression(compression_configuration)
+            if compression_configuration is not None
+            else None
+        )
+        self._compression_configuration = compression_configuration
+
     @property
     def transformer(self):
         """Transformer configured in the predictor."""
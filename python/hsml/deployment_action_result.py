@@ -0,0 +1,95 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+from typing import Optional
+
+from hsml import util
+from hsml.constants import DEPLOYMENT_ACTION
+from hsml.predictor_state import PredictorState
+
+
+class DeploymentActionResult:
+    """Outcome of an action applied to a deployment in a bulk action."""
+
+    def __init__(
+        self,
+        deployment,
+        action: str,
+        outcome: str,
+        state: Optional[PredictorState] = None,
+        error: Optional[Exception] = None,
+        elapsed: Optional[float] = None,
+    ):
+        self._deployment = deployment
+        self._action = action
+        self._outcome = outcome
+        self._state = state
+        self._error = error
+        self._elapsed = elapsed
+
+    def describe(self):
+        """Print a description of the deployment action result"""
+        util.pretty_print(self)
+
+    def to_dict(self):
+        return {
+            "deploymentName": self._deployment.name,
+            "action": self._action,
+            "outcome": self._outcome,
+            "status": self._state.status if self._state is not None else None,
+            "error": str(self._error) if self._error is not None else None,
+            "elapsed": self._elapsed,
+        }
+
+    @property
+    def deployment(self):
+        """Deployment the action was applied to."""
+        return self._deployment
+
+    @property
+    def action(self):
+        """Action applied to the deployment, `START`, `STOP` or `SAVE`."""
+        return self._action
+
+    @property
+    def outcome(self):
+        """Outcome of the action. `SUCCEEDED` if the deployment reached the desired status, `FAILED` if the action
+        could not be applied or the deployment failed, or `PENDING` if the deployment had not reached the desired
+        status within the awaiting time."""
+        return self._outcome
+
+    @property
+    def succeeded(self):
+        """Whether the deployment reached the desired status."""
+        return self._outcome == DEPLOYMENT_ACTION.OUTCOME_SUCCEEDED
+
+    @property
+    def state(self):
+        """Last known state of the deployment."""
+        return self._state
+
+    @property
+    def error(self):
+        """Error raised while applying the action, if any."""
+        return self._error
+
+    @property
+    def elapsed(self):
+        """Time in seconds from the action being applied until the deployment reached its final outcome."""
+        return self._elapsed
+
+    def __repr__(self):
+        return f"DeploymentActionResult(name: {self._deployment.name!r}, action: {self._action!r}, outcome: {self._outcome!r})"
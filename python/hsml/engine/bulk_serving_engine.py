@@ -0,0 +1,239 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from hsml.client.exceptions import ModelServingException, RestAPIError
+from hsml.constants import DEPLOYMENT, DEPLOYMENT_ACTION, PREDICTOR_STATE
+from hsml.core import serving_api
+from hsml.deployment_action_result import DeploymentActionResult
+from hsml.engine import serving_engine
+from hsml.engine.state_watcher import StateWatcher
+from tqdm.auto import tqdm
+
+
+class _Operation:
+    """Progress of an action applied to a deployment."""
+
+    def __init__(self, deployment_instance, action):
+        self.deployment = deployment_instance
+        self.action = action
+        self.status = None  # status awaited
+        self.next_action = None  # function applied once the awaited status is reached
+        self.in_flight = False
+        self.outcome = None
+        self.state = None
+        self.error = None
+        self.start_time = None
+        self.end_time = None
+
+    @property
+    def awaiting(self):
+        return self.outcome is None and not self.in_flight and self.status is not None
+
+    def finish(self, outcome, error=None):
+        if self.outcome is None:
+            self.outcome = outcome
+            self.error = error
+            self.end_time = time.monotonic()
+
+    def to_result(self):
+        start_time = (
+            self.start_time if self.start_time is not None else time.monotonic()
+        )
+        end_time = self.end_time if self.end_time is not None else time.monotonic()
+        return DeploymentActionResult(
+            self.deployment,
+            self.action,
+            self.outcome,
+            state=self.state,
+            error=self.error,
+            elapsed=end_time - start_time,
+        )
+
+
+class BulkServingEngine:
+    """Applies an action to many deployments concurrently.
+
+    Actions are applied by a pool of `max_concurrency` threads. Deployments are then awaited together by a single
+    state watcher, which fetches the state of all deployments in the project with one request per probe.
+    """
+
+    def __init__(self, max_concurrency: int = DEPLOYMENT_ACTION.MAX_CONCURRENCY):
+        self._max_concurrency = max_concurrency
+        self._serving_api = serving_api.ServingApi()
+        self._serving_engine = serving_engine.ServingEngine()
+        self._lock = threading.Lock()
+
+    def apply(self, deployments, action: str, await_status: int):
+        operations = [_Operation(deployment, action) for deployment in deployments]
+        if len(operations) == 0:
+            return []
+
+        apply_fn = {
+            DEPLOYMENT_ACTION.START: self._start,
+            DEPLOYMENT_ACTION.STOP: self._stop,
+            DEPLOYMENT_ACTION.SAVE: self._save,
+        }[action]
+
+        pbar = tqdm(total=len(operations))
+        pbar.set_description("Applying " + action.lower() + " to deployments")
+        try:
+            with ThreadPoolExecutor(max_workers=self._max_concurrency) as executor:
+                wait(
+                    [
+                        self._submit(executor, operation, apply_fn)
+                        for operation in operations
+                    ]
+                )
+                self._update_progress(pbar, operations)
+                if await_status > 0:
+                    self._await(executor, operations, await_status, pbar)
+        finally:
+            pbar.close()
+
+        for operation in operations:
+            # not reached the desired status within the awaiting time
+            operation.finish(DEPLOYMENT_ACTION.OUTCOME_PENDING)
+        return [operation.to_result() for operation in operations]
+
+    def _await(self, executor, operations, await_status, pbar):
+        watcher = StateWatcher(self._serving_api.get_states)
+        for states in watcher.watch(timeout=await_status):
+            with self._lock:
+                awaiting = [operation for operation in operations if operation.awaiting]
+            for operation in awaiting:
+                self._check_state(
+                    executor, operation, states.get(operation.deployment.id)
+                )
+            self._update_progress(pbar, operations)
+            if all(operation.outcome is not None for operation in operations):
+                return
+
+    def _check_state(self, executor, operation, state):
+        if state is None:
+            operation.finish(
+                DEPLOYMENT_ACTION.OUTCOME_FAILED,
+                error=ModelServingException("Deployment not found"),
+            )
+            return
+        operation.deployment._predictor._set_state(state)
+        operation.state = state
+        try:
+            if not self._serving_engine._check_awaited_state(state, operation.status):
+                return
+        except ModelServingException as e:
+            operation.finish(DEPLOYMENT_ACTION.OUTCOME_FAILED, error=e)
+            return
+        if operation.next_action is None:
+            operation.finish(DEPLOYMENT_ACTION.OUTCOME_SUCCEEDED)
+            return
+        # e.g., start a deployment once created
+        next_action, operation.next_action = operation.next_action, None
+        self._submit(executor, operation, next_action)
+
+    def _submit(self, executor, operation, fn):
+        with self._lock:
+            operation.in_flight = True
+        return executor.submit(self._run, operation, fn)
+
+    def _run(self, operation, fn):
+        if operation.start_time is None:
+            operation.start_time = time.monotonic()
+        try:
+            fn(operation)
+        except Exception as e:
+            operation.finish(DEPLOYMENT_ACTION.OUTCOME_FAILED, error=e)
+        finally:
+            with self._lock:
+                operation.in_flight = False
+
+    def _update_progress(self, pbar, operations):
+        done = sum(1 for operation in operations if operation.outcome is not None)
+        pbar.update(done - pbar.n)
+
+    def _get_state(self, operation):
+        state = self._serving_engine.get_state(operation.deployment)
+        operation.state = state
+        return state
+
+    def _await_status(self, operation, status, next_action=None):
+        operation.status = status
+        operation.next_action = next_action
+
+    # start
+
+    def _start(self, operation):
+        state = self._get_state(operation)
+        (done, _) = self._serving_engine._check_state(
+            state, PREDICTOR_STATE.STATUS_RUNNING
+        )
+        if done:
+            operation.finish(DEPLOYMENT_ACTION.OUTCOME_SUCCEEDED)
+        elif state.status == PREDICTOR_STATE.STATUS_CREATING:
+            # wait for preparation
+            self._await_status(
+                operation, PREDICTOR_STATE.STATUS_CREATED, next_action=self._post_start
+            )
+        else:
+            self._post_start(operation)
+
+    def _post_start(self, operation):
+        try:
+            self._serving_api.post(operation.deployment, DEPLOYMENT.ACTION_START)
+        except RestAPIError as re:
+            try:
+                self._serving_api.post(operation.deployment, DEPLOYMENT.ACTION_STOP)
+            except RestAPIError:
+                pass
+            raise re
+        self._await_status(operation, PREDICTOR_STATE.STATUS_RUNNING)
+
+    # stop
+
+    def _stop(self, operation):
+        state = self._get_state(operation)
+        (done, _) = self._serving_engine._check_state(
+            state, PREDICTOR_STATE.STATUS_STOPPED
+        )
+        if done:
+            operation.finish(DEPLOYMENT_ACTION.OUTCOME_SUCCEEDED)
+        else:
+            self._serving_api.post(operation.deployment, DEPLOYMENT.ACTION_STOP)
+            self._await_status(operation, PREDICTOR_STATE.STATUS_STOPPED)
+
+        # free grpc channel
+        operation.deployment._grpc_channel = None
+
+    # save
+
+    def _save(self, operation):
+        if operation.deployment.id is None:
+            self._serving_engine.create(operation.deployment)
+            operation.state = operation.deployment._predictor._state
+            operation.finish(DEPLOYMENT_ACTION.OUTCOME_SUCCEEDED)
+            return
+
+        state = self._get_state(operation)
+        update_running = self._serving_engine._check_update_state(state)
+        self._serving_api.put(operation.deployment)
+        if update_running:
+            # wait for the running instances to be updated
+            self._await_status(operation, PREDICTOR_STATE.STATUS_RUNNING)
+        else:
+            operation.finish(DEPLOYMENT_ACTION.OUTCOME_SUCCEEDED)
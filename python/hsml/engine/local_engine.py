@@ -52,6 +52,7 @@ class LocalEngine:
                 "max_chunk_retries",
                 self._dataset_api.DEFAULT_UPLOAD_MAX_CHUNK_RETRIES,
             ),
+            resumable=upload_configuration.get("resumable", False),
         )
 
     def download(self, remote_path: str, local_path: str):
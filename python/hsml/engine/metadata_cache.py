@@ -0,0 +1,177 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import copy
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from hsml.constants import MODEL_METADATA_CACHE
+
+
+# caches of this process, invalidated when models are saved or deleted
+_caches = weakref.WeakSet()
+_caches_lock = threading.Lock()
+
+
+def invalidate(model_registry_id, name):
+    """Drop the cached metadata of a model from all the caches of this process."""
+    with _caches_lock:
+        caches = list(_caches)
+    for cache in caches:
+        cache.invalidate(model_registry_id, name)
+
+
+class MetadataCache:
+    """In-process cache of model metadata, with a time-to-live and a maximum number of entries.
+
+    Entries are keyed by model registry id and model name, followed by the lookup arguments (e.g., version,
+    or metric and direction). Entries expire `ttl` seconds after being loaded, and the least recently used
+    entries are evicted once the cache holds `max_size` entries. The cache is disabled until `enable()` is
+    called. Values are deep copied when cached and when returned, so callers modifying a metadata object or list
+    do not change what later lookups see. Values loaded while their model is invalidated are not cached.
+    """
+
+    def __init__(self):
+        self._enabled = False
+        self._ttl = MODEL_METADATA_CACHE.TTL
+        self._max_size = MODEL_METADATA_CACHE.MAX_SIZE
+        self._entries = OrderedDict()
+        # bumped on invalidations, of all entries and of the entries of a model respectively
+        self._generation = 0
+        self._model_generations = {}
+        self._lock = threading.Lock()
+        self._statistics = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+        with _caches_lock:
+            _caches.add(self)
+
+    def enable(self, ttl: float = None, max_size: int = None):
+        with self._lock:
+            self._enabled = True
+            if ttl is not None:
+                self._ttl = ttl
+            if max_size is not None:
+                self._max_size = max_size
+            self._evict()
+
+    def disable(self):
+        with self._lock:
+            self._enabled = False
+            self._entries.clear()
+            self._generation += 1
+
+    @property
+    def enabled(self):
+        return self._enabled
+
+    def get_or_load(self, key, load_fn):
+        """Get the cached value of a key, calling `load_fn` on a miss.
+
+        :param key: tuple starting with the model registry id and model name
+        :type key: tuple
+        :param load_fn: function loading the value, which is not cached if None
+        :type load_fn: callable
+        """
+        generation = self.get_generation(key)
+        found, value = self.get(key)
+        if not found:
+            # concurrent misses on the same key load it once each, the last one is kept
+            value = load_fn()
+            self.put(key, value, generation=generation)
+        return value
+
+    def get(self, key):
+        """Get the cached value of a key, returning whether it was found and the value."""
+        if not self._enabled:
+            return False, None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self._statistics["hits"] += 1
+                    return True, self._copy(value)
+                del self._entries[key]
+                self._statistics["expirations"] += 1
+            self._statistics["misses"] += 1
+            return False, None
+
+    def get_generation(self, key):
+        """Get the generation of the model of a key, which changes when the model is invalidated."""
+        with self._lock:
+            return self._generation, self._model_generations.get(key[:2], 0)
+
+    def put(self, key, value, generation=None):
+        """Cache the value of a key, unless None or its model was invalidated since `generation`.
+
+        :param generation: generation of the model when loading the value started, see `get_generation()`
+        :type generation: tuple, optional
+        """
+        if value is None:
+            return
+        with self._lock:
+            if generation is not None and generation != (
+                self._generation,
+                self._model_generations.get(key[:2], 0),
+            ):
+                # loaded before a concurrent invalidation, the value may be stale
+                return
+            if self._enabled:
+                self._entries[key] = (time.monotonic() + self._ttl, self._copy(value))
+                self._entries.move_to_end(key)
+                self._evict()
+
+    def invalidate(self, model_registry_id=None, name=None):
+        """Drop the entries of a model, of all models in a registry if `name` is None, or all entries."""
+        with self._lock:
+            keys = [
+                key
+                for key in self._entries
+                if (model_registry_id is None or key[0] == model_registry_id)
+                and (name is None or key[1] == name)
+            ]
+            for key in keys:
+                del self._entries[key]
+            self._statistics["invalidations"] += len(keys)
+            if model_registry_id is not None and name is not None:
+                model = (model_registry_id, name)
+                self._model_generations[model] = (
+                    self._model_generations.get(model, 0) + 1
+                )
+            else:
+                self._generation += 1
+
+    def get_statistics(self):
+        """Get the cache counters and current number of entries."""
+        with self._lock:
+            return {**self._statistics, "size": len(self._entries)}
+
+    def _copy(self, value):
+        # deep copies, changing nested metadata of a copy (e.g., training metrics) does not change the cached object
+        return copy.deepcopy(value)
+
+    def _evict(self):
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self._statistics["evictions"] += 1
@@ -0,0 +1,139 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import threading
+import time
+from concurrent.futures import Future
+
+
+class _Batch:
+    def __init__(self, deadline):
+        self.deadline = deadline
+        self.n_rows = 0
+        self.payloads = []
+        self.futures = []
+
+    def add(self, payload, n_rows, future):
+        self.n_rows += n_rows
+        self.payloads.append(payload)
+        self.futures.append(future)
+
+
+class MicroBatcher:
+    """Gathers concurrent inference requests into batches sent in a single request.
+
+    Requests are grouped by a key, so that only compatible payloads are batched together. A batch is
+    sent as soon as it holds `max_batch_size` rows, or once its first request waited `max_latency`
+    milliseconds. Waiting batches are sent from a background thread, which stops when no batches
+    are left.
+
+    :param send_fn: function sending a batch, called with the batch key and the list of payloads.
+        It returns a future resolved with the list of responses, one per payload
+    :type send_fn: callable
+    """
+
+    def __init__(self, send_fn, max_batch_size: int, max_latency: float):
+        self._send_fn = send_fn
+        self._max_batch_size = max_batch_size
+        self._max_latency = max_latency / 1000
+        self._condition = threading.Condition()
+        self._batches = {}
+        self._thread = None
+
+    @property
+    def max_batch_size(self):
+        return self._max_batch_size
+
+    @property
+    def max_latency(self):
+        return self._max_latency * 1000
+
+    def submit(self, key, payload, n_rows: int) -> Future:
+        """Add a payload to the batch of its key, returning a future resolved with its response."""
+        future = Future()
+        full_batches = []
+        with self._condition:
+            batch = self._batches.get(key)
+            if batch is not None and batch.n_rows + n_rows > self._max_batch_size:
+                # the payload does not fit in the waiting batch, send it right away
+                full_batches.append(self._batches.pop(key))
+                batch = None
+            if batch is None:
+                batch = _Batch(time.monotonic() + self._max_latency)
+                self._batches[key] = batch
+            batch.add(payload, n_rows, future)
+            if batch.n_rows >= self._max_batch_size:
+                full_batches.append(self._batches.pop(key))
+            elif self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="hsml-micro-batcher", daemon=True
+                )
+                self._thread.start()
+            else:
+                self._condition.notify()
+
+        for batch in full_batches:
+            self._send(key, batch)
+        return future
+
+    def _run(self):
+        while True:
+            with self._condition:
+                due_batches = self._pop_due_batches()
+                while not due_batches:
+                    if not self._batches:
+                        self._thread = None
+                        return
+                    self._condition.wait(
+                        min(batch.deadline for batch in self._batches.values())
+                        - time.monotonic()
+                    )
+                    due_batches = self._pop_due_batches()
+
+            for key, batch in due_batches:
+                self._send(key, batch)
+
+    def _pop_due_batches(self):
+        now = time.monotonic()
+        due_keys = [
+            key for key, batch in self._batches.items() if batch.deadline <= now
+        ]
+        return [(key, self._batches.pop(key)) for key in due_keys]
+
+    def _send(self, key, batch):
+        try:
+            responses_future = self._send_fn(key, batch.payloads)
+        except BaseException as e:
+            for future in batch.futures:
+                self._set_exception(future, e)
+            return
+
+        def _on_done(responses_future):
+            try:
+                responses = responses_future.result()
+            except BaseException as e:
+                for future in batch.futures:
+                    self._set_exception(future, e)
+                return
+            for future, response in zip(batch.futures, responses):
+                if future.set_running_or_notify_cancel():
+                    future.set_result(response)
+
+        responses_future.add_done_callback(_on_done)
+
+    def _set_exception(self, future, exception):
+        if future.set_running_or_notify_cancel():
+            future.set_exception(exception)
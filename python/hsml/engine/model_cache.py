@@ -0,0 +1,235 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Exclusive lock on a file, shared across processes."""
+
+    def __init__(self, path):
+        self._path = path
+        self._file = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        self._file = open(self._path, "a+")
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, type, value, traceback):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+
+
+class ModelCache:
+    """Size-bounded local cache of model files, shared by all processes on a host.
+
+    Entries are keyed by Hopsworks instance, model registry id, model name and version. Models are
+    downloaded into a temporary folder inside the cache and atomically renamed into place once
+    complete, so a cached entry is always a complete copy of the model files. When the cache
+    exceeds its maximum size, the least recently used entries are evicted. Entries used within
+    the grace period are never evicted, since their files may still be loaded by another process,
+    so the cache can temporarily exceed its maximum size. Models bigger than the maximum size are
+    not cached, and are downloaded into a temporary folder instead.
+
+    The cache folder, maximum size (in megabytes) and grace period (in seconds) can be set with
+    the `HSML_MODEL_CACHE_DIR`, `HSML_MODEL_CACHE_MAX_SIZE` and `HSML_MODEL_CACHE_GRACE_PERIOD`
+    environment variables.
+    """
+
+    CACHE_DIR_ENV = "HSML_MODEL_CACHE_DIR"
+    CACHE_MAX_SIZE_ENV = "HSML_MODEL_CACHE_MAX_SIZE"
+    CACHE_GRACE_PERIOD_ENV = "HSML_MODEL_CACHE_GRACE_PERIOD"
+
+    DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".hsml", "models")
+    DEFAULT_CACHE_MAX_SIZE = 10240  # megabytes
+    DEFAULT_CACHE_GRACE_PERIOD = 600  # seconds
+
+    ENTRY_METADATA_FILE = ".hsml_cache_entry.json"
+
+    def __init__(self, cache_dir=None, max_size=None, grace_period=None):
+        self._cache_dir = (
+            cache_dir
+            if cache_dir is not None
+            else os.environ.get(self.CACHE_DIR_ENV, self.DEFAULT_CACHE_DIR)
+        )
+        max_size = (
+            max_size
+            if max_size is not None
+            else int(
+                os.environ.get(self.CACHE_MAX_SIZE_ENV, self.DEFAULT_CACHE_MAX_SIZE)
+            )
+        )
+        self._max_size_bytes = max_size * 1024 * 1024
+        self._grace_period = (
+            grace_period
+            if grace_period is not None
+            else float(
+                os.environ.get(
+                    self.CACHE_GRACE_PERIOD_ENV, self.DEFAULT_CACHE_GRACE_PERIOD
+                )
+            )
+        )
+        self._entries_dir = os.path.join(self._cache_dir, "entries")
+        self._locks_dir = os.path.join(self._cache_dir, "locks")
+        self._tmp_dir = os.path.join(self._cache_dir, "tmp")
+
+    def get_or_download(self, host, model_registry_id, name, version, download_fn):
+        """Get the local path of a cached model, downloading it with `download_fn` on a miss.
+
+        :param download_fn: function downloading the model files into the local path passed as argument
+        :type download_fn: callable
+        :return: local path to the model files, outside the cache if bigger than its maximum size
+        :rtype: str
+        """
+        key = self._get_key(host, model_registry_id, name, version)
+        entry_path = os.path.join(self._entries_dir, key)
+        model_path = os.path.join(entry_path, name, str(version))
+
+        # fast path, entries are only visible once complete
+        if self._touch(entry_path):
+            return model_path
+
+        # only one process downloads a given model, the others wait and reuse it
+        with FileLock(os.path.join(self._locks_dir, key + ".lock")):
+            if self._touch(entry_path):
+                return model_path
+
+            tmp_entry_path = os.path.join(self._tmp_dir, key + "-" + str(uuid.uuid4()))
+            tmp_model_path = os.path.join(tmp_entry_path, name, str(version))
+            os.makedirs(tmp_model_path)
+            try:
+                download_fn(tmp_model_path)
+                size = self._get_size(tmp_entry_path)
+                if size > self._max_size_bytes:
+                    # caching the model would evict all other entries, move it out of the cache
+                    uncached_path = os.path.join(
+                        tempfile.gettempdir(), str(uuid.uuid4())
+                    )
+                    shutil.move(tmp_entry_path, uncached_path)
+                    return os.path.join(uncached_path, name, str(version))
+                with open(
+                    os.path.join(tmp_entry_path, self.ENTRY_METADATA_FILE), "w"
+                ) as f:
+                    json.dump(
+                        {
+                            "model_registry_id": model_registry_id,
+                            "name": name,
+                            "version": version,
+                            "size": size,
+                        },
+                        f,
+                    )
+                with FileLock(os.path.join(self._locks_dir, "cache.lock")):
+                    self._evict(self._max_size_bytes - size)
+                    os.makedirs(self._entries_dir, exist_ok=True)
+                    os.rename(tmp_entry_path, entry_path)
+            finally:
+                if os.path.exists(tmp_entry_path):
+                    shutil.rmtree(tmp_entry_path, ignore_errors=True)
+
+        return model_path
+
+    def remove(self, host, model_registry_id, name, version):
+        """Remove a model from the cache, if present."""
+        key = self._get_key(host, model_registry_id, name, version)
+        entry_path = os.path.join(self._entries_dir, key)
+        if not os.path.exists(entry_path):
+            return
+        with FileLock(os.path.join(self._locks_dir, "cache.lock")):
+            self._remove_entry(entry_path)
+
+    def _get_key(self, host, model_registry_id, name, version):
+        key = json.dumps([host, model_registry_id, name, str(version)])
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _touch(self, entry_path):
+        """Mark an entry as recently used, returning whether it exists."""
+        try:
+            os.utime(os.path.join(entry_path, self.ENTRY_METADATA_FILE))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _get_size(self, path):
+        size = 0
+        for root, _, files in os.walk(path):
+            for f_name in files:
+                size += os.path.getsize(os.path.join(root, f_name))
+        return size
+
+    def _evict(self, max_size_bytes):
+        """Evict least recently used entries until the cache size is at most `max_size_bytes`."""
+        if not os.path.isdir(self._entries_dir):
+            return
+        entries = []
+        total_size = 0
+        for key in os.listdir(self._entries_dir):
+            metadata_path = os.path.join(
+                self._entries_dir, key, self.ENTRY_METADATA_FILE
+            )
+            try:
+                with open(metadata_path, "r") as f:
+                    size = json.load(f)["size"]
+                last_used = os.path.getmtime(metadata_path)
+            except (OSError, ValueError, KeyError):
+                continue
+            entries.append((last_used, size, key))
+            total_size += size
+
+        # entries used recently may still be loading, e.g., by the process that got their path
+        min_last_used = time.time() - self._grace_period
+        for last_used, size, key in sorted(entries):
+            if total_size <= max_size_bytes or last_used > min_last_used:
+                break
+            self._remove_entry(os.path.join(self._entries_dir, key))
+            total_size -= size
+
+    def _remove_entry(self, entry_path):
+        if not os.path.exists(entry_path):
+            return
+        # rename first, so the entry disappears atomically before its files are deleted
+        removed_path = os.path.join(
+            self._tmp_dir, os.path.basename(entry_path) + "-" + str(uuid.uuid4())
+        )
+        os.makedirs(self._tmp_dir, exist_ok=True)
+        os.rename(entry_path, removed_path)
+        shutil.rmtree(removed_path, ignore_errors=True)
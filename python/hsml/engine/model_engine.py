@@ -14,21 +14,54 @@
 #   limitations under the License.
 #
 
+import hashlib
 import importlib
 import json
 import os
 import tempfile
+import threading
 import time
 import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from hsml import client, constants, util
 from hsml.client.exceptions import ModelRegistryException, RestAPIError
 from hsml.core import dataset_api, model_api
-from hsml.engine import hopsworks_engine, local_engine
+from hsml.engine import hopsworks_engine, local_engine, metadata_cache, model_cache
 from tqdm.auto import tqdm
 
 
+class _InflightBytesLimiter:
+    """Bound the total size of the files being uploaded at the same time."""
+
+    def __init__(self, max_bytes):
+        self._max_bytes = max_bytes
+        self._inflight_bytes = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, num_bytes):
+        with self._cond:
+            # files bigger than the limit are let through once nothing else is in flight
+            self._cond.wait_for(
+                lambda: (
+                    self._inflight_bytes == 0
+                    or self._inflight_bytes + num_bytes <= self._max_bytes
+                )
+            )
+            self._inflight_bytes += num_bytes
+
+    def release(self, num_bytes):
+        with self._cond:
+            self._inflight_bytes -= num_bytes
+            self._cond.notify_all()
+
+
 class ModelEngine:
+    DEFAULT_UPLOAD_SIMULTANEOUS_FILES = 4
+    DEFAULT_UPLOAD_MAX_INFLIGHT_SIZE = 1024
+    DEFAULT_DOWNLOAD_CONCURRENCY = 4
+    FILE_HASH_BLOCK_SIZE = 1024 * 1024
+
     def __init__(self):
         self._model_api = model_api.ModelApi()
         self._dataset_api = dataset_api.DatasetApi()
@@ -142,59 +175,75 @@ class ModelEngine:
             n_files += 1
             update_upload_progress(n_dirs=n_dirs, n_files=n_files)
 
-    def _download_model_from_hopsfs_recursive(
-        self,
-        from_hdfs_model_path: str,
-        to_local_path: str,
-        update_download_progress,
-        n_dirs,
-        n_files,
-    ):
-        """Download model files from a model path in hdfs, recursively"""
-
+    def _list_model_dir(self, from_hdfs_model_path: str, to_local_path: str):
+        """List a model folder in hdfs, returning the (is_dir, hdfs path, local path) of its entries."""
+        entries = []
         for entry in self._dataset_api.list(from_hdfs_model_path, sort_by="NAME:desc")[
             "items"
         ]:
             path_attr = entry["attributes"]
             path = path_attr["path"]
             basename = os.path.basename(path)
-
-            if path_attr.get("dir", False):
-                # otherwise, make a recursive call for the folder
-                if basename == "Artifacts":
-                    continue  # skip Artifacts subfolder
-                local_folder_path = os.path.join(to_local_path, basename)
-                os.mkdir(local_folder_path)
-                n_dirs, n_files = self._download_model_from_hopsfs_recursive(
-                    from_hdfs_model_path=path,
-                    to_local_path=local_folder_path,
-                    update_download_progress=update_download_progress,
-                    n_dirs=n_dirs,
-                    n_files=n_files,
-                )
-                n_dirs += 1
-                update_download_progress(n_dirs=n_dirs, n_files=n_files)
-            else:
-                # if it's a file, download it
-                local_file_path = os.path.join(to_local_path, basename)
-                self._engine.download(path, local_file_path)
-                n_files += 1
-                update_download_progress(n_dirs=n_dirs, n_files=n_files)
-
-        return n_dirs, n_files
+            is_dir = path_attr.get("dir", False)
+            if is_dir and basename == "Artifacts":
+                continue  # skip Artifacts subfolder
+            if (
+                not is_dir
+                and basename == constants.MODEL_REGISTRY.MODEL_FILES_CHECKSUMS
+            ):
+                continue  # skip checksums recorded for delta uploads
+            entries.append((is_dir, path, os.path.join(to_local_path, basename)))
+        return entries
 
     def _download_model_from_hopsfs(
-        self, from_hdfs_model_path: str, to_local_path: str, update_download_progress
+        self,
+        from_hdfs_model_path: str,
+        to_local_path: str,
+        update_download_progress,
+        concurrency: int = DEFAULT_DOWNLOAD_CONCURRENCY,
     ):
-        """Download model files from a model path in hdfs."""
-
-        n_dirs, n_files = self._download_model_from_hopsfs_recursive(
-            from_hdfs_model_path=from_hdfs_model_path,
-            to_local_path=to_local_path,
-            update_download_progress=update_download_progress,
-            n_dirs=0,
-            n_files=0,
-        )
+        """Download model files from a model path in hdfs.
+
+        Folder listings and file downloads are tasks of a work queue processed by a bounded pool of workers.
+        Every listed folder is created locally before scheduling the listing of its content.
+        """
+        n_dirs, n_files = 0, 0
+
+        client.get_instance()._ensure_connection_pool_size(concurrency)
+        executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+        # map each pending task to whether it lists a folder, and whether that folder is a subfolder
+        tasks = {
+            executor.submit(
+                self._list_model_dir, from_hdfs_model_path, to_local_path
+            ): (True, False)
+        }
+        try:
+            while tasks:
+                done, _ = wait(tasks, return_when=FIRST_COMPLETED)
+                for future in done:
+                    is_listing, is_subfolder = tasks.pop(future)
+                    result = future.result()
+                    if not is_listing:
+                        n_files += 1
+                    elif is_subfolder:
+                        n_dirs += 1
+                    update_download_progress(n_dirs=n_dirs, n_files=n_files)
+
+                    for is_dir, path, local_path in result if is_listing else []:
+                        if is_dir:
+                            os.mkdir(local_path)
+                            tasks[
+                                executor.submit(self._list_model_dir, path, local_path)
+                            ] = (True, True)
+                        else:
+                            tasks[
+                                executor.submit(self._engine.download, path, local_path)
+                            ] = (False, False)
+        finally:
+            for future in tasks:
+                future.cancel()
+            executor.shutdown(wait=True)
+
         update_download_progress(n_dirs=n_dirs, n_files=n_files, done=True)
 
     def _upload_local_model(
@@ -205,39 +254,213 @@ class ModelEngine:
         upload_configuration=None,
     ):
         """Copy or upload model files from a local path to the model version folder in the Models dataset."""
-        n_dirs, n_files = 0, 0
+        upload_configuration = upload_configuration if upload_configuration else {}
+        n_dirs = 0
+        local_files = []
         if os.path.isdir(from_local_model_path):
-            # if path is a dir, upload files and folders iteratively
+            # if path is a dir, create all folders first and then upload the files in parallel
             for root, dirs, files in os.walk(from_local_model_path):
                 # os.walk(local_model_path), where local_model_path is expected to be an absolute path
                 # - root is the absolute path of the directory being walked
                 # - dirs is the list of directory names present in the root dir
                 # - files is the list of file names present in the root dir
                 # we need to replace the local path prefix with the hdfs path prefix (i.e., /srv/hops/....../root with /Projects/.../)
+                # os.walk is top-down, so parent folders are always created before their children
                 remote_base_path = root.replace(
                     from_local_model_path, to_model_version_path
                 )
                 for d_name in dirs:
                     self._engine.mkdir(remote_base_path + "/" + d_name)
                     n_dirs += 1
-                    update_upload_progress(n_dirs, n_files)
+                    update_upload_progress(n_dirs, 0)
                 for f_name in files:
-                    self._engine.upload(
-                        root + "/" + f_name,
-                        remote_base_path,
-                        upload_configuration=upload_configuration,
+                    local_file_path = root + "/" + f_name
+                    relative_path = os.path.relpath(
+                        local_file_path, from_local_model_path
+                    ).replace(os.sep, "/")
+                    local_files.append(
+                        (local_file_path, remote_base_path, relative_path)
                     )
-                    n_files += 1
-                    update_upload_progress(n_dirs, n_files)
         else:
             # if path is a file, upload file
-            self._engine.upload(
-                from_local_model_path,
-                to_model_version_path,
-                upload_configuration=upload_configuration,
+            local_files.append(
+                (
+                    from_local_model_path,
+                    to_model_version_path,
+                    os.path.basename(from_local_model_path),
+                )
             )
-            n_files += 1
-            update_upload_progress(n_dirs, n_files)
+
+        base_checksums = None
+        if upload_configuration.get("delta", False):
+            base_checksums = self._get_base_version_checksums(
+                to_model_version_path, upload_configuration.get("base_version")
+            )
+
+        checksums = self._upload_local_files(
+            local_files,
+            n_dirs,
+            update_upload_progress,
+            upload_configuration=upload_configuration,
+            base_checksums=base_checksums,
+        )
+
+        if base_checksums is not None:
+            # record the checksums, so this version can be the base of later delta uploads
+            self._upload_model_files_checksums(checksums, to_model_version_path)
+
+    def _upload_local_files(
+        self,
+        local_files,
+        n_dirs,
+        update_upload_progress,
+        upload_configuration=None,
+        base_checksums=None,
+    ):
+        """Upload a list of (local file path, remote folder path, relative path) tuples using a bounded pool of workers.
+
+        The number of files uploaded at the same time is limited by the `simultaneous_files` key
+        of the upload configuration, and their total size by the `max_inflight_size` key (in megabytes).
+
+        If `base_checksums` is provided, the content hash of each file is computed before uploading it, and
+        files with the same content as a file of the base model version are copied on the server instead.
+        Returns the content hashes of the files by relative path, or None if `base_checksums` is not provided.
+        """
+        upload_configuration = upload_configuration if upload_configuration else {}
+        simultaneous_files = upload_configuration.get(
+            "simultaneous_files", self.DEFAULT_UPLOAD_SIMULTANEOUS_FILES
+        )
+        max_inflight_bytes = (
+            upload_configuration.get(
+                "max_inflight_size", self.DEFAULT_UPLOAD_MAX_INFLIGHT_SIZE
+            )
+            * 1024
+            * 1024
+        )
+
+        # keep a pooled connection for each chunk in flight across all files
+        client.get_instance()._ensure_connection_pool_size(
+            max(1, simultaneous_files)
+            * upload_configuration.get(
+                "simultaneous_uploads",
+                dataset_api.DatasetApi.DEFAULT_UPLOAD_SIMULTANEOUS_UPLOADS,
+            )
+        )
+
+        limiter = _InflightBytesLimiter(max_inflight_bytes)
+        progress_lock = threading.Lock()
+        errors = []
+        checksums = {} if base_checksums is not None else None
+        n_files = 0
+
+        def upload_file(local_file_path, remote_path, relative_path, file_size):
+            nonlocal n_files
+            try:
+                base_file_path = None
+                if base_checksums is not None:
+                    checksum = self._hash_file(local_file_path)
+                    with progress_lock:
+                        checksums[relative_path] = checksum
+                    base_file_path = base_checksums.get(checksum)
+                if base_file_path is not None:
+                    # unchanged file, copy it from the base model version
+                    self._engine.copy(
+                        base_file_path,
+                        remote_path + "/" + os.path.basename(local_file_path),
+                    )
+                else:
+                    self._engine.upload(
+                        local_file_path,
+                        remote_path,
+                        upload_configuration=upload_configuration,
+                    )
+            except BaseException as be:
+                errors.append(be)
+                raise be
+            finally:
+                limiter.release(file_size)
+            # counters are updated and reported under the lock, so progress is never reported out of order
+            with progress_lock:
+                n_files += 1
+                update_upload_progress(n_dirs, n_files)
+
+        executor = ThreadPoolExecutor(max_workers=max(1, simultaneous_files))
+        futures = []
+        try:
+            for local_file_path, remote_path, relative_path in local_files:
+                file_size = os.path.getsize(local_file_path)
+                limiter.acquire(file_size)
+                if errors:
+                    # stop scheduling uploads as soon as one of them fails
+                    limiter.release(file_size)
+                    break
+                futures.append(
+                    executor.submit(
+                        upload_file,
+                        local_file_path,
+                        remote_path,
+                        relative_path,
+                        file_size,
+                    )
+                )
+            for future in futures:
+                future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+        return checksums
+
+    def _hash_file(self, local_file_path):
+        """Compute the SHA-256 hash of a local file, reading it in blocks."""
+        file_hash = hashlib.sha256()
+        with open(local_file_path, "rb") as f:
+            for block in iter(lambda: f.read(self.FILE_HASH_BLOCK_SIZE), b""):
+                file_hash.update(block)
+        return file_hash.hexdigest()
+
+    def _get_base_version_checksums(self, to_model_version_path, base_version=None):
+        """Get the checksums recorded for a base model version, mapping each content hash to the path of a file in that version.
+
+        If no base version is provided, the highest version lower than the one being saved is used.
+        """
+        model_name_path, version = to_model_version_path.rsplit("/", 1)
+        if base_version is None:
+            for item in self._dataset_api.list(model_name_path, sort_by="NAME:desc")[
+                "items"
+            ]:
+                try:
+                    current_version = int(os.path.basename(item["attributes"]["path"]))
+                except ValueError:
+                    continue
+                if current_version < int(version) and (
+                    base_version is None or current_version > base_version
+                ):
+                    base_version = current_version
+            if base_version is None:
+                return {}
+
+        base_version_path = model_name_path + "/" + str(base_version)
+        checksums = self._read_remote_json(
+            base_version_path + "/" + constants.MODEL_REGISTRY.MODEL_FILES_CHECKSUMS
+        )
+        if checksums is None:
+            # base version saved without delta uploads, all files are uploaded
+            return {}
+        return {
+            checksum: base_version_path + "/" + relative_path
+            for relative_path, checksum in checksums["files"].items()
+        }
+
+    def _upload_model_files_checksums(self, checksums, to_model_version_path):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            checksums_path = os.path.join(
+                tmp_dir, constants.MODEL_REGISTRY.MODEL_FILES_CHECKSUMS
+            )
+            with open(checksums_path, "w") as out:
+                json.dump({"algorithm": "sha256", "files": checksums}, out)
+            self._engine.upload(checksums_path, to_model_version_path)
 
     def _save_model_from_local_or_hopsfs_mount(
         self,
@@ -437,17 +660,44 @@ class ModelEngine:
                 self._dataset_api.rm(model_instance.version_path)
                 raise be
 
+        # new versions change the model versions and the best model
+        metadata_cache.invalidate(model_instance.model_registry_id, model_instance.name)
+
         print("Model created, explore it at " + model_instance.get_url())
 
         return model_instance
 
-    def download(self, model_instance):
+    def download(
+        self,
+        model_instance,
+        concurrency=None,
+        use_cache=False,
+    ):
+        if concurrency is None:
+            concurrency = self.DEFAULT_DOWNLOAD_CONCURRENCY
+
+        if use_cache:
+            return model_cache.ModelCache().get_or_download(
+                client.get_instance()._base_url,
+                model_instance.model_registry_id,
+                model_instance._name,
+                model_instance._version,
+                lambda model_version_path: self._download_model(
+                    model_instance, model_version_path, concurrency
+                ),
+            )
+
         model_name_path = os.path.join(
             tempfile.gettempdir(), str(uuid.uuid4()), model_instance._name
         )
         model_version_path = model_name_path + "/" + str(model_instance._version)
         os.makedirs(model_version_path)
 
+        self._download_model(model_instance, model_version_path, concurrency)
+
+        return model_version_path
+
+    def _download_model(self, model_instance, model_version_path, concurrency):
         def update_download_progress(n_dirs, n_files, done=False):
             print(
                 "Downloading model artifact (%s dirs, %s files)... %s"
@@ -465,12 +715,11 @@ class ModelEngine:
                 from_hdfs_model_path=from_hdfs_model_path,
                 to_local_path=model_version_path,
                 update_download_progress=update_download_progress,
+                concurrency=concurrency,
             )
         except BaseException as be:
             raise be
 
-        return model_version_path
-
     def read_file(self, model_instance, resource):
         hdfs_resource_path = self._build_resource_path(
             model_instance, os.path.basename(resource)
@@ -492,10 +741,15 @@ class ModelEngine:
 
     def read_json(self, model_instance, resource):
         hdfs_resource_path = self._build_resource_path(model_instance, resource)
+        return self._read_remote_json(hdfs_resource_path)
+
+    def _read_remote_json(self, hdfs_resource_path):
         if self._dataset_api.path_exists(hdfs_resource_path):
             try:
                 tmp_dir = tempfile.TemporaryDirectory(dir=os.getcwd())
-                local_resource_path = os.path.join(tmp_dir.name, resource)
+                local_resource_path = os.path.join(
+                    tmp_dir.name, os.path.basename(hdfs_resource_path)
+                )
                 self._engine.download(
                     hdfs_resource_path,
                     local_resource_path,
@@ -508,6 +762,14 @@ class ModelEngine:
 
     def delete(self, model_instance):
         self._engine.delete(model_instance)
+        metadata_cache.invalidate(model_instance.model_registry_id, model_instance.name)
+        # a new model could be registered with the same version, drop the local copy if cached
+        model_cache.ModelCache().remove(
+            client.get_instance()._base_url,
+            model_instance.model_registry_id,
+            model_instance._name,
+            model_instance._version,
+        )
 
     def set_tag(self, model_instance, name, value):
         """Attach a name/value tag to a model."""
@@ -14,16 +14,26 @@
 #   limitations under the License.
 #
 
+import asyncio
+import itertools
 import os
+import sys
+import threading
 import time
 import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Union
 
+import numpy as np
 from hsml import util
+from hsml.client import instrumentation, json_codec
 from hsml.client.exceptions import ModelServingException, RestAPIError
-from hsml.client.istio.utils.infer_type import InferInput
+from hsml.client.istio.utils.infer_type import InferInput, InferOutput
+from hsml.client.istio.utils.numpy_codec import to_np_dtype
 from hsml.constants import (
     DEPLOYMENT,
+    INFERENCE_OUTPUT_FORMAT,
     PREDICTOR,
     PREDICTOR_STATE,
 )
@@ -31,6 +41,9 @@ from hsml.constants import (
     INFERENCE_ENDPOINTS as IE,
 )
 from hsml.core import dataset_api, serving_api
+from hsml.engine.micro_batcher import MicroBatcher
+from hsml.engine.state_watcher import StateWatcher
+from requests.exceptions import ConnectionError, Timeout
 from tqdm.auto import tqdm
 
 
@@ -50,48 +63,85 @@ class ServingEngine:
     def __init__(self):
         self._serving_api = serving_api.ServingApi()
         self._dataset_api = dataset_api.DatasetApi()
+        self._state_watchers = set()
+        self._state_watchers_lock = threading.Lock()
 
     def _poll_deployment_status(
-        self, deployment_instance, status: str, await_status: int, update_progress=None
+        self,
+        deployment_instance,
+        status: str,
+        await_status: int,
+        update_progress=None,
+        previous_state=None,
     ):
         if await_status > 0:
-            sleep_seconds = 5
-            for _ in range(int(await_status / sleep_seconds)):
-                time.sleep(sleep_seconds)
-                state = deployment_instance.get_state()
-                num_instances = self._get_available_instances(state)
-                if update_progress is not None:
-                    update_progress(state, num_instances)
-                if state.status == status:
-                    return state  # deployment reached desired status
-                elif (
-                    status == PREDICTOR_STATE.STATUS_RUNNING
-                    and state.status == PREDICTOR_STATE.STATUS_FAILED
-                ):
-                    error_msg = state.condition.reason
-                    if (
-                        state.condition.type
-                        == PREDICTOR_STATE.CONDITION_TYPE_INITIALIZED
-                        or state.condition.type
-                        == PREDICTOR_STATE.CONDITION_TYPE_STARTED
-                    ):
-                        component = (
-                            "transformer"
-                            if "transformer" in state.condition.reason
-                            else "predictor"
-                        )
-                        error_msg += (
-                            ". Please, check the server logs using `.get_logs(component='"
-                            + component
-                            + "')`"
-                        )
-                    raise ModelServingException(error_msg)
+            watcher = StateWatcher(deployment_instance.get_state)
+            with self._state_watchers_lock:
+                self._state_watchers.add(watcher)
+            try:
+                state = deployment_instance._predictor._state
+                changed = previous_state is None
+                for state in watcher.watch(timeout=await_status):
+                    num_instances = self._get_available_instances(state)
+                    if update_progress is not None:
+                        update_progress(state, num_instances)
+                    # probes sent right after a request can still see the previous state
+                    changed = changed or self._is_state_changed(state, previous_state)
+                    if changed and self._check_awaited_state(state, status):
+                        return state  # deployment reached desired status
+                if watcher.interrupted:
+                    return state  # stopped awaiting with `interrupt_await()`
+            finally:
+                with self._state_watchers_lock:
+                    self._state_watchers.discard(watcher)
             raise ModelServingException(
                 "Deployment has not reached the desired status within the expected awaiting time. Check the current status by using `.get_state()`, "
                 + "explore the server logs using `.get_logs()` or set a higher value for await_"
                 + status.lower()
             )
 
+    def interrupt_await(self):
+        """Stop awaiting the status of deployments in concurrent calls to start, stop or update."""
+        with self._state_watchers_lock:
+            for watcher in self._state_watchers:
+                watcher.interrupt()
+
+    def _is_state_changed(self, state, previous_state):
+        """Check whether a deployment left its previous status or revision."""
+        return (
+            state.status != previous_state.status
+            or state.revision != previous_state.revision
+        )
+
+    def _check_awaited_state(self, state, status):
+        """Check whether a deployment reached the awaited status, raising if it failed to start."""
+        if state.status == status:
+            return True
+        if (
+            status == PREDICTOR_STATE.STATUS_RUNNING
+            and state.status == PREDICTOR_STATE.STATUS_FAILED
+        ):
+            raise ModelServingException(self._get_failed_state_message(state))
+        return False
+
+    def _get_failed_state_message(self, state):
+        error_msg = state.condition.reason
+        if (
+            state.condition.type == PREDICTOR_STATE.CONDITION_TYPE_INITIALIZED
+            or state.condition.type == PREDICTOR_STATE.CONDITION_TYPE_STARTED
+        ):
+            component = (
+                "transformer"
+                if "transformer" in state.condition.reason
+                else "predictor"
+            )
+            error_msg += (
+                ". Please, check the server logs using `.get_logs(component='"
+                + component
+                + "')`"
+            )
+        return error_msg
+
     def start(self, deployment_instance, await_status: int) -> bool:
         (done, state) = self._check_status(
             deployment_instance, PREDICTOR_STATE.STATUS_RUNNING
@@ -124,6 +174,11 @@ class ServingEngine:
                         await_status,
                         update_progress,
                     )
+                    if (
+                        state is not None
+                        and state.status != PREDICTOR_STATE.STATUS_CREATED
+                    ):
+                        return  # stopped awaiting the preparation
 
                 self._serving_api.post(
                     deployment_instance, DEPLOYMENT.ACTION_START
@@ -188,23 +243,35 @@ class ServingEngine:
         if state is None:
             return (True, None)
 
+        (done, msg) = self._check_state(state, desired_status)
+        if msg is not None:
+            print(msg)
+        return (done, state)
+
+    def _check_state(self, state, desired_status):
+        """Check whether a deployment has to be started or stopped to reach the desired status.
+
+        :return: whether the deployment is already in or moving to the desired status, and why
+        :rtype: (bool, str)
+        :raises ModelServingException: if the deployment cannot be started or stopped in its current state
+        """
+
         # desired status: running
         if desired_status == PREDICTOR_STATE.STATUS_RUNNING:
             if (
                 state.status == PREDICTOR_STATE.STATUS_RUNNING
                 or state.status == PREDICTOR_STATE.STATUS_IDLE
             ):
-                print("Deployment is already running")
-                return (True, state)
+                return (True, "Deployment is already running")
             if state.status == PREDICTOR_STATE.STATUS_STARTING:
-                print("Deployment is already starting")
-                return (True, state)
+                return (True, "Deployment is already starting")
             if state.status == PREDICTOR_STATE.STATUS_UPDATING:
-                print("Deployments is already running and updating")
-                return (True, state)
+                return (True, "Deployments is already running and updating")
             if state.status == PREDICTOR_STATE.STATUS_FAILED:
-                print("Deployment is in failed state. " + state.condition.reason)
-                return (True, state)
+                return (
+                    True,
+                    "Deployment is in failed state. " + state.condition.reason,
+                )
             if state.status == PREDICTOR_STATE.STATUS_STOPPING:
                 raise ModelServingException(
                     "Deployment is stopping, please wait until it completely stops"
@@ -217,11 +284,9 @@ class ServingEngine:
                 or state.status == PREDICTOR_STATE.STATUS_CREATED
                 or state.status == PREDICTOR_STATE.STATUS_STOPPED
             ):
-                print("Deployment is already stopped")
-                return (True, state)
+                return (True, "Deployment is already stopped")
             if state.status == PREDICTOR_STATE.STATUS_STOPPING:
-                print("Deployment is already stopping")
-                return (True, state)
+                return (True, "Deployment is already stopping")
             if state.status == PREDICTOR_STATE.STATUS_STARTING:
                 if state.condition is not None:
                     raise ModelServingException(
@@ -233,7 +298,7 @@ class ServingEngine:
                         "Deployment is updating, please wait until the update completes"
                     )
 
-        return (False, state)
+        return (False, None)
 
     def _get_starting_progress(self, current_step, state, num_instances):
         if state.condition is None:  # backward compatibility
@@ -386,6 +451,32 @@ class ServingEngine:
         if state is None:
             return
 
+        if self._check_update_state(state):
+            # if running, it's fine
+            self._serving_api.put(deployment_instance)
+            print("Deployment updated, applying changes to running instances...")
+            # running instances are updated once the deployment leaves its current state
+            state = self._poll_deployment_status(  # wait for status
+                deployment_instance,
+                PREDICTOR_STATE.STATUS_RUNNING,
+                await_update,
+                previous_state=state,
+            )
+            if state is not None:
+                if state.status == PREDICTOR_STATE.STATUS_RUNNING:
+                    print("Running instances updated successfully")
+        else:
+            # if stopped, it's fine
+            self._serving_api.put(deployment_instance)
+            print("Deployment updated, explore it at " + deployment_instance.get_url())
+
+    def _check_update_state(self, state):
+        """Check whether a deployment can be updated in its current state.
+
+        :return: whether the changes are applied to running instances of the deployment
+        :rtype: bool
+        :raises ModelServingException: if the deployment cannot be updated in its current state
+        """
         if state.status == PREDICTOR_STATE.STATUS_STARTING:
             # if starting, it cannot be updated yet
             raise ModelServingException(
@@ -397,16 +488,7 @@ class ServingEngine:
             or state.status == PREDICTOR_STATE.STATUS_IDLE
             or state.status == PREDICTOR_STATE.STATUS_FAILED
         ):
-            # if running, it's fine
-            self._serving_api.put(deployment_instance)
-            print("Deployment updated, applying changes to running instances...")
-            state = self._poll_deployment_status(  # wait for status
-                deployment_instance, PREDICTOR_STATE.STATUS_RUNNING, await_update
-            )
-            if state is not None:
-                if state.status == PREDICTOR_STATE.STATUS_RUNNING:
-                    print("Running instances updated successfully")
-            return
+            return True
         if state.status == PREDICTOR_STATE.STATUS_UPDATING:
             # if updating, it cannot be updated yet
             raise ModelServingException(
@@ -423,10 +505,7 @@ class ServingEngine:
             or state.status == PREDICTOR_STATE.STATUS_CREATED
             or state.status == PREDICTOR_STATE.STATUS_STOPPED
         ):
-            # if stopped, it's fine
-            self._serving_api.put(deployment_instance)
-            print("Deployment updated, explore it at " + deployment_instance.get_url())
-            return
+            return False
 
         raise ValueError("Unknown deployment status: " + state.status)
 
@@ -454,6 +533,7 @@ class ServingEngine:
             )
 
         self._serving_api.delete(deployment_instance)
+        self._serving_api.close_grpc_channel(deployment_instance)
         print("Deployment deleted successfully")
 
     def get_state(self, deployment_instance):
@@ -501,36 +581,491 @@ class ServingEngine:
         deployment_instance,
         data: Union[Dict, List[InferInput]],
         inputs: Union[Dict, List[Dict]],
+        output_format: str = INFERENCE_OUTPUT_FORMAT.RAW,
     ):
-        # validate user-provided payload
-        self._validate_inference_payload(deployment_instance.api_protocol, data, inputs)
-
-        # build inference payload based on API protocol
-        payload = self._build_inference_payload(
-            deployment_instance.api_protocol, data, inputs
+        if self._is_client_batching_enabled(deployment_instance):
+            return self.predict_future(
+                deployment_instance, data, inputs, output_format
+            ).result()
+
+        self._validate_output_format(output_format)
+        payload, through_hopsworks = self._prepare_inference_request(
+            deployment_instance, data, inputs
         )
+        try:
+            response = self._serving_api.send_inference_request(
+                deployment_instance, payload, through_hopsworks
+            )
+        except RestAPIError as re:
+            self._raise_inference_error(re)
+        return self._format_inference_response(response, output_format)
 
-        # if not KServe, send request through Hopsworks
-        serving_tool = deployment_instance.predictor.serving_tool
-        through_hopsworks = serving_tool != PREDICTOR.SERVING_TOOL_KSERVE
+    async def apredict(
+        self,
+        deployment_instance,
+        data: Union[Dict, List[InferInput]],
+        inputs: Union[Dict, List[Dict]],
+        output_format: str = INFERENCE_OUTPUT_FORMAT.RAW,
+    ):
+        if self._is_client_batching_enabled(deployment_instance):
+            return await asyncio.wrap_future(
+                self.predict_future(deployment_instance, data, inputs, output_format)
+            )
+
+        self._validate_output_format(output_format)
+        payload, through_hopsworks = self._prepare_inference_request(
+            deployment_instance, data, inputs
+        )
         try:
-            return self._serving_api.send_inference_request(
+            response = await self._serving_api.asend_inference_request(
                 deployment_instance, payload, through_hopsworks
             )
         except RestAPIError as re:
+            self._raise_inference_error(re)
+        return self._format_inference_response(response, output_format)
+
+    def predict_future(
+        self,
+        deployment_instance,
+        data: Union[Dict, List[InferInput]],
+        inputs: Union[Dict, List[Dict]],
+        output_format: str = INFERENCE_OUTPUT_FORMAT.RAW,
+    ):
+        self._validate_output_format(output_format)
+        payload, through_hopsworks = self._prepare_inference_request(
+            deployment_instance, data, inputs
+        )
+
+        def _on_response(response_future):
+            try:
+                response = response_future.result()
+            except RestAPIError as re:
+                self._raise_inference_error(re)
+            return self._format_inference_response(response, output_format)
+
+        return util.chain_future(
+            self._send_inference_request_future(
+                deployment_instance, payload, through_hopsworks
+            ),
+            _on_response,
+        )
+
+    def _send_inference_request_future(
+        self, deployment_instance, payload, through_hopsworks: bool
+    ):
+        """Send an inference request without blocking, through the client-side batcher if enabled."""
+        if self._is_client_batching_enabled(deployment_instance):
+            batch_key, n_rows = self._get_micro_batch_key(
+                deployment_instance.api_protocol, payload, through_hopsworks
+            )
+            micro_batcher = self._get_micro_batcher(deployment_instance)
+            if batch_key is not None and n_rows < micro_batcher.max_batch_size:
+                return micro_batcher.submit(batch_key, payload, n_rows)
+        return self._serving_api.send_inference_request_future(
+            deployment_instance, payload, through_hopsworks
+        )
+
+    def _is_client_batching_enabled(self, deployment_instance):
+        client_batcher = deployment_instance.client_batcher
+        return client_batcher is not None and client_batcher.enabled
+
+    def _get_micro_batcher(self, deployment_instance):
+        """Get the micro-batcher of a deployment object, (re)creating it if its configuration changed."""
+        client_batcher = deployment_instance.client_batcher
+        with deployment_instance._micro_batcher_lock:
+            micro_batcher = deployment_instance._micro_batcher
             if (
-                re.response.status_code == RestAPIError.STATUS_CODE_NOT_FOUND
-                or re.error_code
-                == ModelServingException.ERROR_CODE_DEPLOYMENT_NOT_RUNNING
+                micro_batcher is None
+                or micro_batcher.max_batch_size != client_batcher.max_batch_size
+                or micro_batcher.max_latency != client_batcher.max_latency
             ):
+                micro_batcher = deployment_instance._micro_batcher = MicroBatcher(
+                    lambda batch_key, payloads: self._send_micro_batch(
+                        deployment_instance, batch_key, payloads
+                    ),
+                    client_batcher.max_batch_size,
+                    client_batcher.max_latency,
+                )
+            return micro_batcher
+
+    def _get_micro_batch_key(self, api_protocol, payload, through_hopsworks: bool):
+        """Get the key of the payloads a payload can be batched with and its number of rows, or None if it cannot be batched."""
+        if api_protocol == IE.API_PROTOCOL_REST:
+            # only payloads with nothing but instances can be merged
+            if isinstance(payload, Dict) and list(payload.keys()) == ["instances"]:
+                return (through_hopsworks,), len(payload["instances"])
+            return None, 0
+
+        # gRPC protocol, inputs are concatenated along their first dimension
+        infer_inputs = payload if isinstance(payload, List) else [payload]
+        n_rows = {
+            infer_input.shape[0] if len(infer_input.shape) > 0 else None
+            for infer_input in infer_inputs
+        }
+        if len(n_rows) != 1 or None in n_rows:
+            return None, 0
+        batch_key = (through_hopsworks,) + tuple(
+            (infer_input.name, infer_input.datatype, tuple(infer_input.shape[1:]))
+            for infer_input in infer_inputs
+        )
+        return batch_key, n_rows.pop()
+
+    def _send_micro_batch(self, deployment_instance, batch_key, payloads):
+        """Merge payloads into a single inference request, returning a future of the split responses."""
+        through_hopsworks = batch_key[0]
+        if deployment_instance.api_protocol == IE.API_PROTOCOL_REST:
+            sizes = [len(payload["instances"]) for payload in payloads]
+            merged_payload = {
+                "instances": [
+                    instance
+                    for payload in payloads
+                    for instance in payload["instances"]
+                ]
+            }
+        else:
+            payloads = [
+                payload if isinstance(payload, List) else [payload]
+                for payload in payloads
+            ]
+            sizes = [payload[0].shape[0] for payload in payloads]
+            merged_payload = [
+                self._concat_infer_inputs([payload[i] for payload in payloads])
+                for i in range(len(payloads[0]))
+            ]
+
+        return util.chain_future(
+            self._serving_api.send_inference_request_future(
+                deployment_instance, merged_payload, through_hopsworks
+            ),
+            lambda future: self._split_micro_batch_response(future.result(), sizes),
+        )
+
+    def _concat_infer_inputs(self, infer_inputs: List[InferInput]):
+        array = np.concatenate([infer_input.as_numpy() for infer_input in infer_inputs])
+        merged_input = InferInput(
+            infer_inputs[0].name, list(array.shape), infer_inputs[0].datatype
+        )
+        merged_input.set_data_from_numpy(array, binary_data=True)
+        return merged_input
+
+    def _split_micro_batch_response(self, response, sizes: List[int]):
+        """Split the response of a merged inference request into one response per payload."""
+        offsets = list(itertools.accumulate([0] + sizes))
+        if isinstance(response, Dict):
+            # REST protocol, one prediction per instance
+            predictions = response.get("predictions")
+            if not isinstance(predictions, List) or len(predictions) != offsets[-1]:
                 raise ModelServingException(
-                    "Deployment not created or running. If it is already created, start it by using `.start()` or check its status with .get_state()"
-                ) from re
+                    "Inference response of the client-side batch cannot be split, it does not contain one prediction per instance. "
+                    "Disable the client-side batcher for this deployment."
+                )
+            return [
+                {**response, "predictions": predictions[start:end]}
+                for start, end in zip(offsets, offsets[1:])
+            ]
+
+        # gRPC protocol, outputs are split along their first dimension
+        arrays = [output.as_numpy() for output in response]
+        if any(array.ndim == 0 or len(array) != offsets[-1] for array in arrays):
+            raise ModelServingException(
+                "Inference response of the client-side batch cannot be split, its outputs do not have one row per input row. "
+                "Disable the client-side batcher for this deployment."
+            )
+        responses = []
+        for start, end in zip(offsets, offsets[1:]):
+            outputs = []
+            for output, array in zip(response, arrays):
+                split_output = InferOutput(
+                    output.name, list(array[start:end].shape), output.datatype
+                )
+                split_output.set_data_from_numpy(array[start:end], binary_data=True)
+                outputs.append(split_output)
+            responses.append(outputs)
+        return responses
+
+    def _validate_output_format(self, output_format: str):
+        if output_format not in (
+            INFERENCE_OUTPUT_FORMAT.RAW,
+            INFERENCE_OUTPUT_FORMAT.NUMPY,
+            INFERENCE_OUTPUT_FORMAT.PANDAS,
+        ):
+            raise ValueError(
+                "Output format '{}' is not valid. Possible values are '{}', '{}' and '{}'.".format(
+                    output_format,
+                    INFERENCE_OUTPUT_FORMAT.RAW,
+                    INFERENCE_OUTPUT_FORMAT.NUMPY,
+                    INFERENCE_OUTPUT_FORMAT.PANDAS,
+                )
+            )
 
-            re.args = (
-                re.args[0] + "\n\n Check the model server logs by using `.get_logs()`",
+    def _format_inference_response(self, response, output_format: str):
+        """Decode an inference response into numpy arrays or a pandas DataFrame, or return it as is."""
+        if output_format == INFERENCE_OUTPUT_FORMAT.RAW:
+            return response
+
+        if isinstance(response, List) and all(
+            isinstance(output, InferOutput) for output in response
+        ):
+            # gRPC protocol, raw output contents are decoded as views over the response buffers
+            arrays = {output.name: output.as_numpy() for output in response}
+        elif isinstance(response, Dict) and "outputs" in response:
+            # REST protocol, KServe v2 response
+            arrays = {
+                output["name"]: np.asarray(
+                    output["data"], dtype=to_np_dtype(output["datatype"])
+                ).reshape(output["shape"])
+                for output in response["outputs"]
+            }
+        elif isinstance(response, Dict) and "predictions" in response:
+            # REST protocol, KServe v1 response
+            predictions = response["predictions"]
+            if (
+                output_format == INFERENCE_OUTPUT_FORMAT.PANDAS
+                and len(predictions) > 0
+                and isinstance(predictions[0], Dict)
+            ):
+                import pandas as pd
+
+                return pd.DataFrame.from_records(predictions)
+            arrays = {"predictions": np.asarray(predictions)}
+        else:
+            raise ModelServingException(
+                "Inference response cannot be converted to {}, it does not contain predictions or outputs. "
+                "Use the '{}' output format instead.".format(
+                    output_format, INFERENCE_OUTPUT_FORMAT.RAW
+                )
             )
-            raise re
+
+        if output_format == INFERENCE_OUTPUT_FORMAT.NUMPY:
+            # single outputs are returned as an array, multiple outputs by name
+            return next(iter(arrays.values())) if len(arrays) == 1 else arrays
+
+        # pandas is only loaded when requested as output format
+        import pandas as pd
+
+        columns = []
+        for name, array in arrays.items():
+            # one column per output, or per value if the output has more than one value per row
+            array = (
+                array.reshape(array.shape[0], int(np.prod(array.shape[1:])))
+                if array.ndim > 0
+                else array.reshape(1, 1)
+            )
+            columns.append(
+                pd.DataFrame(
+                    array,
+                    columns=[name]
+                    if array.shape[1] == 1
+                    else ["{}_{}".format(name, i) for i in range(array.shape[1])],
+                    copy=False,
+                )
+            )
+        return columns[0] if len(columns) == 1 else pd.concat(columns, axis=1)
+
+    def predict_batch(
+        self,
+        deployment_instance,
+        inputs,
+        batch_size: int,
+        max_batch_bytes: int,
+        max_in_flight: int,
+        max_retries: int,
+        retry_interval: float,
+        output_format: str = INFERENCE_OUTPUT_FORMAT.RAW,
+    ):
+        """Split the inputs into inference requests of at most `batch_size` rows and `max_batch_bytes` bytes,
+        sent concurrently with at most `max_in_flight` requests in flight.
+
+        Returns the concatenated predictions, in the same order as the inputs, and the batch statistics.
+        """
+        if deployment_instance.api_protocol != IE.API_PROTOCOL_REST:
+            raise ModelServingException(
+                "Batch predictions are only supported for deployments with REST protocol."
+            )
+        self._validate_output_format(output_format)
+
+        # if not KServe, send request through Hopsworks
+        serving_tool = deployment_instance.predictor.serving_tool
+        through_hopsworks = serving_tool != PREDICTOR.SERVING_TOOL_KSERVE
+
+        stats_lock = threading.Lock()
+        latencies = []
+        n_retries, n_rows = 0, 0
+
+        def predict_chunk(rows):
+            nonlocal n_retries
+            payload = {"instances": rows}
+            for attempt in itertools.count():
+                start = time.perf_counter()
+                try:
+                    response = self._serving_api.send_inference_request(
+                        deployment_instance, payload, through_hopsworks
+                    )
+                    with stats_lock:
+                        latencies.append(time.perf_counter() - start)
+                    return response
+                except (RestAPIError, ConnectionError, Timeout) as e:
+                    if attempt >= max_retries or not self._is_retryable_error(e):
+                        if isinstance(e, RestAPIError):
+                            self._raise_inference_error(e)
+                        raise e
+                    with stats_lock:
+                        n_retries += 1
+                    time.sleep(retry_interval * 2**attempt)
+
+        pbar = tqdm(
+            total=len(inputs) if hasattr(inputs, "__len__") else None,
+            unit=" rows",
+            desc="Sending batch inference requests",
+        )
+        start = time.perf_counter()
+        responses = []
+        executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        in_flight = deque()
+        try:
+            # sliding window of in-flight requests, whose responses are collected in order
+            for rows in self._split_batch_inputs(inputs, batch_size, max_batch_bytes):
+                if len(in_flight) >= max_in_flight:
+                    responses.append(self._wait_batch_chunk(in_flight, pbar))
+                in_flight.append((executor.submit(predict_chunk, rows), len(rows)))
+                n_rows += len(rows)
+            while in_flight:
+                responses.append(self._wait_batch_chunk(in_flight, pbar))
+        finally:
+            for future, _ in in_flight:
+                future.cancel()
+            executor.shutdown(wait=True)
+            pbar.close()
+        elapsed = time.perf_counter() - start
+
+        statistics = {
+            "requests": len(responses),
+            "rows": n_rows,
+            "retries": n_retries,
+            "elapsed_seconds": elapsed,
+            "rows_per_second": n_rows / elapsed if elapsed > 0 else None,
+            "latency_seconds": util.get_latency_statistics(latencies),
+        }
+        return (
+            self._format_inference_response(
+                self._concat_batch_responses(responses), output_format
+            ),
+            statistics,
+        )
+
+    def _split_batch_inputs(self, inputs, batch_size: int, max_batch_bytes: int):
+        """Yield lists of rows with at most `batch_size` rows and, if set, `max_batch_bytes` bytes once serialized."""
+        # dataframes can only be passed if pandas was already imported, do not import it otherwise
+        pd = sys.modules.get("pandas")
+        is_dataframe = pd is not None and isinstance(inputs, pd.DataFrame)
+
+        if max_batch_bytes is None and (is_dataframe or isinstance(inputs, np.ndarray)):
+            # slice arrays and dataframes directly, slices are encoded as json without converting them to lists
+            values = inputs.to_numpy() if is_dataframe else inputs
+            if values.ndim == 1:
+                # each instance should be a list, wrap single values
+                values = values.reshape(-1, 1)
+            for offset in range(0, len(values), batch_size):
+                yield values[offset : offset + batch_size]
+            return
+
+        if is_dataframe:
+            inputs = inputs.itertuples(index=False, name=None)
+
+        rows, rows_bytes = [], 0
+        for row in inputs:
+            row = self._to_batch_row(row)
+            row_bytes = (
+                len(json_codec.dumps(row)) + 1 if max_batch_bytes is not None else 0
+            )
+            if rows and (
+                len(rows) >= batch_size
+                or (
+                    max_batch_bytes is not None
+                    and rows_bytes + row_bytes > max_batch_bytes
+                )
+            ):
+                yield rows
+                rows, rows_bytes = [], 0
+            rows.append(row)
+            rows_bytes += row_bytes
+        if rows:
+            yield rows
+
+    def _to_batch_row(self, row):
+        if isinstance(row, np.ndarray):
+            row = row.tolist()
+        elif isinstance(row, tuple):
+            row = list(row)
+        # each instance should be a list, wrap single values
+        return row if isinstance(row, (List, Dict)) else [row]
+
+    def _wait_batch_chunk(self, in_flight, pbar):
+        future, n_rows = in_flight.popleft()
+        response = future.result()
+        pbar.update(n_rows)
+        return response
+
+    def _is_retryable_error(self, error):
+        if isinstance(error, RestAPIError):
+            # server-side errors might be transient, client-side errors are not
+            return error.response.status_code // 100 == 5
+        return True  # connection errors and timeouts
+
+    def _concat_batch_responses(self, responses):
+        """Concatenate the predictions of the inference responses, or return the list of responses if they have no predictions."""
+        if all(
+            isinstance(response, Dict) and "predictions" in response
+            for response in responses
+        ):
+            return {
+                "predictions": [
+                    prediction
+                    for response in responses
+                    for prediction in response["predictions"]
+                ]
+            }
+        return responses
+
+    def _prepare_inference_request(
+        self,
+        deployment_instance,
+        data: Union[Dict, List[InferInput]],
+        inputs: Union[Dict, List[Dict]],
+    ):
+        """Validate and build the inference payload, returning it along with whether to send it through Hopsworks."""
+        with instrumentation.span(
+            instrumentation.INFERENCE_BUILD_PAYLOAD,
+            deployment=deployment_instance.name,
+        ):
+            # validate user-provided payload
+            self._validate_inference_payload(
+                deployment_instance.api_protocol, data, inputs
+            )
+
+            # build inference payload based on API protocol
+            payload = self._build_inference_payload(
+                deployment_instance.api_protocol, data, inputs
+            )
+
+        # if not KServe, send request through Hopsworks
+        serving_tool = deployment_instance.predictor.serving_tool
+        through_hopsworks = serving_tool != PREDICTOR.SERVING_TOOL_KSERVE
+        return payload, through_hopsworks
+
+    def _raise_inference_error(self, re: RestAPIError):
+        if (
+            re.response.status_code == RestAPIError.STATUS_CODE_NOT_FOUND
+            or re.error_code == ModelServingException.ERROR_CODE_DEPLOYMENT_NOT_RUNNING
+        ):
+            raise ModelServingException(
+                "Deployment not created or running. If it is already created, start it by using `.start()` or check its status with .get_state()"
+            ) from re
+
+        re.args = (
+            re.args[0] + "\n\n Check the model server logs by using `.get_logs()`",
+        )
+        raise re
 
     def _validate_inference_payload(
         self,
@@ -565,7 +1100,16 @@ class ServingEngine:
                     )
 
                 payload = data["instances"] if "instances" in data else data["inputs"]
-                if not isinstance(payload, List):
+                if isinstance(payload, np.ndarray):
+                    if payload.ndim < 2:
+                        raise ModelServingException(
+                            "Instances field should contain a 2-dim list."
+                        )
+                    elif payload.size == 0:
+                        raise ModelServingException(
+                            "Inference data cannot contain an empty list."
+                        )
+                elif not isinstance(payload, List):
                     raise ModelServingException(
                         "Instances field should contain a 2-dim list."
                     )
@@ -629,6 +1173,11 @@ class ServingEngine:
             raise ModelServingException(
                 "Inference inputs cannot be of type `InferInput`. Use the `data` parameter instead."
             )
+        elif isinstance(inputs, np.ndarray) and api_protocol == IE.API_PROTOCOL_REST:
+            if inputs.size == 0:
+                raise ModelServingException(
+                    "Inference inputs cannot be an empty array."
+                )
         elif isinstance(inputs, Dict):
             required_keys = ("name", "shape", "datatype", "data")
             if api_protocol == IE.API_PROTOCOL_GRPC and not all(
@@ -664,7 +1213,14 @@ class ServingEngine:
         self, api_protocol, inputs: Union[Dict, List[Dict]], recursive_call=False
     ):
         if api_protocol == IE.API_PROTOCOL_REST:  # REST protocol
-            if not isinstance(inputs, List):
+            if isinstance(inputs, np.ndarray):
+                # arrays are encoded as json as is, wrap them in a 2-dim array if needed
+                data = {
+                    "instances": inputs
+                    if inputs.ndim >= 2
+                    else inputs.reshape(1, inputs.size)
+                }
+            elif not isinstance(inputs, List):
                 data = {"instances": [[inputs]]}  # wrap inputs in a 2-dim list
             else:
                 data = {"instances": inputs}  # use given inputs list by default
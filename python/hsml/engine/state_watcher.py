@@ -0,0 +1,99 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import random
+import threading
+import time
+
+from hsml.constants import DEPLOYMENT_STATE_WATCHER
+
+
+class Backoff:
+    """Exponentially growing intervals, capped at `max_interval` seconds.
+
+    Each interval is randomly shifted by up to `jitter` times its length, so that clients waiting
+    on deployments started at the same time do not probe the server in lockstep.
+    """
+
+    def __init__(
+        self,
+        initial_interval: float = DEPLOYMENT_STATE_WATCHER.INITIAL_INTERVAL,
+        max_interval: float = DEPLOYMENT_STATE_WATCHER.MAX_INTERVAL,
+        multiplier: float = DEPLOYMENT_STATE_WATCHER.MULTIPLIER,
+        jitter: float = DEPLOYMENT_STATE_WATCHER.JITTER,
+    ):
+        self._initial_interval = initial_interval
+        self._max_interval = max_interval
+        self._multiplier = multiplier
+        self._jitter = jitter
+        self._interval = initial_interval
+
+    def next(self) -> float:
+        """Get the next interval in seconds."""
+        interval = self._interval
+        self._interval = min(self._interval * self._multiplier, self._max_interval)
+        return interval * (1 + random.uniform(-self._jitter, self._jitter))
+
+    def reset(self):
+        self._interval = self._initial_interval
+
+
+class StateWatcher:
+    """Probes the state of one or more deployments until a deadline, with an adaptive backoff.
+
+    First probes are sent shortly after the watch starts, so that fast state transitions are seen
+    right away, and the interval between probes grows exponentially for slower ones. The serving
+    API has no long-poll or streaming endpoint for state changes, so states are probed with regular
+    requests. Waits between probes can be interrupted from another thread with `interrupt()`.
+
+    :param get_state: function probing the state, called without arguments
+    :type get_state: callable
+    :param backoff: intervals between probes, defaults to `Backoff()`
+    :type backoff: Backoff, optional
+    """
+
+    def __init__(self, get_state, backoff: Backoff = None):
+        self._get_state = get_state
+        self._backoff = backoff if backoff is not None else Backoff()
+        self._interrupted = threading.Event()
+
+    def watch(self, timeout: float):
+        """Probe the state until `timeout` seconds have elapsed or the watcher is interrupted.
+
+        :param timeout: maximum time to watch in seconds
+        :type timeout: float
+        :return: generator of the probed states, stopping the watch when closed
+        :rtype: Generator
+        """
+        deadline = time.monotonic() + timeout
+        self._backoff.reset()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            # the last probe is sent right at the deadline
+            if self._interrupted.wait(min(self._backoff.next(), remaining)):
+                return
+            yield self._get_state()
+
+    def interrupt(self):
+        """Stop waiting for the next probe, ending the watch."""
+        self._interrupted.set()
+
+    @property
+    def interrupted(self):
+        """Whether the watch was interrupted."""
+        return self._interrupted.is_set()
@@ -123,6 +123,11 @@ class Model:
                 * key `chunk_size`: size of each chunk in megabytes. Default 10.
                 * key `simultaneous_uploads`: number of chunks to upload in parallel. Default 3.
                 * key `max_chunk_retries`: number of times to retry the upload of a chunk in case of failure. Default 1.
+                * key `simultaneous_files`: number of model files to upload in parallel. Default 4.
+                * key `max_inflight_size`: maximum total size in megabytes of the model files being uploaded in parallel. Default 1024.
+                * key `resumable`: whether to keep track of the uploaded chunks in a local manifest, so that calling `save()` again after a failure skips the chunks already uploaded. Default False.
+                * key `delta`: whether to compare the content hashes of the model files with the ones recorded for a base model version, copying identical files on the server instead of uploading them. Default False.
+                * key `base_version`: model version to compare the model files with when `delta` is enabled. Default the highest version lower than the one being saved.
 
         # Returns
             `Model`: The model metadata object.
@@ -135,13 +140,24 @@ class Model:
             upload_configuration=upload_configuration,
         )
 
-    def download(self):
+    def download(self, concurrency: Optional[int] = None, use_cache: bool = False):
         """Download the model files.
 
+        # Arguments
+            concurrency: Number of model folders listed and model files downloaded in parallel. Default 4.
+            use_cache: Whether to use the local model cache shared by all processes on this host. If the model
+                version is already cached, the path to the cached model files is returned without downloading them.
+                Cached model files should not be modified. The cache location and maximum size (in megabytes) can be
+                set with the `HSML_MODEL_CACHE_DIR` and `HSML_MODEL_CACHE_MAX_SIZE` environment variables. Models bigger
+                than the maximum size are not cached.
+                Default False.
+
         # Returns
             `str`: Absolute path to local folder containing the model files.
         """
-        return self._model_engine.download(self)
+        return self._model_engine.download(
+            self, concurrency=concurrency, use_cache=use_cache
+        )
 
     def delete(self):
         """Delete the model
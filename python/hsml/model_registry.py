@@ -15,10 +15,12 @@
 #
 
 import warnings
+from typing import Optional
 
 import humps
 from hsml import util
 from hsml.core import model_api
+from hsml.engine import metadata_cache
 from hsml.python import signature as python_signature  # noqa: F401
 from hsml.sklearn import signature as sklearn_signature  # noqa: F401
 from hsml.tensorflow import signature as tensorflow_signature  # noqa: F401
@@ -43,6 +45,7 @@ class ModelRegistry:
         self._model_registry_id = model_registry_id
 
         self._model_api = model_api.ModelApi()
+        self._metadata_cache = metadata_cache.MetadataCache()
 
         self._tensorflow = tensorflow_signature
         self._python = python_signature
@@ -84,13 +87,65 @@ class ModelRegistry:
             )
             version = self.DEFAULT_VERSION
 
-        return self._model_api.get(
-            name,
-            version,
-            self.model_registry_id,
-            shared_registry_project_name=self.shared_registry_project_name,
+        return self._metadata_cache.get_or_load(
+            (self.model_registry_id, name, "model", version),
+            lambda: self._model_api.get(
+                name,
+                version,
+                self.model_registry_id,
+                shared_registry_project_name=self.shared_registry_project_name,
+            ),
         )
 
+    async def aget_model(self, name: str, version: int = None):
+        """Get a model entity from the model registry, asynchronously.
+
+        Same as `get_model`, but the request is sent with an asyncio-native HTTP client, so many models
+        can be retrieved concurrently from a single event loop.
+
+        !!! example
+            ```python
+            import asyncio
+
+            async def get_models(mr, name, versions):
+                return await asyncio.gather(*[mr.aget_model(name, version) for version in versions])
+
+            models = asyncio.run(get_models(mr, "my_model", [1, 2, 3]))
+            ```
+
+        # Arguments
+            name: Name of the model to get.
+            version: Version of the model to retrieve, defaults to `None` and will
+                return the `version=1`.
+        # Returns
+            `Model`: The model metadata object.
+        # Raises
+            `RestAPIError`: If unable to retrieve model from the model registry.
+        """
+
+        if version is None:
+            warnings.warn(
+                "No version provided for getting model `{}`, defaulting to `{}`.".format(
+                    name, self.DEFAULT_VERSION
+                ),
+                util.VersionWarning,
+                stacklevel=1,
+            )
+            version = self.DEFAULT_VERSION
+
+        key = (self.model_registry_id, name, "model", version)
+        generation = self._metadata_cache.get_generation(key)
+        found, model = self._metadata_cache.get(key)
+        if not found:
+            model = await self._model_api.aget(
+                name,
+                version,
+                self.model_registry_id,
+                shared_registry_project_name=self.shared_registry_project_name,
+            )
+            self._metadata_cache.put(key, model, generation=generation)
+        return model
+
     def get_models(self, name: str):
         """Get all model entities from the model registry for a specified name.
         Getting all models from the Model Registry for a given name returns a list of model entities, one for each version registered under
@@ -104,10 +159,13 @@ class ModelRegistry:
             `RestAPIError`: If unable to retrieve model versions from the model registry.
         """
 
-        return self._model_api.get_models(
-            name,
-            self.model_registry_id,
-            shared_registry_project_name=self.shared_registry_project_name,
+        return self._metadata_cache.get_or_load(
+            (self.model_registry_id, name, "models"),
+            lambda: self._model_api.get_models(
+                name,
+                self.model_registry_id,
+                shared_registry_project_name=self.shared_registry_project_name,
+            ),
         )
 
     def get_best_model(self, name: str, metric: str, direction: str):
@@ -126,6 +184,12 @@ class ModelRegistry:
             `RestAPIError`: If unable to retrieve model from the model registry.
         """
 
+        return self._metadata_cache.get_or_load(
+            (self.model_registry_id, name, "best_model", metric, direction),
+            lambda: self._get_best_model(name, metric, direction),
+        )
+
+    def _get_best_model(self, name: str, metric: str, direction: str):
         model = self._model_api.get_models(
             name,
             self.model_registry_id,
@@ -138,6 +202,59 @@ class ModelRegistry:
         else:
             return None
 
+    def enable_metadata_cache(
+        self, ttl: Optional[float] = None, max_size: Optional[int] = None
+    ):
+        """Cache the metadata retrieved with `get_model`, `get_models` and `get_best_model` in memory.
+
+        Cached metadata is reused for `ttl` seconds, saving a request to the model registry on every lookup
+        of the same model. The cached metadata of a model is dropped when a model with the same name is saved or
+        deleted from this process, but changes made from other processes are only seen once the entries expire.
+        Lookups return copies of the cached metadata, so modifying a model object does not change the cached one.
+
+        !!! example
+            ```python
+            # login into Hopsworks using hopsworks.login()
+
+            # get Hopsworks Model Registry handle
+            mr = project.get_model_registry()
+
+            mr.enable_metadata_cache(ttl=300)
+
+            my_model = mr.get_model("my_model", version=1)  # sends a request
+            my_model = mr.get_model("my_model", version=1)  # served from the cache
+
+            mr.get_metadata_cache_statistics()
+            ```
+
+        # Arguments
+            ttl: Time in seconds cached metadata is reused for. Defaults to `60`, or the previous value if already enabled.
+            max_size: Maximum number of lookups cached, the least recently used are dropped first.
+                Defaults to `1024`, or the previous value if already enabled.
+        """
+        self._metadata_cache.enable(ttl=ttl, max_size=max_size)
+
+    def disable_metadata_cache(self):
+        """Stop caching model metadata, and drop the cached metadata."""
+        self._metadata_cache.disable()
+
+    def invalidate_metadata_cache(self, name: Optional[str] = None):
+        """Drop the cached metadata of a model, or of all models.
+
+        # Arguments
+            name: Name of the model to drop the cached metadata of. Defaults to `None`, dropping all cached metadata.
+        """
+        self._metadata_cache.invalidate(self.model_registry_id, name)
+
+    def get_metadata_cache_statistics(self):
+        """Get the statistics of the metadata cache.
+
+        # Returns
+            `dict`: The number of `hits`, `misses`, `expirations`, `evictions` and `invalidations` of cached entries,
+                and the current number of entries as `size`.
+        """
+        return self._metadata_cache.get_statistics()
+
     @property
     def project_name(self):
         """Name of the project the registry is connected to."""
@@ -14,13 +14,15 @@
 #   limitations under the License.
 #
 
-from typing import Optional, Union
+from typing import List, Optional, Union
 
 from hsml import util
-from hsml.constants import ARTIFACT_VERSION, PREDICTOR_STATE
+from hsml.constants import ARTIFACT_VERSION, DEPLOYMENT_ACTION, PREDICTOR_STATE
 from hsml.constants import INFERENCE_ENDPOINTS as IE
 from hsml.core import serving_api
 from hsml.deployment import Deployment
+from hsml.deployment_action_result import DeploymentActionResult
+from hsml.engine.bulk_serving_engine import BulkServingEngine
 from hsml.inference_batcher import InferenceBatcher
 from hsml.inference_logger import InferenceLogger
 from hsml.model import Model
@@ -352,6 +354,71 @@ class ModelServing:
 
         return Deployment(predictor=predictor, name=name)
 
+    def bulk_action(
+        self,
+        deployments: List[Deployment],
+        action: str,
+        await_status: Optional[int] = 60,
+        max_concurrency: Optional[int] = None,
+    ) -> List[DeploymentActionResult]:
+        """Start, stop or save many deployments at once.
+
+        The action is applied to up to `max_concurrency` deployments concurrently. Deployments are then awaited
+        together, fetching the state of all deployments in the project with a single request per check. Errors
+        are not raised, but returned in the result of the deployment they occurred in.
+
+        !!! example
+            ```python
+            # login into Hopsworks using hopsworks.login()
+
+            # get Hopsworks Model Serving handle
+            ms = project.get_model_serving()
+
+            # restart all deployments serving a model
+            deployments = ms.get_deployments(my_model)
+            ms.bulk_action(deployments, "stop")
+            results = ms.bulk_action(deployments, "start", await_status=600)
+
+            for result in results:
+                print(result.deployment.name, result.outcome, result.elapsed)
+            ```
+
+        # Arguments
+            deployments: Deployments to apply the action to.
+            action: Action to apply, `"start"`, `"stop"` or `"save"`.
+            await_status: Awaiting time (seconds) for the deployments to reach the desired status. Deployments that
+                have not reached it within this timespan are returned with a `PENDING` outcome, while they continue in
+                the background. Defaults to `60`.
+            max_concurrency: Maximum number of deployments the action is applied to concurrently. Defaults to `8`.
+
+        # Returns
+            `List[DeploymentActionResult]`: Outcome of the action for each deployment, in the same order.
+        # Raises
+            `ValueError`: If the action is not valid.
+        """
+
+        action = self._validate_deployment_action(action)
+        return BulkServingEngine(
+            max_concurrency
+            if max_concurrency is not None
+            else DEPLOYMENT_ACTION.MAX_CONCURRENCY
+        ).apply(deployments, action, await_status)
+
+    def _validate_deployment_action(self, action):
+        actions = [
+            DEPLOYMENT_ACTION.START,
+            DEPLOYMENT_ACTION.STOP,
+            DEPLOYMENT_ACTION.SAVE,
+        ]
+        action = action.upper()
+        if action not in actions:
+            raise ValueError(
+                "Deployment action '{}' is not valid. Possible values are '{}'".format(
+                    action, ", ".join(actions)
+                )
+            )
+        return action
+
     @property
     def project_name(self):
         """Name of the project in which Model Serving is located."""
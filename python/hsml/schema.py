@@ -14,15 +14,19 @@
 #   limitations under the License.
 #
 
+from __future__ import annotations
+
 import json
-from typing import Optional, TypeVar, Union
+from typing import TYPE_CHECKING, Optional, TypeVar, Union
 
 import numpy
-import pandas
-from hsml.utils.schema.columnar_schema import ColumnarSchema
 from hsml.utils.schema.tensor_schema import TensorSchema
 
 
+if TYPE_CHECKING:
+    import pandas
+
+
 class Schema:
     """Create a schema for a model input or output.
 
@@ -56,6 +60,9 @@ class Schema:
             self.columnar_schema = self._convert_columnar_to_schema(object).columns
 
     def _convert_columnar_to_schema(self, object):
+        # pandas, pyspark and hsfs are only loaded for columnar schemas
+        from hsml.utils.schema.columnar_schema import ColumnarSchema
+
         return ColumnarSchema(object)
 
     def _convert_tensor_to_schema(self, object):
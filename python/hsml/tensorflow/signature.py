@@ -14,14 +14,19 @@
 #   limitations under the License.
 #
 
-from typing import Optional, Union
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Optional, Union
 
 import numpy
-import pandas
 from hsml.model_schema import ModelSchema
 from hsml.tensorflow.model import Model
 
 
+if TYPE_CHECKING:
+    import pandas
+
+
 _mr = None
 
 
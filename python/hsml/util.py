@@ -18,14 +18,15 @@ from __future__ import annotations
 
 import datetime
 import inspect
+import math
 import os
 import shutil
+from concurrent.futures import Future
 from json import JSONEncoder, dumps
 from urllib.parse import urljoin, urlparse
 
 import humps
 import numpy as np
-import pandas as pd
 from hsml import client
 from hsml.constants import DEFAULT, MODEL, PREDICTOR
 from hsml.model import Model as BaseModel
@@ -74,7 +75,7 @@ class NumpyEncoder(JSONEncoder):
             return base64.encodebytes(x).decode("ascii")
 
         if isinstance(obj, np.ndarray):
-            if obj.dtype == np.object:
+            if obj.dtype == object:
                 return [self.convert(x)[0] for x in obj.tolist()]
             elif obj.dtype == np.bytes_:
                 return np.vectorize(encode_binary)(obj), True
@@ -145,6 +146,8 @@ def _handle_tensor_input(input_tensor):
 
 
 def _handle_dataframe_input(input_ex):
+    import pandas as pd
+
     if isinstance(input_ex, pd.DataFrame):
         if not input_ex.empty:
             return input_ex.iloc[0].tolist()
@@ -340,3 +343,46 @@ def feature_view_to_json(obj):
 
             return humps.camelize(json.loads(obj.json()))
     return None
+
+
+def chain_future(future, fn):
+    """Get a future resolved with `fn(future)` once `future` is done.
+
+    Exceptions raised by `fn` are set on the returned future, and cancelling the returned future
+    cancels `future`.
+    """
+    chained_future = Future()
+
+    def _on_done(future):
+        if not chained_future.set_running_or_notify_cancel():
+            return
+        try:
+            chained_future.set_result(fn(future))
+        except BaseException as e:
+            chained_future.set_exception(e)
+
+    def _on_chained_done(chained_future):
+        if chained_future.cancelled():
+            future.cancel()
+
+    chained_future.add_done_callback(_on_chained_done)
+    future.add_done_callback(_on_done)
+    return chained_future
+
+
+def get_latency_statistics(latencies):
+    """Get the mean, nearest-rank percentiles and maximum of a list of latencies, or None if empty."""
+    if not latencies:
+        return None
+    latencies = sorted(latencies)
+
+    def percentile(p):
+        return latencies[max(0, math.ceil(p * len(latencies) / 100) - 1)]
+
+    return {
+        "mean": sum(latencies) / len(latencies),
+        "p50": percentile(50),
+        "p95": percentile(95),
+        "p99": percentile(99),
+        "max": latencies[-1],
+    }
@@ -0,0 +1,166 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+from unittest import mock
+
+import numpy as np
+import pytest
+from hsml import client
+from hsml.bench import load_generator, targets
+from hsml.bench.server import LocalInferenceServer
+from hsml.client.istio import external as istio_external
+from hsml.constants import INFERENCE_ENDPOINTS, PREDICTOR
+
+
+def _model_fn(inputs):
+    if (np.asarray(inputs) < 0).any():
+        raise ValueError("Negative inputs")
+    return np.asarray(inputs) * 2
+
+
+def _get_inputs(i):
+    # every fourth request fails
+    return [[-1.0, 2.0]] if i % 4 == 3 else [[float(i), 2.0]]
+
+
+@pytest.fixture
+def server():
+    with LocalInferenceServer(model_fn=_model_fn) as server:
+        yield server
+
+
+def _rest_target(server, protocol):
+    return targets.RestTarget(server.rest_url, "test", protocol=protocol)
+
+
+def _grpc_target(server):
+    return targets.GrpcTarget(server.grpc_url, "test")
+
+
+def _deployment_target(server, monkeypatch):
+    _, port = server.rest_url.rsplit(":", 1)
+    istio_client = istio_external.Client("127.0.0.1", int(port), "test", "key")
+    monkeypatch.setattr(client, "get_istio_instance", lambda: istio_client)
+    monkeypatch.setattr(client, "get_knative_domain", lambda: "example.com")
+    deployment = mock.MagicMock()
+    deployment.name = "test"
+    deployment.api_protocol = INFERENCE_ENDPOINTS.API_PROTOCOL_REST
+    deployment.predictor.serving_tool = PREDICTOR.SERVING_TOOL_KSERVE
+    deployment._request_compression = None
+    return targets.DeploymentTarget(deployment)
+
+
+class TestRunBenchmark:
+    @pytest.mark.parametrize("target_type", ["REST v1", "REST v2", "gRPC v2"])
+    def test_run_benchmark(self, server, target_type):
+        # Arrange
+        target = {
+            "REST v1": lambda: _rest_target(server, "v1"),
+            "REST v2": lambda: _rest_target(server, "v2"),
+            "gRPC v2": lambda: _grpc_target(server),
+        }[target_type]()
+
+        # Act
+        try:
+            result = load_generator.run_benchmark(
+                target, _get_inputs, concurrency=4, duration=None, num_requests=40
+            )
+        finally:
+            target.close()
+
+        # Assert
+        assert result.target == target_type
+        assert result.requests == 40
+        assert sum(result.errors.values()) == 10
+        assert result.error_rate == 0.25
+        assert result.latency["p50"] <= result.latency["max"]
+        assert result.to_dict()["errors"] == 10
+
+    def test_run_benchmark_deployment(self, server, monkeypatch):
+        # Arrange
+        target = _deployment_target(server, monkeypatch)
+
+        # Act
+        result = load_generator.run_benchmark(
+            target, _get_inputs, concurrency=2, duration=None, num_requests=8
+        )
+
+        # Assert
+        assert result.target == "Deployment test (REST)"
+        assert result.requests == 8
+        assert sum(result.errors.values()) == 2
+
+    def test_run_benchmark_requires_limit(self, server):
+        # Act
+        with pytest.raises(ValueError):
+            load_generator.run_benchmark(
+                _rest_target(server, "v1"), [[1.0]], duration=None
+            )
+
+
+class TestTargets:
+    def test_rest_v1(self, server):
+        # Arrange
+        target = _rest_target(server, "v1")
+
+        # Act
+        response = target.send(target.serialize([[1.0, 2.0], [3.0, 4.0]]))
+        target.close()
+
+        # Assert
+        assert response == {"predictions": [[2.0, 4.0], [6.0, 8.0]]}
+
+    def test_rest_v2(self, server):
+        # Arrange
+        target = _rest_target(server, "v2")
+
+        # Act
+        response = target.send(target.serialize([[1.0, 2.0], [3.0, 4.0]]))
+        target.close()
+
+        # Assert
+        assert response["model_name"] == "test"
+        assert response["outputs"][0]["shape"] == [2, 2]
+        assert response["outputs"][0]["data"] == [2.0, 4.0, 6.0, 8.0]
+
+    def test_grpc(self, server):
+        # Arrange
+        target = _grpc_target(server)
+
+        # Act
+        response = target.send(target.serialize(np.array([[1, 2], [3, 4]])))
+        target.close()
+
+        # Assert
+        assert response.model_name == "test"
+        np.testing.assert_array_equal(
+            response.outputs[0].as_numpy(), np.array([[2, 4], [6, 8]])
+        )
+
+    def test_deployment(self, server, monkeypatch):
+        # Arrange
+        target = _deployment_target(server, monkeypatch)
+
+        # Act
+        response = target.send(target.serialize([[1.0, 2.0]]))
+
+        # Assert
+        assert response == {"predictions": [[2.0, 4.0]]}
+
+    def test_rest_invalid_protocol(self, server):
+        # Act
+        with pytest.raises(ValueError):
+            targets.RestTarget(server.rest_url, "test", protocol="v3")
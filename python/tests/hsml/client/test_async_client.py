@@ -0,0 +1,257 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+from hsml import client
+from hsml.bench.server import LocalInferenceServer
+from hsml.client import async_client, base, exceptions, http_pool
+from hsml.client.istio import external as istio_external
+from hsml.constants import PREDICTOR
+from hsml.deployment import Deployment
+from hsml.model_registry import ModelRegistry
+from hsml.python.predictor import Predictor
+
+
+pytest.importorskip("aiohttp")
+
+
+_MODEL_JSON = {
+    "id": "my_model_1",
+    "name": "my_model",
+    "version": 1,
+    "framework": "PYTHON",
+    "description": "A model",
+}
+
+
+class _ModelHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.paths.append(self.path)
+        if "my_model_1" in self.path:
+            status, body = 200, json.dumps(_MODEL_JSON).encode()
+        else:
+            status, body = 404, json.dumps({"errorMsg": "Model not found"}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _LocalClient(base.Client):
+    BASE_PATH_PARAMS = []
+
+    def __init__(self, base_url):
+        self._base_url = base_url
+        self._project_id = 119
+        self._verify = False
+        self._connected = True
+        self._session = http_pool.create_session()
+
+    def _auth(self, request):
+        request.headers["Authorization"] = "ApiKey key"
+        return request
+
+    def _get_verify(self, verify, trust_store_path):
+        return False
+
+    def _get_retry(self, request, response):
+        return False
+
+    def _get_host_port_pair(self):
+        return None
+
+
+@pytest.fixture
+def model_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ModelHandler)
+    server.daemon_threads = True
+    server.paths = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def aclient(model_server):
+    host, port = model_server.server_address
+    return async_client.AsyncClient(_LocalClient(f"http://{host}:{port}"))
+
+
+class TestAsyncClient:
+    def test_send_request(self, aclient, model_server):
+        # Act
+        response = asyncio.run(
+            aclient._send_request(
+                "GET", ["models", "my_model_1"], query_params={"expand": "a"}
+            )
+        )
+
+        # Assert
+        assert response == _MODEL_JSON
+        assert model_server.paths == ["/models/my_model_1?expand=a"]
+
+    def test_send_request_error(self, aclient):
+        # Act
+        with pytest.raises(exceptions.RestAPIError) as e_info:
+            asyncio.run(aclient._send_request("GET", ["models", "other_model_1"]))
+
+        # Assert
+        assert e_info.value.response.status_code == 404
+
+    def test_session_per_loop_closed_on_shutdown(self, aclient):
+        # Arrange
+        async def get_sessions():
+            first = await aclient._get_session()
+            second = await aclient._get_session()
+            return first, second
+
+        # Act
+        first, second = asyncio.run(get_sessions())
+        third, _ = asyncio.run(get_sessions())
+
+        # Assert
+        assert first is second
+        assert third is not first
+        assert first.closed and third.closed
+        assert aclient._sessions == {}
+
+    def test_session_per_thread(self, aclient):
+        # Arrange
+        sessions = {}
+        barrier = threading.Barrier(2)
+
+        async def get_session(name):
+            sessions[name] = await aclient._get_session()
+            # keep both loops alive at the same time
+            await asyncio.get_running_loop().run_in_executor(None, barrier.wait)
+            assert await aclient._get_session() is sessions[name]
+
+        threads = [
+            threading.Thread(target=asyncio.run, args=(get_session(name),))
+            for name in ("a", "b")
+        ]
+
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        assert sessions["a"] is not sessions["b"]
+        assert sessions["a"].closed and sessions["b"].closed
+        assert aclient._sessions == {}
+
+    def test_close(self, aclient):
+        # Arrange
+        loop = asyncio.new_event_loop()
+        session = loop.run_until_complete(aclient._get_session())
+
+        # Act
+        aclient._close()
+
+        # Assert
+        assert session.closed
+        assert aclient._sessions == {}
+        loop.close()
+
+
+class TestAsyncModelRegistry:
+    def test_aget_model(self, aclient, model_server, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(client, "get_async_instance", lambda: aclient)
+        mr = ModelRegistry("test", 119, 120)
+
+        # Act
+        model = asyncio.run(mr.aget_model("my_model", 1))
+
+        # Assert
+        assert model.name == "my_model"
+        assert model.version == 1
+        assert model.description == "A model"
+        assert model_server.paths == [
+            "/project/119/modelregistries/120/models/my_model_1?expand=trainingdatasets"
+        ]
+
+    def test_aget_model_not_found(self, aclient, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(client, "get_async_instance", lambda: aclient)
+        mr = ModelRegistry("test", 119, 120)
+
+        # Act
+        with pytest.raises(exceptions.RestAPIError):
+            asyncio.run(mr.aget_model("other_model", 1))
+
+
+class TestAsyncDeployment:
+    def test_apredict(self, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(
+            client,
+            "get_serving_resource_limits",
+            lambda: {"cores": -1, "memory": -1, "gpus": -1},
+        )
+        monkeypatch.setattr(client, "get_serving_num_instances_limits", lambda: [0, -1])
+        monkeypatch.setattr(client, "get_knative_domain", lambda: "example.com")
+        predictor = Predictor(
+            name="test",
+            model_name="test",
+            model_path="/Models/test/1",
+            model_version=1,
+            model_framework="PYTHON",
+            artifact_version=1,
+            model_server="PYTHON",
+            serving_tool=PREDICTOR.SERVING_TOOL_KSERVE,
+            script_file="predictor.py",
+        )
+        deployment = Deployment(predictor=predictor, name="test")
+
+        with LocalInferenceServer(
+            model_fn=lambda inputs: np.asarray(inputs) * 2
+        ) as server:
+            _, port = server.rest_url.rsplit(":", 1)
+            istio_client = istio_external.Client("127.0.0.1", int(port), "test", "key")
+            aclient = async_client.AsyncClient(istio_client)
+            monkeypatch.setattr(client, "get_istio_instance", lambda: istio_client)
+            monkeypatch.setattr(client, "get_async_istio_instance", lambda: aclient)
+
+            async def predict_all():
+                return await asyncio.gather(
+                    *[deployment.apredict(inputs=[[i, 1.0]]) for i in range(5)]
+                )
+
+            # Act
+            predictions = asyncio.run(predict_all())
+
+        # Assert
+        assert [p["predictions"] for p in predictions] == [
+            [[2.0 * i, 2.0]] for i in range(5)
+        ]
+        assert aclient._sessions == {}
@@ -0,0 +1,163 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from hsml.client import configuration_cache
+from hsml.client.configuration_cache import ConfigurationCache
+
+
+_KEY = ("external", "https://hopsworks.ai:443", 119)
+_CONFIGURATION = {
+    "kserve_installed": True,
+    "istio_endpoint": {"host": "10.0.0.1", "port": 32080},
+    "resource_limits": {"cores": -1, "memory": -1, "gpus": -1},
+    "num_instances_limits": [0, -1],
+    "knative_domain": "example.com",
+}
+
+
+class TestConfigurationCache:
+    def test_put_get(self, tmp_path):
+        # Arrange
+        cache = ConfigurationCache(cache_dir=str(tmp_path), ttl=60)
+
+        # Act
+        cache.put(*_KEY, _CONFIGURATION)
+
+        # Assert
+        assert cache.get(*_KEY) == _CONFIGURATION
+        assert cache.get("internal", *_KEY[1:]) is None
+        assert ConfigurationCache(cache_dir=str(tmp_path), ttl=60).get(*_KEY) == (
+            _CONFIGURATION
+        )
+
+    def test_ttl_expiry(self, tmp_path, monkeypatch):
+        # Arrange
+        cache = ConfigurationCache(cache_dir=str(tmp_path), ttl=60)
+        now = time.time()
+        monkeypatch.setattr(configuration_cache.time, "time", lambda: now)
+        cache.put(*_KEY, _CONFIGURATION)
+
+        # Act
+        monkeypatch.setattr(configuration_cache.time, "time", lambda: now + 59)
+        configuration = cache.get(*_KEY)
+        monkeypatch.setattr(configuration_cache.time, "time", lambda: now + 61)
+        expired_configuration = cache.get(*_KEY)
+
+        # Assert
+        assert configuration == _CONFIGURATION
+        assert expired_configuration is None
+
+    def test_disabled(self, tmp_path):
+        # Arrange
+        cache = ConfigurationCache(cache_dir=str(tmp_path), ttl=0)
+
+        # Act
+        cache.put(*_KEY, _CONFIGURATION)
+
+        # Assert
+        assert cache.get(*_KEY) is None
+        assert os.listdir(tmp_path) == []
+
+    def test_environment_variables(self, tmp_path, monkeypatch):
+        # Arrange
+        monkeypatch.setenv(ConfigurationCache.CACHE_DIR_ENV, str(tmp_path))
+        monkeypatch.setenv(ConfigurationCache.CACHE_TTL_ENV, "0")
+
+        # Act
+        cache = ConfigurationCache()
+
+        # Assert
+        assert cache._cache_dir == str(tmp_path)
+        assert not cache.enabled
+
+    def test_remove(self, tmp_path):
+        # Arrange
+        cache = ConfigurationCache(cache_dir=str(tmp_path), ttl=60)
+        cache.put(*_KEY, _CONFIGURATION)
+
+        # Act
+        cache.remove(*_KEY)
+        cache.remove(*_KEY)
+
+        # Assert
+        assert cache.get(*_KEY) is None
+
+    def test_atomic_write(self, tmp_path, monkeypatch):
+        # Arrange
+        cache = ConfigurationCache(cache_dir=str(tmp_path), ttl=60)
+        cache.put(*_KEY, _CONFIGURATION)
+
+        def failing_replace(src, dst):
+            raise OSError("No space left on device")
+
+        monkeypatch.setattr(configuration_cache.os, "replace", failing_replace)
+
+        # Act
+        cache.put(*_KEY, {**_CONFIGURATION, "knative_domain": "other.com"})
+
+        # Assert
+        assert cache.get(*_KEY) == _CONFIGURATION
+        # temporary files are removed
+        assert len(os.listdir(tmp_path)) == 1
+
+    def test_concurrent_writes(self, tmp_path):
+        # Arrange
+        cache = ConfigurationCache(cache_dir=str(tmp_path), ttl=60)
+        configurations = [
+            {**_CONFIGURATION, "knative_domain": "{}.com".format(i)} for i in range(20)
+        ]
+
+        # Act
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda c: cache.put(*_KEY, c), configurations))
+            reads = list(executor.map(lambda _: cache.get(*_KEY), range(20)))
+
+        # Assert
+        assert cache.get(*_KEY) in configurations
+        # readers never see partially written entries
+        assert all(configuration in configurations for configuration in reads)
+        assert len(os.listdir(tmp_path)) == 1
+
+    def test_unwritable_cache_dir(self, tmp_path):
+        # Arrange
+        not_a_dir = tmp_path / "file"
+        not_a_dir.write_text("")
+        cache = ConfigurationCache(cache_dir=str(not_a_dir / "cache"), ttl=60)
+
+        # Act
+        cache.put(*_KEY, _CONFIGURATION)
+
+        # Assert
+        assert cache.get(*_KEY) is None
+
+    @pytest.mark.parametrize("content", ["", "{", '{"timestamp": "now"}', "[]"])
+    def test_invalid_entry(self, tmp_path, content):
+        # Arrange
+        cache = ConfigurationCache(cache_dir=str(tmp_path), ttl=60)
+        cache.put(*_KEY, _CONFIGURATION)
+        with open(cache._get_path(*_KEY), "w") as f:
+            f.write(content)
+
+        # Act
+        configuration = cache.get(*_KEY)
+
+        # Assert
+        assert configuration is None
@@ -0,0 +1,214 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import numpy as np
+import pytest
+from hsml import client
+from hsml.bench.server import LocalInferenceServer
+from hsml.client.istio import external as istio_external
+from hsml.client.istio.grpc.inference_client import GRPCInferenceServerClient
+from hsml.client.istio.utils.infer_type import InferInput, InferRequest
+from hsml.core import serving_api
+
+
+def _infer_request(data):
+    infer_input = InferInput("input-0", list(data.shape), "FP64")
+    infer_input.set_data_from_numpy(data)
+    return InferRequest(infer_inputs=[infer_input], model_name="test")
+
+
+@pytest.fixture
+def server():
+    with LocalInferenceServer(model_fn=lambda inputs: inputs * 2) as server:
+        yield server
+
+
+class TestGRPCInferenceServerClient:
+    def test_round_robin(self):
+        # Arrange
+        grpc_client = GRPCInferenceServerClient(
+            "127.0.0.1:1", "key", num_channels=3, channel_selection="round_robin"
+        )
+
+        # Act
+        indices = [grpc_client._acquire_channel() for _ in range(5)]
+
+        # Assert
+        assert indices == [0, 1, 2, 0, 1]
+        assert grpc_client.get_in_flight_requests() == [2, 2, 1]
+        grpc_client.close()
+
+    def test_least_in_flight(self):
+        # Arrange
+        grpc_client = GRPCInferenceServerClient(
+            "127.0.0.1:1", "key", num_channels=3, channel_selection="least_in_flight"
+        )
+        indices = [grpc_client._acquire_channel() for _ in range(3)]
+
+        # Act
+        grpc_client._release_channel(1)
+        first = grpc_client._acquire_channel()
+        grpc_client._release_channel(2)
+        grpc_client._release_channel(0)
+        second = grpc_client._acquire_channel()
+        third = grpc_client._acquire_channel()
+
+        # Assert
+        assert indices == [0, 1, 2]
+        assert first == 1
+        # idle channels are used in turn
+        assert (second, third) == (2, 0)
+        assert grpc_client.get_in_flight_requests() == [1, 1, 1]
+        grpc_client.close()
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [{"num_channels": 0}, {"channel_selection": "random"}],
+    )
+    def test_invalid_arguments(self, kwargs):
+        # Act
+        with pytest.raises(ValueError):
+            GRPCInferenceServerClient("127.0.0.1:1", "key", **kwargs)
+
+    @pytest.mark.parametrize("channel_selection", ["round_robin", "least_in_flight"])
+    def test_infer(self, server, channel_selection):
+        # Arrange
+        grpc_client = GRPCInferenceServerClient(
+            server.grpc_url,
+            "key",
+            num_channels=3,
+            channel_selection=channel_selection,
+        )
+        data = [np.full((2, 2), i, dtype=np.float64) for i in range(12)]
+
+        # Act
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            responses = list(
+                executor.map(
+                    lambda d: grpc_client.infer(_infer_request(d)).outputs[0],
+                    data,
+                )
+            )
+        futures = [grpc_client.infer_future(_infer_request(d)) for d in data[:3]]
+        future_responses = [future.result().outputs[0] for future in futures]
+
+        # Assert
+        for d, output in zip(data, responses):
+            np.testing.assert_array_equal(output.as_numpy(), d * 2)
+        for d, output in zip(data, future_responses):
+            np.testing.assert_array_equal(output.as_numpy(), d * 2)
+        assert grpc_client.get_in_flight_requests() == [0, 0, 0]
+        grpc_client.close()
+        assert grpc_client.closed
+
+
+class TestIstioClientGRPCChannels:
+    def test_default_channel_args(self):
+        # Arrange
+        istio_client = istio_external.Client("127.0.0.1", 80, "test", "key")
+
+        # Act
+        channel_args = istio_client._get_grpc_channel_args("test.test.example.com")
+
+        # Assert
+        assert channel_args == [
+            ("grpc.ssl_target_name_override", "test.test.example.com")
+        ]
+
+    def test_keepalive_channel_args(self):
+        # Arrange
+        istio_client = istio_external.Client(
+            "127.0.0.1",
+            80,
+            "test",
+            "key",
+            connection_pool_configuration={
+                "grpc_keepalive_time": 10,
+                "grpc_keepalive_timeout": 2.5,
+            },
+        )
+
+        # Act
+        channel_args = dict(
+            istio_client._get_grpc_channel_args("test.test.example.com")
+        )
+
+        # Assert
+        assert channel_args == {
+            "grpc.ssl_target_name_override": "test.test.example.com",
+            "grpc.keepalive_time_ms": 10000,
+            "grpc.keepalive_permit_without_calls": 1,
+            "grpc.http2.max_pings_without_data": 0,
+            "grpc.keepalive_timeout_ms": 2500,
+        }
+
+    def test_channels_shared_by_endpoint(self):
+        # Arrange
+        istio_client = istio_external.Client(
+            "127.0.0.1",
+            80,
+            "test",
+            "key",
+            connection_pool_configuration={
+                "grpc_channels": 2,
+                "grpc_channel_selection": "least_in_flight",
+            },
+        )
+
+        # Act
+        first = istio_client._create_grpc_channel("a.test.example.com")
+        second = istio_client._create_grpc_channel("a.test.example.com")
+        other = istio_client._create_grpc_channel("b.test.example.com")
+        istio_client._close_grpc_channel("a.test.example.com")
+
+        # Assert
+        assert first is second
+        assert other is not first
+        assert len(first._channels) == 2
+        assert first._channel_selection == "least_in_flight"
+        assert first.closed and not other.closed
+        assert istio_client._create_grpc_channel("a.test.example.com") is not first
+        istio_client._close()
+        assert other.closed
+
+    def test_closed_channels_created_again(self, monkeypatch):
+        # Arrange
+        istio_client = istio_external.Client("127.0.0.1", 80, "test", "key")
+        monkeypatch.setattr(client, "get_istio_instance", lambda: istio_client)
+        monkeypatch.setattr(client, "get_knative_domain", lambda: "example.com")
+        api = serving_api.ServingApi()
+        deployment = mock.MagicMock()
+        deployment.name = "test"
+        deployment._grpc_channel = None
+        other_deployment = mock.MagicMock()
+        other_deployment.name = "test"
+        other_deployment._grpc_channel = None
+        grpc_channel, _ = api._get_grpc_inference_request(deployment, [])
+        api._get_grpc_inference_request(other_deployment, [])
+
+        # Act
+        api.close_grpc_channel(deployment)
+        new_grpc_channel, _ = api._get_grpc_inference_request(other_deployment, [])
+
+        # Assert
+        assert other_deployment._grpc_channel is not grpc_channel
+        assert new_grpc_channel is not grpc_channel
+        assert grpc_channel.closed and not new_grpc_channel.closed
+        assert deployment._grpc_channel is None
+        istio_client._close()
@@ -0,0 +1,167 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from hsml.client import http_pool
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.open_connections += 1
+
+    def finish(self):
+        super().finish()
+        with self.server.lock:
+            self.server.open_connections -= 1
+
+    def do_GET(self):
+        time.sleep(1 if self.path == "/slow" else 0.05)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.open_connections = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _count_idle_connections(poolmanager):
+    return sum(
+        1
+        for pool in poolmanager.pools._container.values()
+        for conn in list(pool.pool.queue)
+        if conn is not None and conn.sock is not None
+    )
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestPooledHTTPAdapter:
+    def test_ensure_pool_size_drains_previous_connections(self, server):
+        # Arrange
+        session = http_pool.create_session({"pool_maxsize": 2})
+        adapter = session.get_adapter("http://")
+        url = "http://127.0.0.1:{}/".format(server.server_address[1])
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(lambda _: session.get(url), range(4)))
+        assert server.open_connections == 2
+        previous_poolmanager = adapter.poolmanager
+
+        # Act
+        adapter.ensure_pool_size(8)
+
+        # Assert
+        assert adapter.poolmanager is not previous_poolmanager
+        assert all(
+            pool.draining for pool in previous_poolmanager.pools._container.values()
+        )
+        assert _count_idle_connections(previous_poolmanager) == 0
+        assert _wait_for(lambda: server.open_connections == 0)
+        assert session.get(url).content == b"ok"
+        session.close()
+
+    def test_ensure_pool_size_closes_connections_of_in_flight_requests(self, server):
+        # Arrange
+        session = http_pool.create_session({"pool_maxsize": 2})
+        adapter = session.get_adapter("http://")
+        url = "http://127.0.0.1:{}/".format(server.server_address[1])
+
+        # Act
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            responses = [executor.submit(session.get, url) for _ in range(2)]
+            assert _wait_for(lambda: server.open_connections == 2)
+            adapter.ensure_pool_size(8)
+            responses = [response.result() for response in responses]
+
+        # Assert
+        assert [response.content for response in responses] == [b"ok", b"ok"]
+        assert _count_idle_connections(adapter.poolmanager) == 0
+        assert _wait_for(lambda: server.open_connections == 0)
+        session.close()
+
+    def test_ensure_pool_size_keeps_previous_pools_usable(self, server):
+        # Arrange
+        session = http_pool.create_session({"pool_maxsize": 2})
+        adapter = session.get_adapter("http://")
+        url = "http://127.0.0.1:{}/".format(server.server_address[1])
+        assert session.get(url).content == b"ok"
+        # a pool taken by a thread right before the pool manager is replaced
+        (pool,) = adapter.poolmanager.pools._container.values()
+
+        # Act
+        adapter.ensure_pool_size(8)
+        response = pool.urlopen("GET", "/")
+
+        # Assert
+        assert response.data == b"ok"
+        assert pool.num_connections == 2
+        assert _count_idle_connections(adapter.poolmanager) == 0
+        assert _wait_for(lambda: server.open_connections == 0)
+        session.close()
+
+    def test_ensure_pool_size_does_not_shrink(self, server):
+        # Arrange
+        session = http_pool.create_session({"pool_maxsize": 4})
+        adapter = session.get_adapter("http://")
+        poolmanager = adapter.poolmanager
+
+        # Act
+        adapter.ensure_pool_size(2)
+
+        # Assert
+        assert adapter.poolmanager is poolmanager
+        session.close()
+
+    @pytest.mark.parametrize("max_retries", [0, 2])
+    def test_read_timeout(self, server, max_retries):
+        # Arrange
+        session = http_pool.create_session({"max_retries": max_retries})
+        url = "http://127.0.0.1:{}/slow".format(server.server_address[1])
+
+        # Act
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            session.get(url, timeout=0.2)
+
+        # Assert
+        session.close()
@@ -0,0 +1,235 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import struct
+
+import numpy as np
+import pytest
+from hsml.client.istio.grpc.proto.grpc_predict_v2_pb2 import (
+    ModelInferRequest,
+    ModelInferResponse,
+)
+from hsml.client.istio.utils.infer_type import (
+    InferenceServerException,
+    InferInput,
+    InferRequest,
+    InferResponse,
+    deserialize_bytes_tensor,
+    serialize_byte_tensor,
+)
+from hsml.client.istio.utils.numpy_codec import from_np_dtype
+
+
+def _infer_input(array, name="input-0", binary_data=True):
+    infer_input = InferInput(name, list(array.shape), from_np_dtype(array.dtype))
+    infer_input.set_data_from_numpy(array, binary_data=binary_data)
+    return infer_input
+
+
+def _serialize_elements(elements):
+    # length-prefixed encoding, element by element
+    return b"".join(struct.pack("<I", len(element)) + element for element in elements)
+
+
+def _bytes_tensor(elements, shape=None):
+    array = np.empty(len(elements), dtype=np.object_)
+    array[:] = elements
+    return array if shape is None else array.reshape(shape)
+
+
+class TestInferRequestToGrpcBytes:
+    @pytest.mark.parametrize(
+        "array",
+        [
+            np.arange(12, dtype=np.float32).reshape(3, 4),
+            np.arange(12, dtype=np.int64).reshape(4, 3),
+            np.array([[True, False]]),
+            np.arange(24, dtype=np.float64).reshape(4, 6)[::2, 1::2],
+            np.arange(6, dtype=">i4").reshape(2, 3),
+            np.empty((0, 3), dtype=np.float32),
+        ],
+        ids=["fp32", "int64", "bool", "strided", "big-endian", "empty"],
+    )
+    def test_same_as_to_grpc(self, array):
+        # Arrange
+        request = InferRequest("test", [_infer_input(array)], request_id="1")
+
+        # Act
+        serialized = request.to_grpc_bytes()
+
+        # Assert
+        assert serialized == request.to_grpc().SerializeToString()
+        (raw_contents,) = ModelInferRequest.FromString(serialized).raw_input_contents
+        np.testing.assert_array_equal(
+            np.frombuffer(raw_contents, dtype=array.dtype.newbyteorder("<")).reshape(
+                array.shape
+            ),
+            array,
+        )
+
+    def test_multiple_inputs(self):
+        # Arrange
+        inputs = [
+            _infer_input(np.arange(4, dtype=np.float32).reshape(2, 2), "input-0"),
+            _infer_input(np.arange(200_000, dtype=np.int32).reshape(2, -1), "input-1"),
+        ]
+        request = InferRequest("test", inputs)
+
+        # Act
+        serialized = request.to_grpc_bytes()
+
+        # Assert
+        assert serialized == request.to_grpc().SerializeToString()
+        parsed = ModelInferRequest.FromString(serialized)
+        assert [infer_input.name for infer_input in parsed.inputs] == [
+            "input-0",
+            "input-1",
+        ]
+        assert len(parsed.raw_input_contents) == 2
+
+    def test_contents_inputs(self):
+        # Arrange
+        request = InferRequest(
+            "test",
+            [_infer_input(np.array([[1.0, 2.0]]), binary_data=False)],
+        )
+
+        # Act
+        serialized = request.to_grpc_bytes()
+
+        # Assert
+        assert serialized == request.to_grpc().SerializeToString()
+        parsed = ModelInferRequest.FromString(serialized)
+        assert list(parsed.inputs[0].contents.fp64_contents) == [1.0, 2.0]
+        assert len(parsed.raw_input_contents) == 0
+
+    def test_raw_data_not_copied(self):
+        # Arrange
+        array = np.arange(12, dtype=np.float32).reshape(3, 4)
+
+        # Act
+        infer_input = _infer_input(array)
+
+        # Assert
+        assert isinstance(infer_input._raw_data, memoryview)
+        assert np.shares_memory(np.frombuffer(infer_input._raw_data, np.uint8), array)
+        assert infer_input.parameters["binary_data_size"] == array.nbytes
+
+
+class TestBytesTensor:
+    @pytest.mark.parametrize(
+        "array, expected",
+        [
+            (_bytes_tensor([b"a", b"", b"\x00b\x00"]), [b"a", b"", b"\x00b\x00"]),
+            (_bytes_tensor(["a", "é", "text"]), [b"a", "é".encode(), b"text"]),
+            (_bytes_tensor([b"a", "b", 1, None]), [b"a", b"b", b"1", b"None"]),
+            (np.array([b"a", b"bc"], dtype=np.bytes_), [b"a", b"bc"]),
+            (
+                _bytes_tensor([b"a", b"b", b"c", b"d"], shape=(2, 2)),
+                [b"a", b"b", b"c", b"d"],
+            ),
+            (
+                _bytes_tensor([b"a", b"b", b"c", b"d", b"e", b"f"], shape=(2, 3))[
+                    :, ::2
+                ],
+                [b"a", b"c", b"d", b"f"],
+            ),
+            (
+                _bytes_tensor([b"a", b"b", b"c", b"d"], shape=(2, 2)).T,
+                [b"a", b"c", b"b", b"d"],
+            ),
+        ],
+        ids=["bytes", "str", "mixed", "bytes_", "2d", "strided", "transposed"],
+    )
+    def test_serialize(self, array, expected):
+        # Act
+        serialized = serialize_byte_tensor(array)
+
+        # Assert
+        assert serialized.item() == _serialize_elements(expected)
+        np.testing.assert_array_equal(
+            deserialize_bytes_tensor(serialized.item()),
+            _bytes_tensor(expected),
+        )
+
+    def test_serialize_empty(self):
+        # Act
+        serialized = serialize_byte_tensor(np.empty((0, 2), dtype=np.object_))
+
+        # Assert
+        assert serialized.size == 0
+
+    def test_serialize_invalid_datatype(self):
+        # Act
+        with pytest.raises(InferenceServerException):
+            serialize_byte_tensor(np.array([1.0, 2.0]))
+
+    def test_serialize_many(self):
+        # Arrange
+        elements = [str(i).encode() * (i % 7) for i in range(10_000)]
+
+        # Act
+        serialized = serialize_byte_tensor(_bytes_tensor(elements))
+
+        # Assert
+        assert serialized.item() == _serialize_elements(elements)
+        assert deserialize_bytes_tensor(serialized.item()).tolist() == elements
+
+    def test_deserialize_buffer(self):
+        # Arrange
+        encoded = memoryview(_serialize_elements([b"a", b"bc"]))
+
+        # Act
+        decoded = deserialize_bytes_tensor(encoded)
+
+        # Assert
+        assert decoded.dtype == np.object_
+        assert decoded.tolist() == [b"a", b"bc"]
+
+    def test_infer_input_round_trip(self):
+        # Arrange
+        array = _bytes_tensor([b"a", "b", b"", b"d"], shape=(2, 2))
+        infer_input = InferInput("input-0", [2, 2], "BYTES")
+
+        # Act
+        infer_input.set_data_from_numpy(array)
+        request = ModelInferRequest.FromString(
+            InferRequest("test", [infer_input]).to_grpc_bytes()
+        )
+
+        # Assert
+        np.testing.assert_array_equal(
+            infer_input.as_numpy(), _bytes_tensor([b"a", b"b", b"", b"d"], (2, 2))
+        )
+        assert request.raw_input_contents[0] == _serialize_elements(
+            [b"a", b"b", b"", b"d"]
+        )
+
+    def test_infer_response_from_grpc(self):
+        # Arrange
+        response = ModelInferResponse(
+            model_name="test",
+            outputs=[{"name": "output-0", "shape": [2], "datatype": "BYTES"}],
+            raw_output_contents=[_serialize_elements([b"a", b"bc"])],
+        )
+
+        # Act
+        infer_response = InferResponse.from_grpc(response)
+
+        # Assert
+        (output,) = infer_response.outputs
+        assert output.data == [b"a", b"bc"]
+        np.testing.assert_array_equal(output.as_numpy(), _bytes_tensor([b"a", b"bc"]))
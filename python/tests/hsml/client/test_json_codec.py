@@ -0,0 +1,139 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import json
+import math
+
+import numpy as np
+import pytest
+from hsml.client import json_codec
+
+
+INSTALLED_BACKENDS = [
+    backend
+    for backend, functions in json_codec._BACKENDS.items()
+    if functions is not None
+]
+
+
+@pytest.fixture(autouse=True)
+def restore_backend():
+    backend = json_codec.get_backend()
+    yield
+    json_codec.set_backend(backend)
+
+
+class TestJsonCodec:
+    @pytest.mark.parametrize("backend", INSTALLED_BACKENDS)
+    def test_dumps_numpy(self, backend):
+        # Arrange
+        json_codec.set_backend(backend)
+        payload = {
+            "instances": np.arange(6, dtype=np.float32).reshape(2, 3),
+            "ids": np.array([1, 2], dtype=np.int64),
+            "scale": np.float64(0.5),
+        }
+
+        # Act
+        content = json_codec.dumps(payload)
+
+        # Assert
+        assert json.loads(content) == {
+            "instances": [[0.0, 1.0, 2.0], [3.0, 4.0, 5.0]],
+            "ids": [1, 2],
+            "scale": 0.5,
+        }
+
+    @pytest.mark.parametrize("backend", INSTALLED_BACKENDS)
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            {"instances": [[float("nan"), 1.0]]},
+            {"instances": [[1.0, float("inf")], [None, "a"]]},
+            {"instances": np.array([[np.nan, 1.0]])},
+            {"instances": np.array([np.nan, "a"], dtype=object)},
+        ],
+    )
+    def test_dumps_non_finite_floats_like_json(self, backend, payload):
+        # Arrange
+        json_codec.set_backend(backend)
+        expected = json.dumps(payload, default=json_codec._default)
+
+        # Act
+        content = json_codec.dumps(payload)
+
+        # Assert
+        # NaN and infinity are not encoded as null
+        assert content.decode("utf-8") == expected
+
+    @pytest.mark.parametrize("backend", INSTALLED_BACKENDS)
+    def test_dumps_big_integers(self, backend):
+        # Arrange
+        json_codec.set_backend(backend)
+
+        # Act
+        content = json_codec.dumps([2**70])
+
+        # Assert
+        assert json.loads(content) == [2**70]
+
+    @pytest.mark.parametrize("backend", INSTALLED_BACKENDS)
+    def test_loads_fallback(self, backend):
+        # Arrange
+        json_codec.set_backend(backend)
+
+        # Act
+        decoded = json_codec.loads(b'{"big": 1180591620717411303424, "nan": NaN}')
+
+        # Assert
+        assert decoded["big"] == 2**70
+        assert math.isnan(decoded["nan"])
+
+    def test_set_backend_env_override(self, monkeypatch):
+        # Arrange
+        monkeypatch.setenv(json_codec.BACKEND_ENV, json_codec.JSON)
+
+        # Act
+        json_codec.set_backend()
+
+        # Assert
+        assert json_codec.get_backend() == json_codec.JSON
+
+    def test_set_backend_default_fastest(self, monkeypatch):
+        # Arrange
+        monkeypatch.delenv(json_codec.BACKEND_ENV, raising=False)
+
+        # Act
+        json_codec.set_backend()
+
+        # Assert
+        assert json_codec.get_backend() == INSTALLED_BACKENDS[0]
+
+    def test_set_backend_invalid(self):
+        # Act
+        with pytest.raises(ValueError):
+            json_codec.set_backend("simplejson")
+
+    def test_set_backend_not_installed(self, monkeypatch):
+        # Arrange
+        monkeypatch.setitem(json_codec._BACKENDS, json_codec.UJSON, None)
+
+        # Act
+        with pytest.raises(ImportError) as e_info:
+            json_codec.set_backend(json_codec.UJSON)
+
+        # Assert
+        assert "pip install ujson" in str(e_info.value)
@@ -0,0 +1,502 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import email
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from hsml import client
+from hsml.client import base, http_pool
+from hsml.client.exceptions import RestAPIError
+from hsml.core import dataset_api
+
+
+class _DownloadHandler(BaseHTTPRequestHandler):
+    """Serves `server.content`, honouring the Range header if `server.support_ranges`."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        content = self.server.content
+        range_header = self.headers.get("Range")
+        with self.server.lock:
+            self.server.ranges.append(range_header)
+
+        if range_header is None or not self.server.support_ranges:
+            self._send(200, content)
+            return
+
+        start, end = (
+            int(i) for i in re.match(r"bytes=(\d+)-(\d+)", range_header).groups()
+        )
+        if start >= len(content):
+            self._send(416, b"", {"Content-Range": "bytes */{}".format(len(content))})
+            return
+        end = min(end, len(content) - 1)
+        self._send(
+            206,
+            content[start : end + 1],
+            {"Content-Range": "bytes {}-{}/{}".format(start, end, len(content))},
+        )
+
+    def _send(self, status_code, body, headers=None):
+        self.send_response(status_code)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _UploadHandler(BaseHTTPRequestHandler):
+    """Receives flow chunks into `server.chunks`, replying to chunk probes with 200 if received or 204 if not."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        message = email.message_from_bytes(
+            b"Content-Type: "
+            + self.headers["Content-Type"].encode()
+            + b"\r\n\r\n"
+            + body
+        )
+        fields = {
+            part.get_param("name", header="content-disposition"): part.get_payload(
+                decode=True
+            )
+            for part in message.get_payload()
+        }
+        chunk_number = int(fields["flowChunkNumber"])
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(
+                self.server.max_in_flight, self.server.in_flight
+            )
+            self.server.flow_total_chunks = int(fields["flowTotalChunks"])
+            failures = self.server.failures.get(chunk_number, [])
+            status_code = failures.pop(0) if failures else 200
+        time.sleep(self.server.delays.get(chunk_number, 0.01))
+        with self.server.lock:
+            self.server.in_flight -= 1
+            self.server.posts.append((chunk_number, status_code))
+            if status_code == 200:
+                self.server.chunks[chunk_number] = fields["file"]
+        self._send(status_code, b"")
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        chunk_number = int(params["flowChunkNumber"][0])
+        with self.server.lock:
+            self.server.probes.append(chunk_number)
+            received = chunk_number in self.server.chunks
+        if self.server.probe_status_code is not None:
+            self._send(self.server.probe_status_code, b"")
+        else:
+            self._send(200 if received else 204, b"")
+
+    def _send(self, status_code, body):
+        self.send_response(status_code)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _LocalClient(base.Client):
+    BASE_PATH_PARAMS = []
+
+    def __init__(self, base_url):
+        self._base_url = base_url
+        self._project_id = 119
+        self._auth = None
+        self._verify = False
+        self._connected = True
+        self._session = http_pool.create_session()
+
+    def _get_verify(self, verify, trust_store_path):
+        return False
+
+    def _get_retry(self, request, response):
+        return False
+
+    def _get_host_port_pair(self):
+        return None
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _DownloadHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.content = b""
+    server.support_ranges = True
+    server.ranges = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    _client = _LocalClient("http://127.0.0.1:{}".format(server.server_port))
+    monkeypatch.setattr(client, "get_instance", lambda: _client)
+    yield server
+    _client._session.close()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def upload_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _UploadHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.chunks = {}
+    server.posts = []
+    server.probes = []
+    server.failures = {}
+    server.delays = {}
+    server.probe_status_code = None
+    server.in_flight = server.max_in_flight = 0
+    server.flow_total_chunks = None
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    _client = _LocalClient("http://127.0.0.1:{}".format(server.server_port))
+    monkeypatch.setattr(client, "get_instance", lambda: _client)
+    monkeypatch.setattr(
+        dataset_api.DatasetApi, "path_exists", lambda self, remote_path: False
+    )
+    yield server
+    _client._session.close()
+    server.shutdown()
+    server.server_close()
+
+
+def _write_file(tmp_path, size):
+    local_path = os.path.join(tmp_path, "model.bin")
+    with open(local_path, "wb") as f:
+        f.write(os.urandom(size))
+    return local_path
+
+
+def _uploaded_content(server):
+    return b"".join(server.chunks[n] for n in sorted(server.chunks))
+
+
+def _download(tmp_path, **kwargs):
+    local_path = os.path.join(tmp_path, "model.bin")
+    dataset_api.DatasetApi().download("Models/model.bin", local_path, **kwargs)
+    with open(local_path, "rb") as f:
+        return f.read()
+
+
+class TestDatasetApi:
+    def test_download_ranges(self, server, tmp_path):
+        # Arrange
+        server.content = os.urandom(1_000_003)
+
+        # Act
+        content = _download(tmp_path, parallel_connections=4, range_size=100_000)
+
+        # Assert
+        assert content == server.content
+        assert len(server.ranges) == 11
+        assert sorted(server.ranges)[0] == "bytes=0-99999"
+        assert "bytes=1000000-1000002" in server.ranges
+
+    def test_download_ranges_ignored(self, server, tmp_path):
+        # Arrange
+        server.content = os.urandom(1_000_003)
+        server.support_ranges = False
+
+        # Act
+        content = _download(tmp_path, parallel_connections=4, range_size=100_000)
+
+        # Assert
+        assert content == server.content
+        # the whole file is read from the response to the first range request
+        assert server.ranges == ["bytes=0-99999"]
+
+    def test_download_ranges_empty_file(self, server, tmp_path):
+        # Act
+        content = _download(tmp_path, parallel_connections=4, range_size=100_000)
+
+        # Assert
+        assert content == b""
+        assert server.ranges == ["bytes=0-99999", None]
+
+    def test_download_single_stream(self, server, tmp_path):
+        # Arrange
+        server.content = os.urandom(1_000_003)
+
+        # Act
+        content = _download(tmp_path)
+
+        # Assert
+        assert content == server.content
+        assert server.ranges == [None]
+
+
+_MB = 1024 * 1024
+
+
+class TestDatasetApiUpload:
+    def test_upload_chunks(self, upload_server, tmp_path):
+        # Arrange
+        local_path = _write_file(tmp_path, 5 * _MB + 123)
+
+        # Act
+        path = dataset_api.DatasetApi().upload(
+            local_path, "Models/my_model/1", chunk_size=1, simultaneous_uploads=3
+        )
+
+        # Assert
+        assert path == "Models/my_model/1/model.bin"
+        assert upload_server.flow_total_chunks == 6
+        assert sorted(upload_server.chunks) == [1, 2, 3, 4, 5, 6]
+        with open(local_path, "rb") as f:
+            assert _uploaded_content(upload_server) == f.read()
+        assert 1 <= upload_server.max_in_flight <= 3
+
+    def test_sliding_window(self, upload_server, tmp_path):
+        # Arrange
+        local_path = _write_file(tmp_path, 6 * _MB)
+        upload_server.delays[1] = 0.5
+
+        # Act
+        dataset_api.DatasetApi().upload(
+            local_path, "Models/my_model/1", chunk_size=1, simultaneous_uploads=2
+        )
+
+        # Assert
+        # the window is refilled as soon as any chunk completes, without waiting for the slow one
+        assert [n for n, _ in upload_server.posts] == [2, 3, 4, 5, 6, 1]
+
+    def test_retry_chunk(self, upload_server, tmp_path):
+        # Arrange
+        local_path = _write_file(tmp_path, 3 * _MB)
+        upload_server.failures[2] = [503]
+
+        # Act
+        dataset_api.DatasetApi().upload(
+            local_path,
+            "Models/my_model/1",
+            chunk_size=1,
+            max_chunk_retries=1,
+            chunk_retry_interval=0,
+        )
+
+        # Assert
+        assert sorted(upload_server.chunks) == [1, 2, 3]
+        assert (2, 503) in upload_server.posts
+        assert len(upload_server.posts) == 4
+
+    def test_permanent_chunk_error(self, upload_server, tmp_path):
+        # Arrange
+        local_path = _write_file(tmp_path, 3 * _MB)
+        upload_server.failures[2] = [404]
+
+        # Act
+        with pytest.raises(RestAPIError) as e_info:
+            dataset_api.DatasetApi().upload(
+                local_path,
+                "Models/my_model/1",
+                chunk_size=1,
+                max_chunk_retries=3,
+                chunk_retry_interval=0,
+            )
+
+        # Assert
+        assert e_info.value.response.status_code == 404
+        # not retried
+        assert [n for n, _ in upload_server.posts].count(2) == 1
+
+
+@pytest.fixture
+def manifest_dir(tmp_path, monkeypatch):
+    manifest_dir = os.path.join(tmp_path, "uploads")
+    monkeypatch.setattr(dataset_api.DatasetApi, "UPLOAD_MANIFEST_DIR", manifest_dir)
+    return manifest_dir
+
+
+def _upload_resumable(local_path):
+    dataset_api.DatasetApi().upload(
+        local_path,
+        "Models/my_model/1",
+        chunk_size=1,
+        simultaneous_uploads=1,
+        max_chunk_retries=0,
+        resumable=True,
+    )
+
+
+class TestDatasetApiResumableUpload:
+    def test_resume_upload(self, upload_server, manifest_dir, tmp_path):
+        # Arrange
+        local_path = _write_file(tmp_path, 5 * _MB)
+        upload_server.failures[4] = [503]
+        with pytest.raises(RestAPIError):
+            _upload_resumable(local_path)
+        manifest = dataset_api.UploadManifest(
+            manifest_dir, local_path, "Models/my_model/1/model.bin", _MB
+        )
+        assert manifest.uploaded_chunks == {1, 2, 3}
+        upload_server.posts.clear()
+
+        # Act
+        _upload_resumable(local_path)
+
+        # Assert
+        assert [n for n, _ in upload_server.posts] == [4, 5]
+        # chunks missing in the manifest are probed before being uploaded
+        assert upload_server.probes == [4, 5]
+        with open(local_path, "rb") as f:
+            assert _uploaded_content(upload_server) == f.read()
+        # the manifest is removed once the upload completes
+        assert os.listdir(manifest_dir) == []
+
+    def test_resume_upload_chunk_received(self, upload_server, manifest_dir, tmp_path):
+        # Arrange
+        local_path = _write_file(tmp_path, 3 * _MB)
+        manifest = dataset_api.UploadManifest(
+            manifest_dir, local_path, "Models/my_model/1/model.bin", _MB
+        )
+        manifest.add(1)
+        with open(local_path, "rb") as f:
+            upload_server.chunks = {1: f.read(_MB), 2: f.read(_MB)}
+
+        # Act
+        _upload_resumable(local_path)
+
+        # Assert
+        # chunk 2 was received by the server, but not recorded in the manifest
+        assert upload_server.probes == [2, 3]
+        assert [n for n, _ in upload_server.posts] == [3]
+        assert sorted(upload_server.chunks) == [1, 2, 3]
+
+    @pytest.mark.parametrize("probe_status_code", [405, 501])
+    def test_probe_unsupported(
+        self, upload_server, manifest_dir, tmp_path, probe_status_code
+    ):
+        # Arrange
+        local_path = _write_file(tmp_path, 4 * _MB)
+        manifest = dataset_api.UploadManifest(
+            manifest_dir, local_path, "Models/my_model/1/model.bin", _MB
+        )
+        manifest.add(1)
+        upload_server.probe_status_code = probe_status_code
+
+        # Act
+        _upload_resumable(local_path)
+
+        # Assert
+        # chunks are no longer probed once the server rejects a probe, the manifest is trusted
+        assert upload_server.probes == [2]
+        assert [n for n, _ in upload_server.posts] == [2, 3, 4]
+
+    def test_not_resumable(self, upload_server, manifest_dir, tmp_path):
+        # Arrange
+        local_path = _write_file(tmp_path, 2 * _MB)
+
+        # Act
+        dataset_api.DatasetApi().upload(local_path, "Models/my_model/1", chunk_size=1)
+
+        # Assert
+        assert upload_server.probes == []
+        assert not os.path.exists(manifest_dir)
+
+
+class TestUploadManifest:
+    def test_add(self, tmp_path):
+        # Arrange
+        local_path = _write_file(tmp_path, 10)
+        manifest_dir = os.path.join(tmp_path, "uploads")
+        manifest = dataset_api.UploadManifest(manifest_dir, local_path, "Models", _MB)
+
+        # Act
+        manifest.add(2)
+        manifest.add(1)
+
+        # Assert
+        reloaded = dataset_api.UploadManifest(manifest_dir, local_path, "Models", _MB)
+        assert reloaded.uploaded_chunks == {1, 2}
+        assert reloaded.resumed
+        assert not manifest.resumed
+
+    def test_discard(self, tmp_path):
+        # Arrange
+        local_path = _write_file(tmp_path, 10)
+        manifest_dir = os.path.join(tmp_path, "uploads")
+        manifest = dataset_api.UploadManifest(manifest_dir, local_path, "Models", _MB)
+        manifest.add(1)
+
+        # Act
+        manifest.discard()
+        manifest.discard()
+
+        # Assert
+        assert os.listdir(manifest_dir) == []
+        assert manifest.uploaded_chunks == set()
+
+    @pytest.mark.parametrize(
+        "change",
+        ["content", "destination_path", "chunk_size"],
+    )
+    def test_new_upload_on_change(self, tmp_path, change):
+        # Arrange
+        local_path = _write_file(tmp_path, 10)
+        manifest_dir = os.path.join(tmp_path, "uploads")
+        dataset_api.UploadManifest(manifest_dir, local_path, "Models", _MB).add(1)
+        destination_path, chunk_size = "Models", _MB
+        if change == "content":
+            with open(local_path, "ab") as f:
+                f.write(b"more")
+        elif change == "destination_path":
+            destination_path = "Resources"
+        else:
+            chunk_size = 2 * _MB
+
+        # Act
+        manifest = dataset_api.UploadManifest(
+            manifest_dir, local_path, destination_path, chunk_size
+        )
+
+        # Assert
+        assert manifest.uploaded_chunks == set()
+        assert not manifest.resumed
+
+    def test_invalid_manifest(self, tmp_path):
+        # Arrange
+        local_path = _write_file(tmp_path, 10)
+        manifest_dir = os.path.join(tmp_path, "uploads")
+        manifest = dataset_api.UploadManifest(manifest_dir, local_path, "Models", _MB)
+        manifest.add(1)
+        with open(manifest._path, "w") as f:
+            f.write("{")
+
+        # Act
+        manifest = dataset_api.UploadManifest(manifest_dir, local_path, "Models", _MB)
+
+        # Assert
+        assert manifest.uploaded_chunks == set()
@@ -0,0 +1,142 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import threading
+from unittest import mock
+
+import pytest
+from hsml import client
+from hsml.client.configuration_cache import ConfigurationCache
+from hsml.core import model_serving_api, serving_api
+
+
+_CONFIGURATION = {
+    "kserve_installed": True,
+    "istio_endpoint": {"host": "10.0.0.1", "port": 32080},
+    "resource_limits": {"cores": -1, "memory": -1, "gpus": -1},
+    "num_instances_limits": [0, -1],
+    "knative_domain": "example.com",
+}
+
+
+@pytest.fixture
+def serving_configuration(tmp_path, monkeypatch):
+    """Patch the client module, returning the configuration set by `load_default_configuration`."""
+    _client = mock.MagicMock()
+    _client._base_url = "https://hopsworks.ai:443"
+    _client._project_id = 119
+    monkeypatch.setattr(client, "get_instance", lambda: _client)
+    monkeypatch.setattr(client, "get_client_type", lambda: "external")
+    monkeypatch.setenv(ConfigurationCache.CACHE_DIR_ENV, str(tmp_path))
+    configuration = {}
+    monkeypatch.setattr(
+        client,
+        "set_kserve_installed",
+        lambda value: configuration.update(kserve_installed=value),
+    )
+    monkeypatch.setattr(
+        client,
+        "set_serving_resource_limits",
+        lambda value: configuration.update(resource_limits=value),
+    )
+    monkeypatch.setattr(
+        client,
+        "set_serving_num_instances_limits",
+        lambda value: configuration.update(num_instances_limits=value),
+    )
+    monkeypatch.setattr(
+        client,
+        "set_knative_domain",
+        lambda value: configuration.update(knative_domain=value),
+    )
+    monkeypatch.setattr(
+        model_serving_api.ModelServingApi,
+        "_set_istio_client",
+        lambda self, value: configuration.update(istio_endpoint=value),
+    )
+    return configuration
+
+
+class TestLoadDefaultConfiguration:
+    def test_cache_hit(self, serving_configuration, monkeypatch):
+        # Arrange
+        api = model_serving_api.ModelServingApi()
+        api._configuration_cache.put(
+            "external", "https://hopsworks.ai:443", 119, _CONFIGURATION
+        )
+        fetch = mock.MagicMock()
+        monkeypatch.setattr(api, "_fetch_default_configuration", fetch)
+        # cached entries are trusted, without probing the istio endpoint
+        is_host_port_open = mock.MagicMock()
+        monkeypatch.setattr(api, "_is_host_port_open", is_host_port_open)
+
+        # Act
+        api.load_default_configuration()
+
+        # Assert
+        fetch.assert_not_called()
+        is_host_port_open.assert_not_called()
+        assert serving_configuration == _CONFIGURATION
+
+    def test_cache_miss_fetched_concurrently(self, serving_configuration, monkeypatch):
+        # Arrange
+        api = model_serving_api.ModelServingApi()
+        # each request waits for the others, failing if sent sequentially
+        barrier = threading.Barrier(4, timeout=5)
+
+        def concurrent(value):
+            def request(self):
+                barrier.wait()
+                return value
+
+            return request
+
+        monkeypatch.setattr(
+            serving_api.ServingApi, "is_kserve_installed", concurrent(True)
+        )
+        monkeypatch.setattr(
+            serving_api.ServingApi,
+            "get_resource_limits",
+            concurrent(_CONFIGURATION["resource_limits"]),
+        )
+        monkeypatch.setattr(
+            serving_api.ServingApi,
+            "get_num_instances_limits",
+            concurrent(_CONFIGURATION["num_instances_limits"]),
+        )
+        monkeypatch.setattr(
+            serving_api.ServingApi,
+            "get_knative_domain",
+            concurrent(_CONFIGURATION["knative_domain"]),
+        )
+        monkeypatch.setattr(
+            serving_api.ServingApi, "get_inference_endpoints", lambda self: []
+        )
+        monkeypatch.setattr(
+            api,
+            "_get_istio_endpoint",
+            lambda endpoints: _CONFIGURATION["istio_endpoint"],
+        )
+
+        # Act
+        api.load_default_configuration()
+
+        # Assert
+        assert serving_configuration == _CONFIGURATION
+        assert (
+            api._configuration_cache.get("external", "https://hopsworks.ai:443", 119)
+            == _CONFIGURATION
+        )
@@ -0,0 +1,243 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import gzip
+import json
+import socket
+from unittest import mock
+
+import pytest
+import requests
+from hsml import client
+from hsml.bench import server as bench_server
+from hsml.client import compression
+from hsml.client.configuration_cache import ConfigurationCache
+from hsml.client.istio import external as istio_external
+from hsml.constants import INFERENCE_ENDPOINTS
+from hsml.core import serving_api
+
+
+class _RecordingInferenceServer(bench_server.LocalInferenceServer):
+    """Local inference server recording the encoding headers of each request."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.requests = []
+
+    def _get_request_handler(self):
+        server = self
+        request_handler = super()._get_request_handler()
+
+        class _RecordingRequestHandler(request_handler):
+            def do_POST(self):
+                server.requests.append(
+                    {
+                        "content_encoding": self.headers.get("Content-Encoding"),
+                        "accept_encoding": self.headers.get("Accept-Encoding"),
+                        "content_length": int(self.headers["Content-Length"]),
+                    }
+                )
+                super().do_POST()
+
+        return _RecordingRequestHandler
+
+
+@pytest.fixture
+def inference_server(monkeypatch):
+    servers = []
+
+    def create(**kwargs):
+        server = _RecordingInferenceServer(model_fn=lambda x: x * 2, **kwargs).start()
+        servers.append(server)
+        _, port = server.rest_url.rsplit(":", 1)
+        istio_client = istio_external.Client("127.0.0.1", int(port), "test", "key")
+        monkeypatch.setattr(client, "get_istio_instance", lambda: istio_client)
+        monkeypatch.setattr(client, "get_knative_domain", lambda: "example.com")
+        return server
+
+    yield create
+    for server in servers:
+        server.stop()
+
+
+def _deployment(compression_configuration):
+    deployment = mock.MagicMock()
+    deployment.name = "test"
+    deployment.api_protocol = INFERENCE_ENDPOINTS.API_PROTOCOL_REST
+    deployment._request_compression = compression.RequestCompression(
+        compression_configuration
+    )
+    return deployment
+
+
+def _predict(deployment, instances):
+    return serving_api.ServingApi().send_inference_request(
+        deployment, {"instances": instances}
+    )
+
+
+class TestServingApiCompression:
+    def test_below_min_size_not_compressed(self, inference_server):
+        # Arrange
+        server = inference_server()
+        deployment = _deployment({"algorithm": "gzip", "min_size": 1024})
+
+        # Act
+        response = _predict(deployment, [[1, 2, 3]])
+
+        # Assert
+        assert response == {"predictions": [[2, 4, 6]]}
+        assert server.requests[0]["content_encoding"] is None
+
+    def test_above_min_size_gzip(self, inference_server):
+        # Arrange
+        server = inference_server()
+        deployment = _deployment({"algorithm": "gzip", "min_size": 1024})
+        instances = [[i % 10] * 10 for i in range(1000)]
+
+        # Act
+        response = _predict(deployment, instances)
+
+        # Assert
+        assert response == {"predictions": [[x * 2 for x in row] for row in instances]}
+        assert server.requests[0]["content_encoding"] == "gzip"
+        assert server.requests[0]["content_length"] < len(
+            json.dumps({"instances": instances})
+        )
+
+    def test_above_min_size_zstd(self, inference_server):
+        # Arrange
+        pytest.importorskip("zstandard")
+        server = inference_server()
+        deployment = _deployment({"algorithm": "zstd", "min_size": 1024})
+        instances = [[i % 10] * 10 for i in range(1000)]
+
+        # Act
+        response = _predict(deployment, instances)
+
+        # Assert
+        assert response == {"predictions": [[x * 2 for x in row] for row in instances]}
+        assert server.requests[0]["content_encoding"] == "zstd"
+
+    def test_zstd_without_zstandard(self, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(compression, "zstandard", None)
+
+        # Act
+        with pytest.raises(ImportError) as e_info:
+            compression.RequestCompression({"algorithm": "zstd"})
+
+        # Assert
+        assert "pip install zstandard" in str(e_info.value)
+
+    def test_server_rejects_zstd_without_zstandard(self, inference_server, monkeypatch):
+        # Arrange
+        monkeypatch.setattr(bench_server, "zstandard", None)
+        server = inference_server()
+
+        # Act
+        response = requests.post(
+            server.rest_url + "/v1/models/test:predict",
+            data=b"not decoded",
+            headers={"Content-Encoding": "zstd"},
+        )
+
+        # Assert
+        assert response.status_code == 415
+
+    def test_compressed_response_decoded(self, inference_server):
+        # Arrange
+        server = inference_server(compress_responses=True)
+        deployment = _deployment({"algorithm": None})
+        instances = [[i % 10] * 10 for i in range(1000)]
+
+        # Act
+        response = _predict(deployment, instances)
+
+        # Assert
+        assert response == {"predictions": [[x * 2 for x in row] for row in instances]}
+        assert server.requests[0]["content_encoding"] is None
+        assert "gzip" in server.requests[0]["accept_encoding"]
+
+    def test_compressed_response_sent_by_server(self, inference_server):
+        # Arrange
+        server = inference_server(compress_responses=True)
+
+        # Act
+        response = requests.post(
+            server.rest_url + "/v1/models/test:predict",
+            data=gzip.compress(b'{"instances": [[1, 2]]}'),
+            headers={"Content-Encoding": "gzip", "Accept-Encoding": "gzip"},
+            stream=True,
+        )
+
+        # Assert
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(response.raw.read())) == {
+            "predictions": [[2, 4]]
+        }
+
+
+@pytest.fixture
+def cached_configuration(tmp_path, monkeypatch):
+    _client = mock.MagicMock()
+    _client._base_url = "https://hopsworks.ai:443"
+    _client._project_id = 119
+    monkeypatch.setattr(client, "get_instance", lambda: _client)
+    monkeypatch.setattr(client, "get_client_type", lambda: "external")
+    monkeypatch.setenv(ConfigurationCache.CACHE_DIR_ENV, str(tmp_path))
+    cache = ConfigurationCache()
+    cache.put("external", "https://hopsworks.ai:443", 119, {"kserve_installed": True})
+    return cache
+
+
+class TestServingApiConfigurationCache:
+    def test_istio_connection_error_invalidates_configuration(
+        self, cached_configuration, monkeypatch
+    ):
+        # Arrange
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            _, port = sock.getsockname()
+        # nothing listens on the port anymore
+        istio_client = istio_external.Client("127.0.0.1", port, "test", "key")
+        monkeypatch.setattr(client, "get_istio_instance", lambda: istio_client)
+        monkeypatch.setattr(client, "get_knative_domain", lambda: "example.com")
+
+        # Act
+        with pytest.raises(requests.exceptions.ConnectionError):
+            _predict(_deployment(None), [[1, 2, 3]])
+
+        # Assert
+        assert (
+            cached_configuration.get("external", "https://hopsworks.ai:443", 119)
+            is None
+        )
+
+    def test_istio_request_keeps_configuration(
+        self, cached_configuration, inference_server
+    ):
+        # Arrange
+        inference_server()
+
+        # Act
+        response = _predict(_deployment(None), [[1, 2, 3]])
+
+        # Assert
+        assert response == {"predictions": [[2, 4, 6]]}
+        assert cached_configuration.get(
+            "external", "https://hopsworks.ai:443", 119
+        ) == {"kserve_installed": True}
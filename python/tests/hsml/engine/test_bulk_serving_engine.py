@@ -0,0 +1,206 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import threading
+from unittest import mock
+
+import pytest
+from hsml.client.exceptions import ModelServingException
+from hsml.constants import DEPLOYMENT, DEPLOYMENT_ACTION, PREDICTOR_STATE
+from hsml.core import serving_api
+from hsml.engine import bulk_serving_engine
+from hsml.engine.state_watcher import Backoff, StateWatcher
+from hsml.predictor_state import PredictorState
+from hsml.predictor_state_condition import PredictorStateCondition
+
+
+def _state(status):
+    condition = PredictorStateCondition(
+        type=PREDICTOR_STATE.CONDITION_TYPE_STARTED, reason="Deployment " + status
+    )
+    return PredictorState(
+        available_predictor_instances=0,
+        available_transformer_instances=None,
+        hopsworks_inference_path=None,
+        model_server_inference_path=None,
+        internal_port=None,
+        revision=None,
+        deployed=None,
+        condition=condition,
+        status=status,
+    )
+
+
+class _FakeServingApi:
+    """Deployment states returned by consecutive probes, the last one is kept."""
+
+    def __init__(self, statuses):
+        self._statuses = statuses
+        self._lock = threading.Lock()
+        self.actions = []
+
+    def get_state(self, deployment_instance):
+        with self._lock:
+            return _state(self._statuses[deployment_instance.id][0])
+
+    def get_states(self):
+        with self._lock:
+            for statuses in self._statuses.values():
+                if len(statuses) > 1:
+                    statuses.pop(0)
+            return {id: _state(statuses[0]) for id, statuses in self._statuses.items()}
+
+    def post(self, deployment_instance, action):
+        with self._lock:
+            self.actions.append(
+                (
+                    deployment_instance.id,
+                    action,
+                    self._statuses[deployment_instance.id][0],
+                )
+            )
+
+
+@pytest.fixture
+def fake_serving_api(monkeypatch):
+    def create(statuses):
+        fake = _FakeServingApi(statuses)
+        monkeypatch.setattr(serving_api.ServingApi, "get_state", fake.get_state)
+        monkeypatch.setattr(serving_api.ServingApi, "get_states", fake.get_states)
+        monkeypatch.setattr(serving_api.ServingApi, "post", fake.post)
+        return fake
+
+    # probe states right away
+    monkeypatch.setattr(
+        bulk_serving_engine,
+        "StateWatcher",
+        lambda get_state: StateWatcher(get_state, Backoff(0.01, 0.01)),
+    )
+    return create
+
+
+def _deployment(id):
+    deployment = mock.MagicMock()
+    deployment.id = id
+    return deployment
+
+
+class TestBulkServingEngine:
+    def test_start_creating_deployment(self, fake_serving_api):
+        # Arrange
+        fake = fake_serving_api(
+            {
+                1: [
+                    PREDICTOR_STATE.STATUS_CREATING,
+                    PREDICTOR_STATE.STATUS_CREATED,
+                    PREDICTOR_STATE.STATUS_STARTING,
+                    PREDICTOR_STATE.STATUS_RUNNING,
+                ]
+            }
+        )
+
+        # Act
+        (result,) = bulk_serving_engine.BulkServingEngine().apply(
+            [_deployment(1)], DEPLOYMENT_ACTION.START, await_status=5
+        )
+
+        # Assert
+        assert result.outcome == DEPLOYMENT_ACTION.OUTCOME_SUCCEEDED
+        assert result.state.status == PREDICTOR_STATE.STATUS_RUNNING
+        # started once created
+        assert fake.actions == [
+            (1, DEPLOYMENT.ACTION_START, PREDICTOR_STATE.STATUS_CREATED)
+        ]
+
+    def test_start_failed_deployment(self, fake_serving_api):
+        # Arrange
+        fake = fake_serving_api(
+            {
+                1: [
+                    PREDICTOR_STATE.STATUS_STOPPED,
+                    PREDICTOR_STATE.STATUS_STARTING,
+                    PREDICTOR_STATE.STATUS_FAILED,
+                ]
+            }
+        )
+
+        # Act
+        (result,) = bulk_serving_engine.BulkServingEngine().apply(
+            [_deployment(1)], DEPLOYMENT_ACTION.START, await_status=5
+        )
+
+        # Assert
+        assert result.outcome == DEPLOYMENT_ACTION.OUTCOME_FAILED
+        assert result.state.status == PREDICTOR_STATE.STATUS_FAILED
+        assert isinstance(result.error, ModelServingException)
+        assert fake.actions == [
+            (1, DEPLOYMENT.ACTION_START, PREDICTOR_STATE.STATUS_STOPPED)
+        ]
+
+    def test_start_pending_on_timeout(self, fake_serving_api):
+        # Arrange
+        fake_serving_api(
+            {1: [PREDICTOR_STATE.STATUS_STOPPED, PREDICTOR_STATE.STATUS_STARTING]}
+        )
+
+        # Act
+        (result,) = bulk_serving_engine.BulkServingEngine().apply(
+            [_deployment(1)], DEPLOYMENT_ACTION.START, await_status=0.2
+        )
+
+        # Assert
+        assert result.outcome == DEPLOYMENT_ACTION.OUTCOME_PENDING
+        assert result.state.status == PREDICTOR_STATE.STATUS_STARTING
+
+    @pytest.mark.parametrize(
+        "status",
+        [
+            PREDICTOR_STATE.STATUS_STARTING,
+            PREDICTOR_STATE.STATUS_UPDATING,
+            PREDICTOR_STATE.STATUS_FAILED,
+        ],
+    )
+    def test_start_does_not_wait_like_single_start(self, fake_serving_api, status):
+        # Arrange
+        fake = fake_serving_api({1: [status]})
+
+        # Act
+        (result,) = bulk_serving_engine.BulkServingEngine().apply(
+            [_deployment(1)], DEPLOYMENT_ACTION.START, await_status=5
+        )
+
+        # Assert
+        assert result.outcome == DEPLOYMENT_ACTION.OUTCOME_SUCCEEDED
+        assert fake.actions == []
+
+    def test_stop_frees_grpc_channel(self, fake_serving_api):
+        # Arrange
+        fake = fake_serving_api(
+            {1: [PREDICTOR_STATE.STATUS_RUNNING, PREDICTOR_STATE.STATUS_STOPPED]}
+        )
+        deployment = _deployment(1)
+
+        # Act
+        (result,) = bulk_serving_engine.BulkServingEngine().apply(
+            [deployment], DEPLOYMENT_ACTION.STOP, await_status=5
+        )
+
+        # Assert
+        assert result.outcome == DEPLOYMENT_ACTION.OUTCOME_SUCCEEDED
+        assert deployment._grpc_channel is None
+        assert fake.actions == [
+            (1, DEPLOYMENT.ACTION_STOP, PREDICTOR_STATE.STATUS_RUNNING)
+        ]
@@ -0,0 +1,127 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import pytest
+from hsml.engine.metadata_cache import MetadataCache
+from hsml.python.model import Model
+
+
+class TestMetadataCache:
+    def test_get_or_load_returns_copies(self):
+        # Arrange
+        cache = MetadataCache()
+        cache.enable()
+        key = (1, "my_model", "model", 1)
+        loaded = cache.get_or_load(
+            key, lambda: Model(id=1, name="my_model", version=1, description="v1")
+        )
+
+        # Act
+        loaded.description = "changed"
+        cached = cache.get_or_load(key, None)
+        cached.description = "changed again"
+
+        # Assert
+        assert cache.get_or_load(key, None).description == "v1"
+        assert cache.get_statistics()["hits"] == 2
+
+    def test_get_or_load_returns_list_copies(self):
+        # Arrange
+        cache = MetadataCache()
+        cache.enable()
+        key = (1, "my_model", "models")
+        cache.get_or_load(
+            key,
+            lambda: [
+                Model(id=1, name="my_model", version=version) for version in (1, 2)
+            ],
+        )
+
+        # Act
+        models = cache.get_or_load(key, None)
+        models.append(Model(id=1, name="my_model", version=3))
+        models[0].description = "changed"
+
+        # Assert
+        models = cache.get_or_load(key, None)
+        assert [model.version for model in models] == [1, 2]
+        assert models[0].description != "changed"
+
+    def test_get_or_load_returns_deep_copies(self):
+        # Arrange
+        cache = MetadataCache()
+        cache.enable()
+        key = (1, "my_model", "model", 1)
+        loaded = cache.get_or_load(
+            key,
+            lambda: Model(id=1, name="my_model", version=1, metrics={"accuracy": 0.9}),
+        )
+
+        # Act
+        loaded.training_metrics["accuracy"] = 0.1
+        cache.get_or_load(key, None).training_metrics["accuracy"] = 0.2
+
+        # Assert
+        assert cache.get_or_load(key, None).training_metrics == {"accuracy": 0.9}
+
+    @pytest.mark.parametrize(
+        "invalidate_args, cached",
+        [
+            ((1, "my_model"), False),
+            ((1, None), False),
+            ((None, None), False),
+            ((1, "other_model"), True),
+            ((2, "my_model"), True),
+        ],
+    )
+    def test_invalidate_while_loading(self, invalidate_args, cached):
+        # Arrange
+        cache = MetadataCache()
+        cache.enable()
+        key = (1, "my_model", "model", 1)
+
+        def load():
+            # e.g., the model is deleted by another thread while its metadata is being loaded
+            model = Model(id=1, name="my_model", version=1)
+            cache.invalidate(*invalidate_args)
+            return model
+
+        # Act
+        cache.get_or_load(key, load)
+
+        # Assert
+        assert cache.get(key)[0] == cached
+
+    def test_put_after_invalidate(self):
+        # Arrange
+        cache = MetadataCache()
+        cache.enable()
+        key = (1, "my_model", "model", 1)
+        generation = cache.get_generation(key)
+        cache.invalidate(1, "my_model")
+
+        # Act
+        cache.put(key, Model(id=1, name="my_model", version=1), generation=generation)
+        stale_found, _ = cache.get(key)
+        cache.put(
+            key,
+            Model(id=1, name="my_model", version=1),
+            generation=cache.get_generation(key),
+        )
+
+        # Assert
+        assert not stale_found
+        assert cache.get(key)[0]
@@ -0,0 +1,360 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from hsml import client
+from hsml.client.exceptions import ModelServingException
+from hsml.client.istio.utils.infer_type import InferInput, InferOutput
+from hsml.client_batcher import ClientBatcher
+from hsml.constants import INFERENCE_ENDPOINTS, PREDICTOR
+from hsml.core import serving_api
+from hsml.deployment import Deployment
+from hsml.engine import serving_engine
+from hsml.engine.micro_batcher import MicroBatcher
+from hsml.python.predictor import Predictor
+
+
+def _resolved(result=None, exception=None):
+    future = Future()
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+    return future
+
+
+class _RecordingSender:
+    """Resolves each batch with the payloads as responses, recording the batches sent."""
+
+    def __init__(self, exception=None, raise_exception=None):
+        self.batches = []
+        self._exception = exception
+        self._raise_exception = raise_exception
+        self._lock = threading.Lock()
+
+    def __call__(self, key, payloads):
+        with self._lock:
+            self.batches.append((key, list(payloads), time.monotonic()))
+        if self._raise_exception is not None:
+            raise self._raise_exception
+        return _resolved(list(payloads), self._exception)
+
+
+class TestMicroBatcher:
+    def test_send_full_batch(self):
+        # Arrange
+        sender = _RecordingSender()
+        batcher = MicroBatcher(sender, max_batch_size=4, max_latency=10_000)
+
+        # Act
+        futures = [batcher.submit("key", i, 1) for i in range(4)]
+
+        # Assert
+        # sent right away, without waiting for the latency
+        assert [future.result(timeout=1) for future in futures] == [0, 1, 2, 3]
+        assert [(key, payloads) for key, payloads, _ in sender.batches] == [
+            ("key", [0, 1, 2, 3])
+        ]
+
+    def test_send_waiting_batch_on_overflow(self):
+        # Arrange
+        sender = _RecordingSender()
+        batcher = MicroBatcher(sender, max_batch_size=4, max_latency=10_000)
+
+        # Act
+        first = batcher.submit("key", "a", 3)
+        second = batcher.submit("key", "b", 2)
+        third = batcher.submit("key", "c", 2)
+
+        # Assert
+        assert first.result(timeout=1) == "a"
+        assert third.result(timeout=1) == "c"
+        assert second.result(timeout=1) == "b"
+        assert [payloads for _, payloads, _ in sender.batches] == [["a"], ["b", "c"]]
+
+    def test_send_on_max_latency(self):
+        # Arrange
+        sender = _RecordingSender()
+        batcher = MicroBatcher(sender, max_batch_size=100, max_latency=50)
+        start = time.monotonic()
+
+        # Act
+        futures = [batcher.submit("key", i, 1) for i in range(3)]
+        results = [future.result(timeout=5) for future in futures]
+
+        # Assert
+        assert results == [0, 1, 2]
+        assert len(sender.batches) == 1
+        assert sender.batches[0][2] - start >= 0.05
+
+    def test_batches_by_key(self):
+        # Arrange
+        sender = _RecordingSender()
+        batcher = MicroBatcher(sender, max_batch_size=100, max_latency=20)
+
+        # Act
+        futures = [batcher.submit(i % 2, i, 1) for i in range(6)]
+        results = [future.result(timeout=5) for future in futures]
+
+        # Assert
+        assert results == list(range(6))
+        assert sorted((key, payloads) for key, payloads, _ in sender.batches) == [
+            (0, [0, 2, 4]),
+            (1, [1, 3, 5]),
+        ]
+
+    def test_concurrent_submits(self):
+        # Arrange
+        sender = _RecordingSender()
+        batcher = MicroBatcher(sender, max_batch_size=8, max_latency=5)
+
+        # Act
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(
+                    lambda i: batcher.submit("key", i, 1).result(timeout=5), range(100)
+                )
+            )
+
+        # Assert
+        assert results == list(range(100))
+        assert all(len(payloads) <= 8 for _, payloads, _ in sender.batches)
+        assert sum(len(payloads) for _, payloads, _ in sender.batches) == 100
+
+    @pytest.mark.parametrize("raised", [True, False])
+    def test_error_propagated_to_every_caller(self, raised):
+        # Arrange
+        error = ConnectionError("Connection refused")
+        sender = (
+            _RecordingSender(raise_exception=error)
+            if raised
+            else _RecordingSender(exception=error)
+        )
+        batcher = MicroBatcher(sender, max_batch_size=3, max_latency=10_000)
+
+        # Act
+        futures = [batcher.submit("key", i, 1) for i in range(3)]
+
+        # Assert
+        for future in futures:
+            with pytest.raises(ConnectionError):
+                future.result(timeout=1)
+        assert len(sender.batches) == 1
+
+
+class _FakeInferenceApi:
+    """Doubles the inputs of REST and gRPC inference requests, recording the payloads sent."""
+
+    def __init__(self, exception=None, drop_row=False):
+        self.payloads = []
+        self._exception = exception
+        self._drop_row = drop_row
+        self._lock = threading.Lock()
+
+    def send_inference_request_future(
+        self, deployment_instance, data, through_hopsworks=False
+    ):
+        with self._lock:
+            self.payloads.append(data)
+        if self._exception is not None:
+            return _resolved(exception=self._exception)
+        if isinstance(data, dict):
+            predictions = [[value * 2 for value in row] for row in data["instances"]]
+            return _resolved({"predictions": predictions[self._drop_row :]})
+        outputs = []
+        for infer_input in data:
+            array = infer_input.as_numpy()[self._drop_row :] * 2
+            output = InferOutput(
+                infer_input.name + "-output", list(array.shape), infer_input.datatype
+            )
+            output.set_data_from_numpy(array)
+            outputs.append(output)
+        return _resolved(outputs)
+
+
+def _infer_input(array, name="input-0"):
+    infer_input = InferInput(name, list(array.shape), "FP64")
+    infer_input.set_data_from_numpy(array)
+    return infer_input
+
+
+@pytest.fixture
+def batching_deployment(monkeypatch):
+    monkeypatch.setattr(
+        client,
+        "get_serving_resource_limits",
+        lambda: {"cores": -1, "memory": -1, "gpus": -1},
+    )
+    monkeypatch.setattr(client, "get_serving_num_instances_limits", lambda: [0, -1])
+
+    def create(fake, api_protocol=INFERENCE_ENDPOINTS.API_PROTOCOL_REST, **kwargs):
+        monkeypatch.setattr(
+            serving_api.ServingApi,
+            "send_inference_request_future",
+            fake.send_inference_request_future,
+        )
+        predictor = Predictor(
+            name="test",
+            model_name="test",
+            model_path="/Models/test/1",
+            model_version=1,
+            model_framework="PYTHON",
+            artifact_version=1,
+            model_server="PYTHON",
+            serving_tool=PREDICTOR.SERVING_TOOL_KSERVE,
+            script_file="predictor.py",
+            api_protocol=api_protocol,
+        )
+        deployment = Deployment(predictor=predictor, name="test")
+        deployment.client_batcher = ClientBatcher(enabled=True, **kwargs)
+        return deployment
+
+    return create
+
+
+class TestServingEngineMicroBatching:
+    def test_send_micro_batch_rest(self, batching_deployment):
+        # Arrange
+        fake = _FakeInferenceApi()
+        deployment = batching_deployment(fake)
+        engine = serving_engine.ServingEngine()
+        payloads = [{"instances": [[1, 2]]}, {"instances": [[3, 4], [5, 6]]}]
+
+        # Act
+        responses = engine._send_micro_batch(deployment, (False,), payloads).result()
+
+        # Assert
+        assert fake.payloads == [{"instances": [[1, 2], [3, 4], [5, 6]]}]
+        assert responses == [
+            {"predictions": [[2, 4]]},
+            {"predictions": [[6, 8], [10, 12]]},
+        ]
+
+    def test_send_micro_batch_grpc(self, batching_deployment):
+        # Arrange
+        fake = _FakeInferenceApi()
+        deployment = batching_deployment(
+            fake, api_protocol=INFERENCE_ENDPOINTS.API_PROTOCOL_GRPC
+        )
+        engine = serving_engine.ServingEngine()
+        arrays = [np.array([[1.0, 2.0]]), np.array([[3.0, 4.0], [5.0, 6.0]])]
+        payloads = [[_infer_input(array)] for array in arrays]
+
+        # Act
+        responses = engine._send_micro_batch(deployment, (False,), payloads).result()
+
+        # Assert
+        (merged_input,) = fake.payloads[0]
+        np.testing.assert_array_equal(merged_input.as_numpy(), np.concatenate(arrays))
+        assert len(responses) == 2
+        for array, outputs in zip(arrays, responses):
+            (output,) = outputs
+            assert output.name == "input-0-output"
+            assert output.shape == list(array.shape)
+            np.testing.assert_array_equal(output.as_numpy(), array * 2)
+
+    def test_split_micro_batch_response_rest_mismatch(self):
+        # Arrange
+        engine = serving_engine.ServingEngine()
+
+        # Act
+        with pytest.raises(ModelServingException):
+            engine._split_micro_batch_response({"predictions": [[1], [2]]}, [1, 2])
+
+    def test_split_micro_batch_response_grpc_mismatch(self):
+        # Arrange
+        engine = serving_engine.ServingEngine()
+        output = InferOutput("output-0", [2, 1], "FP64")
+        output.set_data_from_numpy(np.array([[1.0], [2.0]]))
+
+        # Act
+        with pytest.raises(ModelServingException):
+            engine._split_micro_batch_response([output], [1, 2])
+
+    def test_predict_concurrently(self, batching_deployment):
+        # Arrange
+        fake = _FakeInferenceApi()
+        deployment = batching_deployment(fake, max_batch_size=8, max_latency=5)
+
+        # Act
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(
+                executor.map(lambda i: deployment.predict(inputs=[[i, 1]]), range(40))
+            )
+
+        # Assert
+        assert responses == [{"predictions": [[i * 2, 2]]} for i in range(40)]
+        assert len(fake.payloads) < 40
+        assert all(len(payload["instances"]) <= 8 for payload in fake.payloads)
+
+    def test_unbatchable_payload(self, batching_deployment):
+        # Arrange
+        fake = _FakeInferenceApi()
+        deployment = batching_deployment(fake, max_batch_size=8, max_latency=10_000)
+
+        # Act
+        response = deployment.predict(
+            data={"instances": [[1, 2]], "parameters": {"threshold": 0.5}}
+        )
+
+        # Assert
+        # sent on its own, without waiting for the latency
+        assert response == {"predictions": [[2, 4]]}
+        assert len(fake.payloads) == 1
+
+    def test_error_propagated_to_every_caller(self, batching_deployment):
+        # Arrange
+        fake = _FakeInferenceApi(exception=ConnectionError("Connection refused"))
+        deployment = batching_deployment(fake, max_batch_size=4, max_latency=10_000)
+        engine = serving_engine.ServingEngine()
+
+        # Act
+        futures = [engine.predict_future(deployment, None, [[i, 1]]) for i in range(4)]
+
+        # Assert
+        for future in futures:
+            with pytest.raises(ConnectionError):
+                future.result(timeout=1)
+        assert len(fake.payloads) == 1
+
+    def test_split_error_propagated_to_every_caller(self, batching_deployment):
+        # Arrange
+        fake = _FakeInferenceApi(drop_row=True)
+        deployment = batching_deployment(
+            fake,
+            api_protocol=INFERENCE_ENDPOINTS.API_PROTOCOL_GRPC,
+            max_batch_size=2,
+            max_latency=10_000,
+        )
+        engine = serving_engine.ServingEngine()
+
+        # Act
+        futures = [
+            engine.predict_future(
+                deployment, [_infer_input(np.array([[float(i)]]))], None
+            )
+            for i in range(2)
+        ]
+
+        # Assert
+        for future in futures:
+            with pytest.raises(ModelServingException):
+                future.result(timeout=1)
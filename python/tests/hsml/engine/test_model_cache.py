@@ -0,0 +1,88 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import os
+import shutil
+import time
+
+from hsml.engine.model_cache import ModelCache
+
+
+def _download_fn(size):
+    def download(local_path):
+        with open(os.path.join(local_path, "model.bin"), "wb") as f:
+            f.write(b"0" * size)
+
+    return download
+
+
+def _make_old(cache, name, version):
+    key = cache._get_key("host", 1, name, version)
+    metadata_path = os.path.join(
+        cache._entries_dir, key, ModelCache.ENTRY_METADATA_FILE
+    )
+    last_used = time.time() - 3600
+    os.utime(metadata_path, (last_used, last_used))
+
+
+class TestModelCache:
+    def test_get_or_download_evicts_least_recently_used(self, tmp_path):
+        # Arrange
+        cache = ModelCache(cache_dir=str(tmp_path), max_size=1, grace_period=60)
+        first_path = cache.get_or_download("host", 1, "first", 1, _download_fn(600000))
+        _make_old(cache, "first", 1)
+
+        # Act
+        second_path = cache.get_or_download(
+            "host", 1, "second", 1, _download_fn(600000)
+        )
+
+        # Assert
+        assert not os.path.exists(first_path)
+        assert os.path.exists(second_path)
+
+    def test_get_or_download_keeps_entries_within_grace_period(self, tmp_path):
+        # Arrange
+        cache = ModelCache(cache_dir=str(tmp_path), max_size=1, grace_period=60)
+        first_path = cache.get_or_download("host", 1, "first", 1, _download_fn(600000))
+
+        # Act
+        second_path = cache.get_or_download(
+            "host", 1, "second", 1, _download_fn(600000)
+        )
+
+        # Assert
+        assert os.path.exists(os.path.join(first_path, "model.bin"))
+        assert os.path.exists(os.path.join(second_path, "model.bin"))
+
+    def test_get_or_download_does_not_cache_model_bigger_than_max_size(self, tmp_path):
+        # Arrange
+        cache = ModelCache(cache_dir=str(tmp_path), max_size=1, grace_period=0)
+        cached_path = cache.get_or_download("host", 1, "cached", 1, _download_fn(1000))
+
+        # Act
+        big_path = cache.get_or_download("host", 1, "big", 1, _download_fn(2000000))
+
+        # Assert
+        try:
+            assert not big_path.startswith(str(tmp_path))
+            assert os.path.getsize(os.path.join(big_path, "model.bin")) == 2000000
+            assert os.path.exists(os.path.join(cached_path, "model.bin"))
+            assert os.listdir(cache._entries_dir) == [
+                cache._get_key("host", 1, "cached", 1)
+            ]
+        finally:
+            shutil.rmtree(os.path.dirname(os.path.dirname(big_path)))
@@ -0,0 +1,554 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import hashlib
+import json
+import os
+import threading
+import time
+from unittest import mock
+
+import pytest
+from hsml import client, constants
+from hsml.engine import model_engine
+from hsml.model import Model
+
+
+_MODEL_VERSION_PATH = "/Projects/test/Models/my_model/2"
+
+
+class _FakeEngine:
+    """Records the filesystem operations of the model engine, tracking the uploads in flight."""
+
+    def __init__(self, delay=0.01, failing_file=None, remote_files=None):
+        self._delay = delay
+        self._remote_files = remote_files if remote_files is not None else {}
+        self._failing_file = failing_file
+        self._lock = threading.Lock()
+        self.mkdirs = []
+        self.uploaded = {}
+        self.copied = {}
+        self.uploads_in_flight = 0
+        self.max_uploads_in_flight = 0
+        self.bytes_in_flight = 0
+        self.max_bytes_in_flight = 0
+        self.bytes_in_flight_by_file = {}
+        self.downloads_in_flight = 0
+        self.max_downloads_in_flight = 0
+
+    def mkdir(self, remote_path):
+        self.mkdirs.append(remote_path)
+
+    def upload(self, local_path, remote_path, upload_configuration=None):
+        file_name = os.path.basename(local_path)
+        size = os.path.getsize(local_path)
+        with self._lock:
+            self.uploads_in_flight += 1
+            self.bytes_in_flight += size
+            self.max_uploads_in_flight = max(
+                self.max_uploads_in_flight, self.uploads_in_flight
+            )
+            self.max_bytes_in_flight = max(
+                self.max_bytes_in_flight, self.bytes_in_flight
+            )
+            self.bytes_in_flight_by_file[file_name] = self.bytes_in_flight
+        try:
+            time.sleep(self._delay)
+            if file_name == self._failing_file:
+                raise OSError("Upload of {} failed".format(file_name))
+            with open(local_path, "rb") as f:
+                self.uploaded[remote_path + "/" + file_name] = f.read()
+        finally:
+            with self._lock:
+                self.uploads_in_flight -= 1
+                self.bytes_in_flight -= size
+
+    def copy(self, source_path, destination_path):
+        self.copied[destination_path] = source_path
+
+    def download(self, remote_path, local_path):
+        with self._lock:
+            self.downloads_in_flight += 1
+            self.max_downloads_in_flight = max(
+                self.max_downloads_in_flight, self.downloads_in_flight
+            )
+        try:
+            time.sleep(self._delay)
+            with open(local_path, "wb") as f:
+                f.write(self._remote_files[remote_path])
+        finally:
+            with self._lock:
+                self.downloads_in_flight -= 1
+
+
+class _FakeDatasetApi:
+    """Lists the folders of a remote tree of nested dictionaries, with file contents as leaves."""
+
+    def __init__(self, root_path, tree):
+        self._folders = {}
+        self.files = {}
+        self._add_folder(root_path, tree)
+
+    def _add_folder(self, path, tree):
+        self._folders[path] = tree
+        for name, value in tree.items():
+            if isinstance(value, dict):
+                self._add_folder(path + "/" + name, value)
+            else:
+                self.files[path + "/" + name] = value
+
+    def path_exists(self, path):
+        return path in self._folders or path in self.files
+
+    def list(self, path, sort_by=None):
+        return {
+            "items": [
+                {
+                    "attributes": {
+                        "path": path + "/" + name,
+                        "dir": isinstance(value, dict),
+                    }
+                }
+                for name, value in sorted(self._folders[path].items(), reverse=True)
+            ]
+        }
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(client, "get_instance", lambda: mock.MagicMock())
+    engine = model_engine.ModelEngine()
+    engine._engine = _FakeEngine()
+    return engine
+
+
+def _write_files(folder, files):
+    for relative_path, content in files.items():
+        path = os.path.join(folder, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+
+
+def _local_files(folder, sizes):
+    local_files = []
+    for i, size in enumerate(sizes):
+        file_name = "file_{}.bin".format(i)
+        _write_files(folder, {file_name: os.urandom(size)})
+        local_files.append(
+            (os.path.join(folder, file_name), _MODEL_VERSION_PATH, file_name)
+        )
+    return local_files
+
+
+class TestUploadLocalModel:
+    def test_upload_folder(self, engine, tmp_path):
+        # Arrange
+        files = {
+            "model.pkl": b"model",
+            "sub/weights.bin": b"weights",
+            "sub/deeper/config.json": b"{}",
+        }
+        _write_files(str(tmp_path), files)
+        progress = []
+
+        # Act
+        engine._upload_local_model(
+            str(tmp_path),
+            _MODEL_VERSION_PATH,
+            lambda n_dirs, n_files: progress.append((n_dirs, n_files)),
+        )
+
+        # Assert
+        # parent folders are created before their children
+        assert engine._engine.mkdirs == [
+            _MODEL_VERSION_PATH + "/sub",
+            _MODEL_VERSION_PATH + "/sub/deeper",
+        ]
+        assert engine._engine.uploaded == {
+            _MODEL_VERSION_PATH + "/" + path: content for path, content in files.items()
+        }
+        assert progress[-1] == (2, 3)
+
+    def test_upload_file(self, engine, tmp_path):
+        # Arrange
+        _write_files(str(tmp_path), {"model.pkl": b"model"})
+
+        # Act
+        engine._upload_local_model(
+            str(tmp_path / "model.pkl"), _MODEL_VERSION_PATH, lambda *args: None
+        )
+
+        # Assert
+        assert engine._engine.mkdirs == []
+        assert engine._engine.uploaded == {_MODEL_VERSION_PATH + "/model.pkl": b"model"}
+
+
+class TestUploadLocalFiles:
+    def test_simultaneous_files(self, engine, tmp_path):
+        # Arrange
+        local_files = _local_files(str(tmp_path), [10] * 8)
+
+        # Act
+        engine._upload_local_files(
+            local_files, 0, lambda *args: None, {"simultaneous_files": 2}
+        )
+
+        # Assert
+        assert len(engine._engine.uploaded) == 8
+        assert 1 <= engine._engine.max_uploads_in_flight <= 2
+
+    def test_max_inflight_size(self, engine, tmp_path):
+        # Arrange
+        local_files = _local_files(str(tmp_path), [400 * 1024] * 6)
+
+        # Act
+        engine._upload_local_files(
+            local_files,
+            0,
+            lambda *args: None,
+            {"simultaneous_files": 4, "max_inflight_size": 1},
+        )
+
+        # Assert
+        assert len(engine._engine.uploaded) == 6
+        # two files fit in 1 MB, a third one does not
+        assert engine._engine.max_bytes_in_flight <= 1024 * 1024
+        assert engine._engine.max_uploads_in_flight <= 2
+
+    def test_file_bigger_than_max_inflight_size(self, engine, tmp_path):
+        # Arrange
+        local_files = _local_files(str(tmp_path), [100, 2 * 1024 * 1024, 100])
+
+        # Act
+        engine._upload_local_files(
+            local_files,
+            0,
+            lambda *args: None,
+            {"simultaneous_files": 4, "max_inflight_size": 1},
+        )
+
+        # Assert
+        assert len(engine._engine.uploaded) == 3
+        # uploaded once nothing else is in flight
+        assert engine._engine.bytes_in_flight_by_file["file_1.bin"] == 2 * 1024 * 1024
+
+    def test_progress_in_order(self, engine, tmp_path):
+        # Arrange
+        engine._engine = _FakeEngine(delay=0)
+        local_files = _local_files(str(tmp_path), [10] * 50)
+        progress = []
+
+        # Act
+        engine._upload_local_files(
+            local_files,
+            3,
+            lambda n_dirs, n_files: progress.append((n_dirs, n_files)),
+            {"simultaneous_files": 8},
+        )
+
+        # Assert
+        assert progress == [(3, n_files) for n_files in range(1, 51)]
+
+    def test_upload_error(self, engine, tmp_path):
+        # Arrange
+        engine._engine = _FakeEngine(failing_file="file_0.bin")
+        local_files = _local_files(str(tmp_path), [10] * 10)
+
+        # Act
+        with pytest.raises(OSError):
+            engine._upload_local_files(
+                local_files, 0, lambda *args: None, {"simultaneous_files": 1}
+            )
+
+        # Assert
+        # pending uploads are cancelled after the first failure
+        assert len(engine._engine.uploaded) < 9
+
+
+def _read_files(folder):
+    files = {}
+    for root, _, file_names in os.walk(folder):
+        for file_name in file_names:
+            path = os.path.join(root, file_name)
+            with open(path, "rb") as f:
+                files[os.path.relpath(path, folder).replace(os.sep, "/")] = f.read()
+    return files
+
+
+class TestDownloadModelFromHopsfs:
+    def _set_remote_tree(self, engine, tree):
+        engine._dataset_api = _FakeDatasetApi(_MODEL_VERSION_PATH, tree)
+        engine._engine = _FakeEngine(remote_files=engine._dataset_api.files)
+
+    def test_download(self, engine, tmp_path):
+        # Arrange
+        self._set_remote_tree(
+            engine,
+            {
+                "model.pkl": b"model",
+                "model_files_checksums.json": b"{}",
+                "Artifacts": {"report.html": b"report"},
+                "sub": {
+                    "weights.bin": b"weights",
+                    "empty": {},
+                    "deeper": {"config.json": b"{}", "Artifacts": {}},
+                },
+            },
+        )
+        progress = []
+
+        # Act
+        engine._download_model_from_hopsfs(
+            _MODEL_VERSION_PATH,
+            str(tmp_path),
+            lambda **kwargs: progress.append(kwargs),
+        )
+
+        # Assert
+        # the Artifacts folder and the checksums of delta uploads are not downloaded
+        assert _read_files(str(tmp_path)) == {
+            "model.pkl": b"model",
+            "sub/weights.bin": b"weights",
+            "sub/deeper/config.json": b"{}",
+        }
+        assert os.path.isdir(tmp_path / "sub" / "empty")
+        assert not os.path.exists(tmp_path / "sub" / "deeper" / "Artifacts")
+        assert progress[-1] == {"n_dirs": 3, "n_files": 3, "done": True}
+
+    def test_concurrency(self, engine, tmp_path):
+        # Arrange
+        self._set_remote_tree(
+            engine,
+            {
+                "folder_{}".format(i): {
+                    "file_{}.bin".format(j): os.urandom(10) for j in range(5)
+                }
+                for i in range(4)
+            },
+        )
+
+        # Act
+        engine._download_model_from_hopsfs(
+            _MODEL_VERSION_PATH, str(tmp_path), lambda **kwargs: None, concurrency=3
+        )
+
+        # Assert
+        assert len(_read_files(str(tmp_path))) == 20
+        assert 1 < engine._engine.max_downloads_in_flight <= 3
+
+    def test_download_error(self, engine, tmp_path):
+        # Arrange
+        self._set_remote_tree(
+            engine, {"file_{}.bin".format(i): b"content" for i in range(10)}
+        )
+        del engine._engine._remote_files[_MODEL_VERSION_PATH + "/file_0.bin"]
+
+        # Act
+        with pytest.raises(KeyError):
+            engine._download_model_from_hopsfs(
+                _MODEL_VERSION_PATH, str(tmp_path), lambda **kwargs: None
+            )
+
+        # Assert
+        # no download is in flight once the error is raised
+        assert engine._engine.downloads_in_flight == 0
+
+    @pytest.mark.parametrize(
+        "kwargs, expected",
+        [
+            ({}, model_engine.ModelEngine.DEFAULT_DOWNLOAD_CONCURRENCY),
+            ({"concurrency": 2}, 2),
+        ],
+    )
+    def test_model_download_concurrency(
+        self, engine, tmp_path, monkeypatch, kwargs, expected
+    ):
+        # Arrange
+        monkeypatch.setattr(model_engine.tempfile, "gettempdir", lambda: str(tmp_path))
+        model = Model(1, "my_model", version=2)
+        model._model_engine = engine
+        download_model = mock.Mock()
+        monkeypatch.setattr(engine, "_download_model", download_model)
+
+        # Act
+        model.download(**kwargs)
+
+        # Assert
+        (_, _, concurrency), _ = download_model.call_args
+        assert concurrency == expected
+
+
+def _sha256(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+class TestDeltaUpload:
+    _MODEL_PATH = _MODEL_VERSION_PATH.rsplit("/", 1)[0]
+
+    def _set_remote_versions(self, engine, versions):
+        engine._dataset_api = _FakeDatasetApi(self._MODEL_PATH, versions)
+        engine._engine = _FakeEngine(remote_files=engine._dataset_api.files)
+
+    def _checksums_file(self, files):
+        return json.dumps(
+            {
+                "algorithm": "sha256",
+                "files": {path: _sha256(content) for path, content in files.items()},
+            }
+        ).encode()
+
+    def test_base_version_checksums(self, engine, tmp_path, monkeypatch):
+        # Arrange
+        monkeypatch.chdir(tmp_path)
+        self._set_remote_versions(
+            engine,
+            {
+                "1": {
+                    "model.pkl": b"model v1",
+                    constants.MODEL_REGISTRY.MODEL_FILES_CHECKSUMS: self._checksums_file(
+                        {"model.pkl": b"model v1"}
+                    ),
+                },
+                "3": {},
+                "notes": {},
+            },
+        )
+
+        # Act
+        checksums = engine._get_base_version_checksums(_MODEL_VERSION_PATH)
+
+        # Assert
+        # the highest version lower than the one being saved
+        assert checksums == {_sha256(b"model v1"): self._MODEL_PATH + "/1/model.pkl"}
+
+    def test_base_version_without_checksums(self, engine, tmp_path, monkeypatch):
+        # Arrange
+        monkeypatch.chdir(tmp_path)
+        self._set_remote_versions(engine, {"1": {"model.pkl": b"model v1"}})
+
+        # Act
+        checksums = engine._get_base_version_checksums(_MODEL_VERSION_PATH)
+
+        # Assert
+        assert checksums == {}
+
+    def test_no_base_version(self, engine):
+        # Arrange
+        self._set_remote_versions(engine, {"3": {}})
+
+        # Act
+        checksums = engine._get_base_version_checksums(_MODEL_VERSION_PATH)
+
+        # Assert
+        assert checksums == {}
+
+    def test_delta_upload(self, engine, tmp_path, monkeypatch):
+        # Arrange
+        monkeypatch.chdir(tmp_path)
+        base_files = {"model.pkl": b"model v1", "sub/vocabulary.txt": b"a b c"}
+        self._set_remote_versions(
+            engine,
+            {
+                "1": {
+                    "model.pkl": b"model v1",
+                    "sub": {"vocabulary.txt": b"a b c"},
+                    constants.MODEL_REGISTRY.MODEL_FILES_CHECKSUMS: self._checksums_file(
+                        base_files
+                    ),
+                },
+            },
+        )
+        files = {
+            "model.pkl": b"model v2",
+            "sub/vocabulary.txt": b"a b c",
+            # same content as a base file with a different name
+            "sub/vocabulary_copy.txt": b"a b c",
+        }
+        local_path = tmp_path / "model"
+        _write_files(str(local_path), files)
+
+        # Act
+        engine._upload_local_model(
+            str(local_path),
+            _MODEL_VERSION_PATH,
+            lambda *args: None,
+            upload_configuration={"delta": True},
+        )
+
+        # Assert
+        assert engine._engine.copied == {
+            _MODEL_VERSION_PATH + "/sub/vocabulary.txt": self._MODEL_PATH
+            + "/1/sub/vocabulary.txt",
+            _MODEL_VERSION_PATH + "/sub/vocabulary_copy.txt": self._MODEL_PATH
+            + "/1/sub/vocabulary.txt",
+        }
+        checksums_path = (
+            _MODEL_VERSION_PATH + "/" + constants.MODEL_REGISTRY.MODEL_FILES_CHECKSUMS
+        )
+        assert set(engine._engine.uploaded) == {
+            _MODEL_VERSION_PATH + "/model.pkl",
+            checksums_path,
+        }
+        # the checksums of all files are recorded, for later delta uploads
+        assert json.loads(engine._engine.uploaded[checksums_path]) == json.loads(
+            self._checksums_file(files)
+        )
+
+    def test_delta_upload_explicit_base_version(self, engine, tmp_path, monkeypatch):
+        # Arrange
+        monkeypatch.chdir(tmp_path)
+        self._set_remote_versions(
+            engine,
+            {
+                "0": {
+                    "model.pkl": b"model v0",
+                    constants.MODEL_REGISTRY.MODEL_FILES_CHECKSUMS: self._checksums_file(
+                        {"model.pkl": b"model v0"}
+                    ),
+                },
+                "1": {},
+            },
+        )
+        local_path = tmp_path / "model"
+        _write_files(str(local_path), {"model.pkl": b"model v0"})
+
+        # Act
+        engine._upload_local_model(
+            str(local_path),
+            _MODEL_VERSION_PATH,
+            lambda *args: None,
+            upload_configuration={"delta": True, "base_version": 0},
+        )
+
+        # Assert
+        assert engine._engine.copied == {
+            _MODEL_VERSION_PATH + "/model.pkl": self._MODEL_PATH + "/0/model.pkl"
+        }
+
+    def test_upload_without_delta(self, engine, tmp_path):
+        # Arrange
+        local_path = tmp_path / "model"
+        _write_files(str(local_path), {"model.pkl": b"model"})
+
+        # Act
+        engine._upload_local_model(
+            str(local_path), _MODEL_VERSION_PATH, lambda *args: None
+        )
+
+        # Assert
+        assert engine._engine.copied == {}
+        assert set(engine._engine.uploaded) == {_MODEL_VERSION_PATH + "/model.pkl"}
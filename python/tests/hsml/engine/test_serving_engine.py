@@ -0,0 +1,523 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import random
+import threading
+import time
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+from hsml import client
+from hsml.client.exceptions import ModelServingException, RestAPIError
+from hsml.client.istio.utils.infer_type import InferOutput
+from hsml.constants import DEPLOYMENT, PREDICTOR, PREDICTOR_STATE
+from hsml.core import serving_api
+from hsml.deployment import Deployment
+from hsml.engine import serving_engine
+from hsml.engine.state_watcher import Backoff, StateWatcher
+from hsml.predictor_state import PredictorState
+from hsml.predictor_state_condition import PredictorStateCondition
+from hsml.python.predictor import Predictor
+
+
+def _state(status, revision=None):
+    return PredictorState(
+        available_predictor_instances=0,
+        available_transformer_instances=None,
+        hopsworks_inference_path=None,
+        model_server_inference_path=None,
+        internal_port=None,
+        revision=revision,
+        deployed=None,
+        condition=PredictorStateCondition(
+            type=PREDICTOR_STATE.CONDITION_TYPE_STARTED, reason="Deployment " + status
+        ),
+        status=status,
+    )
+
+
+def _deployment(statuses):
+    deployment = mock.MagicMock()
+    deployment.transformer = None
+    deployment.requested_instances = 1
+    deployment.get_state.side_effect = lambda: _state(
+        *_as_tuple(statuses.pop(0) if len(statuses) > 1 else statuses[0])
+    )
+    return deployment
+
+
+def _as_tuple(status):
+    # statuses are given with or without revision
+    return status if isinstance(status, tuple) else (status,)
+
+
+@pytest.fixture
+def fast_watcher(monkeypatch):
+    monkeypatch.setattr(
+        serving_engine,
+        "StateWatcher",
+        lambda get_state: StateWatcher(
+            get_state, Backoff(initial_interval=0.01, max_interval=0.01)
+        ),
+    )
+
+
+class TestServingEngine:
+    def test_interrupt_await(self, monkeypatch):
+        # Arrange
+        post = mock.MagicMock()
+        monkeypatch.setattr(serving_api.ServingApi, "post", post)
+        engine = serving_engine.ServingEngine()
+        deployment = _deployment(
+            [PREDICTOR_STATE.STATUS_STOPPED, PREDICTOR_STATE.STATUS_STARTING]
+        )
+        thread = threading.Thread(
+            target=engine.start, args=(deployment, 600), daemon=True
+        )
+        thread.start()
+
+        # Act
+        time.sleep(0.1)
+        start_time = time.monotonic()
+        engine.interrupt_await()
+        thread.join(timeout=5)
+
+        # Assert
+        assert not thread.is_alive()
+        assert time.monotonic() - start_time < 1
+        post.assert_called_once_with(deployment, DEPLOYMENT.ACTION_START)
+
+    def test_interrupt_await_preparation(self, monkeypatch):
+        # Arrange
+        post = mock.MagicMock()
+        monkeypatch.setattr(serving_api.ServingApi, "post", post)
+        engine = serving_engine.ServingEngine()
+        deployment = _deployment([PREDICTOR_STATE.STATUS_CREATING])
+        thread = threading.Thread(
+            target=engine.start, args=(deployment, 600), daemon=True
+        )
+        thread.start()
+
+        # Act
+        time.sleep(0.1)
+        engine.interrupt_await()
+        thread.join(timeout=5)
+
+        # Assert
+        assert not thread.is_alive()
+        # not started while still creating
+        post.assert_not_called()
+
+    def test_update_awaits_status_change(self, monkeypatch, fast_watcher):
+        # Arrange
+        put = mock.MagicMock()
+        monkeypatch.setattr(serving_api.ServingApi, "put", put)
+        engine = serving_engine.ServingEngine()
+        statuses = [
+            PREDICTOR_STATE.STATUS_RUNNING,
+            # first probes right after the update still see the previous state
+            PREDICTOR_STATE.STATUS_RUNNING,
+            PREDICTOR_STATE.STATUS_UPDATING,
+            PREDICTOR_STATE.STATUS_RUNNING,
+        ]
+        deployment = _deployment(list(statuses))
+
+        # Act
+        engine.update(deployment, await_update=5)
+
+        # Assert
+        put.assert_called_once_with(deployment)
+        assert deployment.get_state.call_count == len(statuses)
+
+    def test_update_awaits_revision_change(self, monkeypatch, fast_watcher):
+        # Arrange
+        monkeypatch.setattr(serving_api.ServingApi, "put", mock.MagicMock())
+        engine = serving_engine.ServingEngine()
+        statuses = [
+            (PREDICTOR_STATE.STATUS_RUNNING, "1"),
+            (PREDICTOR_STATE.STATUS_RUNNING, "1"),
+            (PREDICTOR_STATE.STATUS_RUNNING, "2"),
+        ]
+        deployment = _deployment(list(statuses))
+
+        # Act
+        engine.update(deployment, await_update=5)
+
+        # Assert
+        assert deployment.get_state.call_count == len(statuses)
+
+    def test_update_status_unchanged(self, monkeypatch, fast_watcher):
+        # Arrange
+        monkeypatch.setattr(serving_api.ServingApi, "put", mock.MagicMock())
+        engine = serving_engine.ServingEngine()
+        deployment = _deployment([PREDICTOR_STATE.STATUS_RUNNING])
+
+        # Act
+        with pytest.raises(ModelServingException):
+            engine.update(deployment, await_update=0.2)
+
+        # Assert
+        assert deployment.get_state.call_count > 2
+
+
+class _FakeInferenceApi:
+    """Doubles the first value of each row, after a random delay, failing the first `failures` requests."""
+
+    def __init__(self, failures=None):
+        self.failures = list(failures or [])
+        self.payloads = []
+        self._lock = threading.Lock()
+
+    def send_inference_request(self, deployment_instance, data, through_hopsworks):
+        with self._lock:
+            self.payloads.append(data)
+            status_code = self.failures.pop(0) if self.failures else None
+        if status_code is not None:
+            response = requests.Response()
+            response.status_code = status_code
+            response._content = b""
+            raise RestAPIError("http://localhost", response)
+        time.sleep(random.uniform(0, 0.01))
+        return {"predictions": [[row[0] * 2] for row in np.asarray(data["instances"])]}
+
+
+@pytest.fixture
+def batch_deployment(monkeypatch):
+    monkeypatch.setattr(
+        client,
+        "get_serving_resource_limits",
+        lambda: {"cores": -1, "memory": -1, "gpus": -1},
+    )
+    monkeypatch.setattr(client, "get_serving_num_instances_limits", lambda: [0, -1])
+
+    def create(fake):
+        monkeypatch.setattr(
+            serving_api.ServingApi,
+            "send_inference_request",
+            fake.send_inference_request,
+        )
+        predictor = Predictor(
+            name="test",
+            model_name="test",
+            model_path="/Models/test/1",
+            model_version=1,
+            model_framework="PYTHON",
+            artifact_version=1,
+            model_server="PYTHON",
+            serving_tool=PREDICTOR.SERVING_TOOL_KSERVE,
+            script_file="predictor.py",
+        )
+        return Deployment(predictor=predictor, name="test")
+
+    return create
+
+
+def _batch_sizes(fake):
+    return sorted(len(payload["instances"]) for payload in fake.payloads)
+
+
+class TestPredictBatch:
+    def test_split_by_rows_in_order(self, batch_deployment):
+        # Arrange
+        fake = _FakeInferenceApi()
+        deployment = batch_deployment(fake)
+
+        # Act
+        predictions, statistics = deployment.predict_batch(
+            [[i] for i in range(100)],
+            batch_size=7,
+            max_in_flight=4,
+            return_statistics=True,
+        )
+
+        # Assert
+        assert predictions == {"predictions": [[i * 2] for i in range(100)]}
+        assert _batch_sizes(fake) == [2] + [7] * 14
+        assert statistics["requests"] == 15
+        assert statistics["rows"] == 100
+        assert statistics["retries"] == 0
+
+    def test_split_by_bytes(self, batch_deployment):
+        # Arrange
+        fake = _FakeInferenceApi()
+        deployment = batch_deployment(fake)
+
+        # Act, each row takes 4 bytes: "[1]" and a separator
+        predictions = deployment.predict_batch(
+            [[i] for i in range(10)], batch_size=5, max_batch_bytes=10
+        )
+
+        # Assert
+        assert predictions == {"predictions": [[i * 2] for i in range(10)]}
+        assert _batch_sizes(fake) == [2] * 5
+
+    @pytest.mark.parametrize(
+        "inputs",
+        [
+            np.arange(10).reshape(10, 1),
+            np.arange(10),
+            pd.DataFrame({"a": range(10)}),
+            (row for row in [[i] for i in range(10)]),
+        ],
+        ids=["ndarray", "1d-ndarray", "dataframe", "iterator"],
+    )
+    def test_inputs(self, batch_deployment, inputs):
+        # Arrange
+        fake = _FakeInferenceApi()
+        deployment = batch_deployment(fake)
+
+        # Act
+        predictions = deployment.predict_batch(
+            inputs, batch_size=3, output_format="numpy"
+        )
+
+        # Assert
+        np.testing.assert_array_equal(predictions, np.arange(10).reshape(10, 1) * 2)
+        assert _batch_sizes(fake) == [1, 3, 3, 3]
+
+    def test_retry_server_errors(self, batch_deployment):
+        # Arrange
+        fake = _FakeInferenceApi(failures=[503, 500])
+        deployment = batch_deployment(fake)
+
+        # Act
+        predictions, statistics = deployment.predict_batch(
+            [[1], [2]], max_in_flight=1, retry_interval=0, return_statistics=True
+        )
+
+        # Assert
+        assert predictions == {"predictions": [[2], [4]]}
+        assert statistics["retries"] == 2
+        assert len(fake.payloads) == 3
+
+    def test_no_retry_client_errors(self, batch_deployment):
+        # Arrange
+        fake = _FakeInferenceApi(failures=[400])
+        deployment = batch_deployment(fake)
+
+        # Act
+        with pytest.raises(RestAPIError):
+            deployment.predict_batch([[1], [2]], retry_interval=0)
+
+        # Assert
+        assert len(fake.payloads) == 1
+
+    def test_retries_exhausted(self, batch_deployment):
+        # Arrange
+        fake = _FakeInferenceApi(failures=[503, 503, 503])
+        deployment = batch_deployment(fake)
+
+        # Act
+        with pytest.raises(RestAPIError):
+            deployment.predict_batch([[1]], max_retries=2, retry_interval=0)
+
+        # Assert
+        assert len(fake.payloads) == 3
+
+    @pytest.mark.parametrize(
+        "kwargs", [{"batch_size": 0}, {"batch_size": -1}, {"max_in_flight": 0}]
+    )
+    def test_invalid_arguments(self, batch_deployment, kwargs):
+        # Arrange
+        fake = _FakeInferenceApi()
+        deployment = batch_deployment(fake)
+
+        # Act
+        with pytest.raises(ValueError):
+            deployment.predict_batch([[1]], **kwargs)
+
+        # Assert
+        assert fake.payloads == []
+
+
+def _infer_output(name, array, datatype):
+    infer_output = InferOutput(name, list(array.shape), datatype)
+    infer_output.set_data_from_numpy(array, binary_data=True)
+    return infer_output
+
+
+def _v2_output(name, array, datatype):
+    return {
+        "name": name,
+        "shape": list(array.shape),
+        "datatype": datatype,
+        "data": array.ravel().tolist(),
+    }
+
+
+class TestFormatInferenceResponse:
+    def test_raw(self):
+        # Arrange
+        engine = serving_engine.ServingEngine()
+        response = {"predictions": [[1, 2]]}
+
+        # Act
+        formatted = engine._format_inference_response(response, "raw")
+
+        # Assert
+        assert formatted is response
+
+    def test_v1_numpy(self):
+        # Arrange
+        engine = serving_engine.ServingEngine()
+
+        # Act
+        formatted = engine._format_inference_response(
+            {"predictions": [[1.5, 2.0], [3.0, 4.0]]}, "numpy"
+        )
+
+        # Assert
+        assert isinstance(formatted, np.ndarray)
+        np.testing.assert_array_equal(formatted, [[1.5, 2.0], [3.0, 4.0]])
+
+    @pytest.mark.parametrize(
+        "predictions, expected",
+        [
+            ([1, 2], pd.DataFrame({"predictions": [1, 2]})),
+            (
+                [[1, 2], [3, 4]],
+                pd.DataFrame({"predictions_0": [1, 3], "predictions_1": [2, 4]}),
+            ),
+            (
+                [{"label": "a", "score": 0.5}, {"label": "b", "score": 0.25}],
+                pd.DataFrame({"label": ["a", "b"], "score": [0.5, 0.25]}),
+            ),
+        ],
+        ids=["1d", "2d", "records"],
+    )
+    def test_v1_pandas(self, predictions, expected):
+        # Arrange
+        engine = serving_engine.ServingEngine()
+
+        # Act
+        formatted = engine._format_inference_response(
+            {"predictions": predictions}, "pandas"
+        )
+
+        # Assert
+        pd.testing.assert_frame_equal(formatted, expected)
+
+    def test_v2_numpy(self):
+        # Arrange
+        engine = serving_engine.ServingEngine()
+        array = np.arange(6, dtype=np.float32).reshape(3, 2)
+
+        # Act
+        formatted = engine._format_inference_response(
+            {"outputs": [_v2_output("output-0", array, "FP32")]}, "numpy"
+        )
+
+        # Assert
+        assert formatted.dtype == np.float32
+        np.testing.assert_array_equal(formatted, array)
+
+    def test_v2_multiple_outputs(self):
+        # Arrange
+        engine = serving_engine.ServingEngine()
+        labels = np.array([1, 0, 1], dtype=np.int64)
+        scores = np.array([[0.5, 0.5], [0.75, 0.25], [0.0, 1.0]])
+        response = {
+            "outputs": [
+                _v2_output("labels", labels, "INT64"),
+                _v2_output("scores", scores, "FP64"),
+            ]
+        }
+
+        # Act
+        arrays = engine._format_inference_response(response, "numpy")
+        df = engine._format_inference_response(response, "pandas")
+
+        # Assert
+        assert list(arrays) == ["labels", "scores"]
+        np.testing.assert_array_equal(arrays["labels"], labels)
+        np.testing.assert_array_equal(arrays["scores"], scores)
+        pd.testing.assert_frame_equal(
+            df,
+            pd.DataFrame(
+                {
+                    "labels": labels,
+                    "scores_0": scores[:, 0],
+                    "scores_1": scores[:, 1],
+                }
+            ),
+        )
+
+    def test_grpc_numpy(self):
+        # Arrange
+        engine = serving_engine.ServingEngine()
+        array = np.arange(6, dtype=np.float32).reshape(3, 2)
+
+        # Act
+        formatted = engine._format_inference_response(
+            [_infer_output("output-0", array, "FP32")], "numpy"
+        )
+
+        # Assert
+        assert formatted.dtype == np.float32
+        np.testing.assert_array_equal(formatted, array)
+
+    def test_grpc_pandas(self):
+        # Arrange
+        engine = serving_engine.ServingEngine()
+        labels = np.array([1, 0], dtype=np.int32)
+        scores = np.array([0.5, 0.25], dtype=np.float64)
+
+        # Act
+        formatted = engine._format_inference_response(
+            [
+                _infer_output("labels", labels, "INT32"),
+                _infer_output("scores", scores, "FP64"),
+            ],
+            "pandas",
+        )
+
+        # Assert
+        pd.testing.assert_frame_equal(
+            formatted, pd.DataFrame({"labels": labels, "scores": scores})
+        )
+
+    def test_invalid_response(self):
+        # Arrange
+        engine = serving_engine.ServingEngine()
+
+        # Act
+        with pytest.raises(ModelServingException):
+            engine._format_inference_response({"error": "failed"}, "numpy")
+
+    def test_predict_output_format(self, batch_deployment):
+        # Arrange
+        deployment = batch_deployment(_FakeInferenceApi())
+
+        # Act
+        formatted = deployment.predict(inputs=[[1], [2]], output_format="pandas")
+
+        # Assert
+        pd.testing.assert_frame_equal(formatted, pd.DataFrame({"predictions": [2, 4]}))
+
+    def test_predict_invalid_output_format(self, batch_deployment):
+        # Arrange
+        fake = _FakeInferenceApi()
+        deployment = batch_deployment(fake)
+
+        # Act
+        with pytest.raises(ValueError):
+            deployment.predict(inputs=[[1]], output_format="arrow")
+
+        # Assert
+        assert fake.payloads == []
@@ -0,0 +1,59 @@
+#
+#   Copyright 2024 Hopsworks AB
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+
+LAZY_MODULES = ["pandas", "grpc", "google.protobuf"]
+
+SCRIPT = """
+import importlib, json, sys
+importlib.import_module({module!r})
+print(json.dumps([m for m in {lazy_modules!r} if m in sys.modules]))
+"""
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "hsml",
+        # modules imported by hsml.connection(), for both external and internal clients
+        "hsml.client.hopsworks.external",
+        "hsml.client.hopsworks.internal",
+        "hsml.client.istio.external",
+        "hsml.client.istio.internal",
+        "hsml.core.model_api",
+        "hsml.core.model_registry_api",
+        "hsml.core.model_serving_api",
+    ],
+)
+def test_heavy_dependencies_loaded_lazily(module):
+    # Act
+    # a fresh interpreter, modules already imported by the tests are not loaded
+    output = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            SCRIPT.format(module=module, lazy_modules=LAZY_MODULES),
+        ]
+    )
+
+    # Assert
+    assert json.loads(output) == []